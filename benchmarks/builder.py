@@ -0,0 +1,48 @@
+"""
+Compare building many small styled spans with each API.
+
+Usage: PYTHONPATH=. python benchmarks/builder.py
+"""
+
+import timeit
+
+from simpletex import write, dump, clear
+from simpletex import builder as E
+from simpletex.formatting.text import Bold
+from simpletex.sequences import UnorderedList
+
+SPANS = 20000
+NUMBER = 3
+
+
+def context_managers():
+    with UnorderedList():
+        for span in range(SPANS):
+            with Bold():
+                write(span)
+    text = dump()
+    clear()
+    return text
+
+
+def functional():
+    write(E.itemize([E.bold(span) for span in range(SPANS)]))
+    text = dump()
+    clear()
+    return text
+
+
+def report(name, function):
+    seconds = timeit.timeit(function, number=NUMBER) / NUMBER
+    print('{:<18} {:8.1f} ms {:8.2f} Mspan/s'.format(
+        name, seconds * 1e3, SPANS / seconds / 1e6))
+
+
+def main():
+    assert context_managers() == functional()
+    report('context managers', context_managers)
+    report('functional', functional)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""
+Measure the cold-start cost of ``import simpletex``.
+
+Each sample imports simpletex in a fresh interpreter and reads the
+cumulative time reported by ``python -X importtime``.
+Exits with a non-zero status if the median exceeds the budget.
+
+Usage: python benchmarks/import_time.py [samples] [budget_ms]
+"""
+
+import statistics
+import subprocess
+import sys
+
+
+def sample() -> float:
+    """Return the cumulative import time of simpletex in milliseconds."""
+    result = subprocess.run([sys.executable, '-X', 'importtime',
+                             '-c', 'import simpletex'],
+                            stderr=subprocess.PIPE, check=True)
+    for line in result.stderr.decode().splitlines():
+        fields = [field.strip() for field in line.split('|')]
+        if len(fields) == 3 and fields[2] == 'simpletex':
+            return int(fields[1]) / 1000
+    raise RuntimeError('simpletex import time not reported.')
+
+
+def main(samples: int = 20, budget: float = 10.0):
+    times = [sample() for _ in range(samples)]
+    median = statistics.median(times)
+    print('import simpletex: median {:.2f} ms, min {:.2f} ms '
+          '({} samples, budget {:.2f} ms)'.format(median, min(times),
+                                                  samples, budget))
+    if median > budget:
+        sys.exit('Import time budget exceeded.')
+
+
+if __name__ == '__main__':
+    main(*(float(arg) if i else int(arg)
+           for i, arg in enumerate(sys.argv[1:])))
@@ -0,0 +1,23 @@
+"""
+Measure the throughput of the linter on a large document.
+
+Usage: PYTHONPATH=. python benchmarks/lint.py
+"""
+
+import timeit
+
+from simpletex.lint import lint
+
+LINE = r'\item \textbf{Total} for {region} is 50\% of \emph{sales} % note'
+TEXT = '\\begin{itemize}\n' + '\n'.join([LINE] * 100000) + '\n\\end{itemize}'
+NUMBER = 3
+
+
+def main():
+    seconds = timeit.timeit(lambda: lint(TEXT), number=NUMBER) / NUMBER
+    print('{:8.1f} ms {:8.1f} MB/s'.format(seconds * 1e3,
+                                          len(TEXT) / seconds / 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Compare rendering independent sections one after another and in parallel.
+
+Each section formats many rows; process parallelism only pays off
+with several CPU cores.
+
+Usage: PYTHONPATH=. python benchmarks/parallel.py
+"""
+
+import os
+import timeit
+from functools import partial
+
+from simpletex import write, dump, clear
+from simpletex.document import Document, Section
+from simpletex.formatting.text import Bold
+from simpletex.parallel import write_parallel
+
+SECTIONS = 8
+ROWS = 5000
+NUMBER = 3
+
+
+def section(number: int):
+    with Section('Section {}'.format(number)):
+        for row in range(ROWS):
+            write(Bold()('Row {}'.format(row)))
+
+
+BUILDERS = [partial(section, number) for number in range(SECTIONS)]
+
+
+def sequential():
+    for builder in BUILDERS:
+        builder()
+
+
+def report(name, function):
+    def run():
+        with Document():
+            function()
+        dump()
+        clear()
+    seconds = timeit.timeit(run, number=NUMBER) / NUMBER
+    print('{:<12} {:8.1f} ms'.format(name, seconds * 1e3))
+
+
+def main():
+    print('{} CPUs'.format(os.cpu_count()))
+    report('sequential', sequential)
+    report('threads', partial(write_parallel, BUILDERS))
+    report('processes', partial(write_parallel, BUILDERS, processes=True))
+
+
+if __name__ == '__main__':
+    main()
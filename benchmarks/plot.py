@@ -0,0 +1,33 @@
+"""
+Measure formatting a long series, with each downsampling method.
+
+Usage: PYTHONPATH=. python benchmarks/plot.py
+"""
+
+import timeit
+
+import numpy as np
+
+from simpletex.plot import series
+
+POINTS = 2000000
+NUMBER = 3
+
+
+def report(name, x, y, **kwargs):
+    seconds = timeit.timeit(lambda: series(x, y, **kwargs),
+                            number=NUMBER) / NUMBER
+    size = len(series(x, y, **kwargs))
+    print('{:<28} {:8.1f} ms {:10d} bytes'.format(name, seconds * 1e3, size))
+
+
+def main():
+    x = np.linspace(0, 1000, POINTS)
+    y = np.sin(x) + np.random.default_rng(0).random(POINTS)
+    report('lttb (2M to 1000 points)', x, y, method='lttb')
+    report('minmax (2M to 1000 points)', x, y, method='minmax')
+    report('full (first 100k points)', x[:100000], y[:100000], points=None)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""
+Compare render time and output size with and without pretty printing.
+
+Usage: PYTHONPATH=. python benchmarks/pretty.py
+"""
+
+import timeit
+
+import simpletex
+from simpletex import write, dump, clear
+from simpletex.document import Document, Section, Subsection
+from simpletex.formatting.layout import Centering
+from simpletex.sequences import UnorderedList
+
+SECTIONS = 50
+ITEMS = 40
+NUMBER = 5
+
+
+def build():
+    with Document():
+        for section in range(SECTIONS):
+            with Section('Section {}'.format(section)):
+                write('Some introductory text for the section.')
+                with Subsection('Details'):
+                    with Centering():
+                        with UnorderedList():
+                            for item in range(ITEMS):
+                                write('Item number {}'.format(item))
+    text = dump()
+    clear()
+    return text
+
+
+def report(pretty):
+    simpletex.pretty = pretty
+    seconds = timeit.timeit(build, number=NUMBER) / NUMBER
+    size = len(build().encode('utf-8'))
+    print('pretty={!s:<6} {:8.1f} ms {:10d} bytes'.format(
+        pretty, seconds * 1e3, size))
+
+
+def main():
+    report(True)
+    report(False)
+    simpletex.pretty = True
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""
+Compare rendering a whole document against rendering a single section.
+
+Usage: PYTHONPATH=. python benchmarks/selective.py
+"""
+
+import timeit
+
+from simpletex import render, write_many
+from simpletex.document import Document, Section, Subsection
+from simpletex.formatting.text import Bold
+
+SECTIONS = 50
+ROWS = 1000
+NUMBER = 5
+
+
+def rows(section: int, subsection: int):
+    bold = Bold()
+    write_many(bold('Row {}.{}.{}'.format(section, subsection, row))
+               for row in range(ROWS))
+
+
+def document():
+    with Document():
+        for section in range(SECTIONS):
+            with Section('Section {}'.format(section)):
+                for subsection in range(3):
+                    Subsection('Part {}'.format(subsection)).build(
+                        rows, section, subsection)
+
+
+def report(name, select):
+    seconds = timeit.timeit(lambda: render(document, select),
+                            number=NUMBER) / NUMBER
+    print('{:<12} {:8.1f} ms'.format(name, seconds * 1e3))
+
+
+def main():
+    report('everything', None)
+    report('one section', ['Section 7'])
+    report('one part', ['Section 7/Part 1'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Compare rendering specs in a fresh process each against a render server.
+
+Usage: PYTHONPATH=. python benchmarks/server.py
+"""
+
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+from simpletex.server import Client
+
+DOCUMENTS = 50
+SPEC = {'type': 'document',
+        'body': [{'type': 'section', 'name': 'Section {}'.format(number),
+                  'body': [{'type': 'bold', 'body': 'Row {}'.format(row)}
+                           for row in range(100)]}
+                 for number in range(5)]}
+SCRIPT = ('import json, sys; from simpletex.spec import render; '
+          'sys.stdout.write(render(json.load(sys.stdin)))')
+
+
+def per_process():
+    request = json.dumps(SPEC).encode('utf-8')
+    for _ in range(DOCUMENTS):
+        subprocess.run([sys.executable, '-c', SCRIPT], input=request,
+                       stdout=subprocess.PIPE, check=True)
+
+
+def server(path):
+    with Client(path) as client:
+        for _ in range(DOCUMENTS):
+            client.render(spec=SPEC)
+
+
+def connect(path, process):
+    while True:
+        try:
+            return Client(path)
+        except OSError:
+            if process.poll() is not None:
+                raise RuntimeError('The server failed to start.')
+            time.sleep(0.01)
+
+
+def report(name, function, *args):
+    start = time.perf_counter()
+    function(*args)
+    seconds = time.perf_counter() - start
+    print('{:<12} {:8.1f} ms {:8.1f} documents/s'.format(
+        name, seconds * 1e3, DOCUMENTS / seconds))
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'server.sock')
+    process = subprocess.Popen([sys.executable, '-m', 'simpletex.server',
+                                path])
+    try:
+        connect(path, process).close()
+        report('per process', per_process)
+        report('server', server, path)
+    finally:
+        process.send_signal(signal.SIGINT)
+        process.wait()
+        os.rmdir(directory)
+
+
+if __name__ == '__main__':
+    main()
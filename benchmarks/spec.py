@@ -0,0 +1,53 @@
+"""
+Compare rendering a large document spec against the imperative API.
+
+Usage: PYTHONPATH=. python benchmarks/spec.py
+"""
+
+import timeit
+
+from simpletex import write, dump, clear
+from simpletex.document import Document, Section
+from simpletex.formatting.text import Bold
+from simpletex.sequences import UnorderedList
+from simpletex.spec import render
+
+SECTIONS = 100
+ITEMS = 100
+NUMBER = 5
+
+SPEC = {'type': 'document', 'body': [
+    {'type': 'section', 'name': 'Section {}'.format(section), 'body': [
+        {'type': 'unordered_list', 'body': [
+            {'type': 'bold', 'body': 'Item {}'.format(item)}
+            for item in range(ITEMS)]}]}
+    for section in range(SECTIONS)]}
+
+
+def imperative():
+    with Document():
+        for section in SPEC['body']:
+            with Section(section['name']):
+                for sequence in section['body']:
+                    with UnorderedList():
+                        for item in sequence['body']:
+                            with Bold():
+                                write(item['body'])
+    text = dump()
+    clear()
+    return text
+
+
+def report(name, function):
+    seconds = timeit.timeit(function, number=NUMBER) / NUMBER
+    print('{:<12} {:8.1f} ms'.format(name, seconds * 1e3))
+
+
+def main():
+    assert imperative() == render(SPEC)
+    report('imperative', imperative)
+    report('spec', lambda: render(SPEC))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Compare rebuilding a document per record against filling a template.
+
+Usage: PYTHONPATH=. python benchmarks/template.py
+"""
+
+import timeit
+
+from simpletex import write, dump, clear, latex_escape
+from simpletex.document import Document, Section
+from simpletex.formatting.text import Bold
+from simpletex.sequences import UnorderedList
+from simpletex.template import slot, Template
+
+RECORDS = [{'name': 'Customer {} & Co.'.format(number),
+            'balance': '{}%'.format(number % 100)}
+           for number in range(2000)]
+
+
+def build(name, balance):
+    with Document():
+        with Section('Statement'):
+            write('Dear {},'.format(Bold()(name)))
+            with UnorderedList():
+                for line in range(20):
+                    write('Line item {}'.format(line))
+            write('Your balance is {}.'.format(balance))
+    text = dump()
+    clear()
+    return text
+
+
+def rebuild():
+    return [build(latex_escape(record['name']),
+                  latex_escape(record['balance'])) for record in RECORDS]
+
+
+def fill():
+    template = Template(build(slot('name'), slot('balance')))
+    return list(template.fill_many(RECORDS))
+
+
+def report(name, function):
+    seconds = timeit.timeit(function, number=1)
+    print('{:<10} {:8.1f} ms {:10.0f} records/s'.format(
+        name, seconds * 1e3, len(RECORDS) / seconds))
+
+
+def main():
+    assert rebuild() == fill()
+    report('rebuild', rebuild)
+    report('template', fill)
+
+
+if __name__ == '__main__':
+    main()
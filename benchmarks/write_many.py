@@ -0,0 +1,45 @@
+"""
+Compare writing many rows one at a time against writing them in bulk.
+
+Usage: PYTHONPATH=. python benchmarks/write_many.py
+"""
+
+import timeit
+
+from simpletex import write, write_many, dump, clear
+
+ROWS = [str(row) for row in range(200000)]
+NUMBER = 5
+
+
+def repeated():
+    for row in ROWS:
+        write(row)
+
+
+def bulk():
+    write_many(ROWS)
+
+
+def lazy():
+    write_many(iter(ROWS), lazy=True)
+
+
+def report(name, function):
+    def run():
+        function()
+        dump()
+        clear()
+    seconds = timeit.timeit(run, number=NUMBER) / NUMBER
+    print('{:<12} {:8.1f} ms {:8.2f} Mrow/s'.format(
+        name, seconds * 1e3, len(ROWS) / seconds / 1e6))
+
+
+def main():
+    report('write', repeated)
+    report('write_many', bulk)
+    report('lazy', lazy)
+
+
+if __name__ == '__main__':
+    main()
@@ -8,4 +8,6 @@ setup(name='simpletex',
       author_email='samuel.wgx@gmail.com',
       url='https://github.com/wgxli/simpletex',
       download_url='https://github.com/wgxli/simpletex/archive/v0.2.3.tar.gz',
-      packages=find_packages())
+      packages=find_packages(),
+      extras_require={'plot': ['numpy']},
+      python_requires='>=3.7')
@@ -5,14 +5,88 @@ This module provides functions to conveniently perform common operations.
     :license: GNU GPLv3, see License for more details.
 """
 
-import codecs
+# Same as ``threading.local``, without importing ``threading``
+from _thread import _local
 
-from simpletex.core import Text, Paragraph
+from simpletex.core import (Text, Paragraph, CancelToken, RenderCancelled,
+                            RenderTimeout, checkpoints, _ACTIVE, _Importing)
 from simpletex.registry.core import ImportRegistry, CommandDefinitionRegistry
-from simpletex.base import Command
 
-__all__ = ('latex_escape', 'write', 'write_break', 'add_registry',
-           'usepackage', 'alias', 'save', 'dump', 'clear')
+__all__ = ('latex_escape', 'write', 'write_many', 'write_break',
+           'add_registry', 'usepackage', 'alias', 'save', 'save_split',
+           'dump', 'render', 'clear', 'fork', 'CancelToken',
+           'RenderCancelled', 'RenderTimeout')
+
+_LAZY_SUBMODULES = ('base', 'builder', 'core', 'document', 'formatting',
+                    'graphics', 'lint', 'macros', 'math', 'parallel', 'plot',
+                    'preview', 'references', 'registry', 'sequences',
+                    'server', 'spec', 'split', 'template', 'transliteration')
+"""Submodules loaded on first attribute access."""
+
+_LAZY_ATTRIBUTES = {
+    'Command': 'simpletex.base',
+    'Environment': 'simpletex.base',
+    'Document': 'simpletex.document',
+    'Section': 'simpletex.document',
+    'Subsection': 'simpletex.document',
+    'Style': 'simpletex.formatting',
+    'NamedStyle': 'simpletex.formatting.stylesheet',
+    'Bold': 'simpletex.formatting.text',
+    'Italics': 'simpletex.formatting.text',
+    'Underline': 'simpletex.formatting.text',
+    'SmallCaps': 'simpletex.formatting.text',
+    'Emphasis': 'simpletex.formatting.text',
+    'Centering': 'simpletex.formatting.layout',
+    'Columns': 'simpletex.formatting.layout',
+    'Figure': 'simpletex.graphics',
+    'Font': 'simpletex.formatting.font',
+    'SizeSelector': 'simpletex.formatting.font',
+    'Equation': 'simpletex.math',
+    'Align': 'simpletex.math',
+    'Add': 'simpletex.math',
+    'Subtract': 'simpletex.math',
+    'Multiply': 'simpletex.math',
+    'Divide': 'simpletex.math',
+    'Matrix': 'simpletex.math',
+    'Plot': 'simpletex.plot',
+    'OrderedList': 'simpletex.sequences',
+    'UnorderedList': 'simpletex.sequences',
+    'Description': 'simpletex.sequences',
+}
+"""Formatter classes loaded on first attribute access, by defining module."""
+
+pretty = True
+"""
+Whether to format the output for human readers.
+
+If false, nested environments are not indented, and preamble blocks
+are not separated by blank lines. The output is equivalent for TeX,
+but smaller and faster to render.
+"""
+
+
+def __getattr__(name: str):
+    """
+    Load submodules and formatter classes on first access.
+
+    Keeps ``import simpletex`` cheap; the formatting machinery is only
+    imported once something actually uses it.
+    """
+    import importlib
+    if name in _LAZY_SUBMODULES:
+        return importlib.import_module('simpletex.' + name)
+    if name in _LAZY_ATTRIBUTES:
+        value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+        globals()[name] = value
+        return value
+    error_string = 'module {!r} has no attribute {!r}'
+    raise AttributeError(error_string.format(__name__, name))
+
+
+def __dir__():
+    """List the module's attributes, including lazily loaded ones."""
+    return sorted(set(globals()) | set(_LAZY_SUBMODULES) |
+                  set(_LAZY_ATTRIBUTES))
 
 
 class _Preamble(Text):
@@ -27,25 +101,79 @@ class _Preamble(Text):
         # Move body last
         self.body.write(text)
 
+    def extend(self, segments, lazy: bool = False):
+        self.body.extend(segments, lazy)
+
     def __str__(self):
         self._order.remove('body')
         self._order.append('body')
         # Prevent race conditions
         list(map(str, self))
-        return '\n\n'.join(str(item) for item in self if str(item))
+        return _block_separator().join(str(item) for item in self
+                                       if str(item))
 
+    def stream(self, write):
+        """Write the preamble and body piece by piece, streaming spills."""
+        self._order.remove('body')
+        self._order.append('body')
+        separator = ''
+        for item in self:
+            if isinstance(item, Paragraph) and item.spilled:
+                write(separator)
+                item.stream(write)
+            elif str(item):
+                write(separator)
+                write(str(item))
+            else:
+                continue
+            separator = _block_separator()
 
-class _GlobalContextManager(object):
-    def __init__(self):
-        super().__setattr__('preamble', _Preamble())
-        super().__setattr__('contextStack', [self.preamble])
 
-    def push(self, context):
-        """Add the given context to the context stack."""
+def _block_separator() -> str:
+    """Return the separator placed between blocks of the preamble."""
+    return '\n\n' if _pretty() else '\n'
+
+
+def _pretty() -> bool:
+    """Return whether to format the output of the current document."""
+    value = _CONTEXT.pretty
+    return pretty if value is None else value
+
+
+class _GlobalContextManager:
+    """
+    Holds the document being written, and the stack of open contexts.
+
+    Used as a context manager, makes its document the current one
+    in the current thread (see ``_ThreadContext``).
+    """
+
+    def __init__(self):
+        self._reset()
+
+    def _reset(self):
+        preamble = _Preamble()
+        super().__setattr__('preamble', preamble)
+        super().__setattr__('contextStack', [preamble])
+        super().__setattr__('formatterStack', [None])
+        super().__setattr__('selection', None)
+        super().__setattr__('backend', None)
+        super().__setattr__('pretty', None)
+
+    def push(self, context, formatter=None):
+        """
+        Add the given context to the context stack.
+
+        formatter : Formatter or None
+            The formatter that will consume the context once closed.
+            Used to close contexts left open in a fork.
+        """
         self.contextStack.append(context)
+        self.formatterStack.append(formatter)
 
     def pop(self):
         """Remove and returns the context at the top of the context stack."""
+        self.formatterStack.pop()
         return self.contextStack.pop()
 
     @property
@@ -57,15 +185,119 @@ class _GlobalContextManager(object):
         """Write the given text or parameters to the top-level context."""
         self.top.write(*args, **kwargs)
 
+    def extend(self, segments, lazy: bool = False):
+        """Write each of the given text segments to the top-level context."""
+        self.top.extend(segments, lazy)
+
     def save(self, name):
         """Save the entire document under the given filename."""
+        import codecs
         with codecs.open(name, "w", "utf-8") as f:
-            f.write(str(self.preamble))
+            self.preamble.stream(f.write)
 
     def clear(self):
         """Clear all text and resets the context stack."""
-        super().__setattr__('preamble', _Preamble())
-        super().__setattr__('contextStack', [self.preamble])
+        self._reset()
+
+    def fork(self):
+        """
+        Return a detached copy-on-write snapshot of the current state.
+
+        The preamble, registries, and every open context are forked.
+        Text written so far is shared with the snapshot, not copied.
+        """
+        fork = _GlobalContextManager.__new__(_GlobalContextManager)
+        preamble = self.preamble.fork()
+        stack = [preamble] + [context.fork()
+                              for context in self.contextStack[1:]]
+        super(_GlobalContextManager, fork).__setattr__('preamble', preamble)
+        super(_GlobalContextManager, fork).__setattr__('contextStack', stack)
+        super(_GlobalContextManager, fork).__setattr__(
+            'formatterStack', list(self.formatterStack))
+        super(_GlobalContextManager, fork).__setattr__('selection',
+                                                        self.selection)
+        super(_GlobalContextManager, fork).__setattr__('backend',
+                                                        self.backend)
+        super(_GlobalContextManager, fork).__setattr__('pretty', self.pretty)
+        return fork
+
+    def set_pretty(self, value: bool = None):
+        """
+        Override ``simpletex.pretty`` for this document.
+
+        value : bool or None
+            Whether to format the output for human readers.
+            If ``None``, ``simpletex.pretty`` is used.
+        """
+        super().__setattr__('pretty', value)
+
+    def set_backend(self, name: str):
+        """
+        Format text with the given backend.
+
+        name : str
+            ``'latex'``, or a preview backend (``'html'`` or
+            ``'markdown'``; see ``simpletex.preview``).
+        """
+        backend = None
+        if name != 'latex':
+            from simpletex.preview import BACKENDS
+            try:
+                backend = BACKENDS[name]
+            except KeyError as e:
+                error_string = 'Unknown backend {!r}.'
+                raise ValueError(error_string.format(name)) from e
+        super().__setattr__('backend', backend)
+
+    def select(self, paths):
+        """
+        Only render the sections with the given paths.
+
+        paths : iterable of str or None
+            The path of each section to render, such as ``'Results'``
+            or ``'Appendix/Tables'``. If ``None``, render all sections.
+        """
+        if paths is not None:
+            paths = tuple(tuple(path.split('/')) for path in paths)
+        super().__setattr__('selection', paths)
+
+    def selected(self, path) -> bool:
+        """
+        Determine if the section with the given path is to be rendered.
+
+        Sections are rendered if they are selected, within a selected
+        section, or contain a selected section.
+
+        path : tuple of str
+            The titles of the section and its enclosing sections,
+            outermost first.
+        """
+        if self.selection is None:
+            return True
+        return any(path[:len(selected)] == selected or
+                   selected[:len(path)] == path
+                   for selected in self.selection)
+
+    def __enter__(self):
+        """Make this fork the current global context, in this thread."""
+        _CONTEXT._enter(self)
+        return self
+
+    def __exit__(self, *args):
+        """Keep everything written to the fork, restoring the global state."""
+        _CONTEXT._exit()
+
+    def render(self) -> str:
+        """
+        Return the full text of a fork, closing any contexts left open.
+
+        The fork itself is left untouched, and may be rendered again.
+        """
+        with self.fork():
+            while len(_CONTEXT.contextStack) > 1:
+                formatter = _CONTEXT.formatterStack[-1]
+                _CONTEXT.write(formatter(_CONTEXT.pop()))
+            return str(_CONTEXT.preamble)
 
     def add_registry(self, name, registry):
         """Add a new registry under the given name, if not already present."""
@@ -82,7 +314,68 @@ class _GlobalContextManager(object):
         return name in self.preamble
 
 
-_CONTEXT = _GlobalContextManager()
+class _ThreadState(_local):
+    def __init__(self):
+        self.context = None
+        """The context entered in this thread, if any."""
+        self.saved = []
+        """The contexts entered before it, innermost last."""
+        self.hook = None
+        """
+        If set, called with the arguments of each ``write`` in this thread;
+        see ``lint.trace``.
+        """
+
+
+def _current_field(name: str):
+    """Return a property forwarding to the current context's field."""
+    def get(self):
+        return getattr(self._current(), name)
+
+    def set(self, value):
+        object.__setattr__(self._current(), name, value)
+    return property(get, set)
+
+
+class _ThreadContext(_GlobalContextManager):
+    """
+    The current global context.
+
+    Forwards to the context entered in the current thread, if any,
+    or else to the document shared by all threads.
+    Threads may therefore write to isolated documents at the same time,
+    while the shared document and its forks may be used from any thread.
+    """
+
+    preamble = _current_field('preamble')
+    contextStack = _current_field('contextStack')
+    formatterStack = _current_field('formatterStack')
+    selection = _current_field('selection')
+    backend = _current_field('backend')
+    pretty = _current_field('pretty')
+
+    def __init__(self):
+        object.__setattr__(self, '_thread', _ThreadState())
+        object.__setattr__(self, '_document', _GlobalContextManager())
+
+    def _current(self) -> _GlobalContextManager:
+        """Return the context entered in this thread, or the document."""
+        context = self._thread.context
+        return self._document if context is None else context
+
+    def _enter(self, context: _GlobalContextManager):
+        """Make the given context current in this thread."""
+        state = self._thread
+        state.saved.append(state.context)
+        state.context = context
+
+    def _exit(self):
+        """Restore the context current before the last one entered."""
+        state = self._thread
+        state.context = state.saved.pop()
+
+
+_CONTEXT = _ThreadContext()
 
 _LATEX_ESCAPE_DICT = {
     '$': r'\$',
@@ -90,27 +383,97 @@ _LATEX_ESCAPE_DICT = {
     '&': r'\&',
     '%': r'\%',
     '_': r'\_',
-    '~': Command('textasciitilde'),
-    '^': Command('^'),
+    '~': r'\textasciitilde',
+    '^': r'\^',
     '{': r'\{',
     '}': r'\}',
-    '\\': Command('textbackslash'),
+    '\\': r'\textbackslash',
     '\n': r'\\',
     '-': r'{-}'
 }
 
+_LATEX_ESCAPE_TABLE = str.maketrans(_LATEX_ESCAPE_DICT)
 
-def latex_escape(text) -> str:
-    """Escape any special LaTeX characters."""
-    return ''.join(str(_LATEX_ESCAPE_DICT.get(char, char))
-                   for char in str(text))
+_ESCAPE_CHUNK = 1 << 16
+"""Length of the pieces long strings are escaped in, while cancellable."""
+
+
+def latex_escape(text, transliterate: bool = False) -> str:
+    """
+    Escape any special LaTeX characters.
+
+    transliterate : bool
+        If true, also replace non-ASCII characters with LaTeX equivalents
+        (such as ``\\'e`` for ``é``), so that the text can be
+        processed by pdflatex. See ``simpletex.transliteration``.
+
+    While rendering a preview, escapes the text for the preview
+    format instead (see ``simpletex.preview``).
+    """
+    if _CONTEXT.backend is not None:
+        return _CONTEXT.backend.escape(text)
+    if _ACTIVE.token is not None and len(str(text)) > _ESCAPE_CHUNK:
+        # Escape long strings in pieces, checking the token in between
+        text = str(text)
+        pieces = (text[start:start + _ESCAPE_CHUNK]
+                  for start in range(0, len(text), _ESCAPE_CHUNK))
+        return ''.join(latex_escape(piece, transliterate)
+                       for piece in checkpoints(pieces))
+    if transliterate:
+        from simpletex import transliteration
+        return transliteration.transliterate(text)
+    return str(text).translate(_LATEX_ESCAPE_TABLE)
 
 
 def write(*args, **kwargs):
     """Write the given text or parameters to the current top-level context."""
+    hook = _CONTEXT._thread.hook
+    if hook is not None:
+        hook(args)
+    if len(args) == 1 and isinstance(args[0], _Importing):
+        args[0]._import()
     _CONTEXT.write(*args, **kwargs)
 
 
+def write_many(segments, lazy: bool = False):
+    """
+    Write each of the given text segments to the current top-level context.
+
+    Equivalent to calling ``write`` on each segment, with much less
+    overhead per segment.
+
+    segments : iterable
+        The text segments to write.
+    lazy : bool
+        If true, the iterable is only consumed once the enclosing
+        context is closed or rendered, rather than immediately.
+        Packages required by the segments (such as ``builder`` nodes)
+        are then imported as they are consumed.
+    """
+    if lazy:
+        segments = _imported(segments)
+    else:
+        segments = list(segments)
+        hook = _CONTEXT._thread.hook
+        if hook is not None:
+            for segment in segments:
+                hook((segment,))
+        if any(issubclass(kind, _Importing) for kind in set(map(type,
+                                                                segments))):
+            for segment in segments:
+                if isinstance(segment, _Importing):
+                    segment._import()
+    _CONTEXT.extend(segments, lazy)
+
+
+def _imported(segments):
+    """Yield each segment, importing the packages it requires."""
+    for segment in segments:
+        if isinstance(segment, _Importing):
+            segment._import()
+        yield segment
+
+
 def write_break(text):
     r"""
     Write the given string, adding a LaTeX line break.
@@ -119,7 +482,7 @@ def write_break(text):
     LaTeX line break (``\\``) is appended.
     It is then written to the current top-level context.
     """
-    _CONTEXT.write(str(text) + r' \\')
+    write(str(text) + r' \\')
 
 
 def add_registry(name: str, registry):
@@ -144,7 +507,7 @@ def usepackage(name: str, *args, **kwargs):
     _CONTEXT.imports.register(name, [args, kwargs])
 
 
-def alias(name: str, definition):
+def alias(name: str, definition, arguments: int = 0):
     r"""
     Add a new command alias to the command definition registry.
 
@@ -156,28 +519,156 @@ def alias(name: str, definition):
         Do not include the leading backslash.
     definition : str-like object
         The definition of the new command.
+    arguments : int
+        The number of arguments taken by the new command,
+        referred to as ``#1``, ``#2``, etc. in the definition.
     """
-    _CONTEXT.commandDefinitions.register(name, definition)
+    from simpletex.base import Command
+    _CONTEXT.commandDefinitions.register(name, (definition, arguments))
     return Command(name)
 
 
-def save(filename: str):
+def _cancel_token(timeout, deadline, token):
+    """Return the cancel token to render with, or ``None``."""
+    if timeout is None and deadline is None:
+        return token
+    if token is not None:
+        raise ValueError('Give either a cancel token, or a timeout '
+                         'and deadline, but not both.')
+    return CancelToken(timeout, deadline)
+
+
+def save(filename: str,
+         timeout: float = None,
+         deadline: float = None,
+         token: CancelToken = None):
     """
     Save the entire document (including preamble) to the given file.
 
+    If the render is cancelled, or passes its deadline,
+    ``RenderCancelled`` is raised, and the file is left untouched.
+
     filename : str
         The name of the file to save to.
         .. warning:
            Will overwrite existing files under the same name.
+    timeout, deadline : float or None
+        The time allowed for the render, as for ``CancelToken``.
+    token : CancelToken or None
+        A token with which to cancel the render.
     """
-    _CONTEXT.save(filename)
+    token = _cancel_token(timeout, deadline, token)
+    if token is None:
+        _CONTEXT.save(filename)
+        return
+    import os
+    temporary = '{}.{}.tmp'.format(filename, os.getpid())
+    try:
+        with token:
+            _CONTEXT.save(temporary)
+    except BaseException:
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
+        raise
+    os.replace(temporary, filename)
+
+
+def save_split(directory: str, main: str = 'main') -> list:
+    r"""
+    Save the document to a main file, and one ``\include`` file per chapter.
 
+    Only files whose content changed are written.
+    Returns the paths of the files written.
+    See ``simpletex.split``.
 
-def dump() -> str:
-    """Return the entire document (including preamble) as a string."""
-    return str(_CONTEXT.preamble)
+    directory : str
+        The directory to save the files in.
+    main : str
+        The name of the main file, without the ``.tex`` extension.
+    """
+    from simpletex.split import save_split
+    return save_split(directory, main)
+
+
+def dump(timeout: float = None,
+         deadline: float = None,
+         token: CancelToken = None) -> str:
+    """
+    Return the entire document (including preamble) as a string.
+
+    If the render is cancelled, or passes its deadline,
+    ``RenderCancelled`` is raised, and the document is left unchanged.
+
+    timeout, deadline : float or None
+        The time allowed for the render, as for ``CancelToken``.
+    token : CancelToken or None
+        A token with which to cancel the render.
+    """
+    token = _cancel_token(timeout, deadline, token)
+    if token is None:
+        return str(_CONTEXT.preamble)
+    with token:
+        return str(_CONTEXT.preamble)
+
+
+def render(builder, select=None, backend: str = 'latex') -> str:
+    """
+    Build a document in isolation, returning its text.
+
+    The current document is left untouched.
+    Sections outside the selection are skipped: their deferred bodies
+    (see ``Section.build``) are never run, and anything written
+    within them is discarded, without being formatted.
+    Text outside all sections is always rendered.
+
+    .. code-block:: python
+
+        text = render(write_report, select=['Results', 'Appendix/Tables'])
+
+    builder : callable
+        Called with no arguments; writes the document.
+    select : iterable of str or None
+        The path of each section to render, made of the titles of the
+        section and its enclosing sections, separated by ``/``.
+        Sections enclosing a selected section are also rendered.
+        If ``None``, render all sections.
+    backend : str
+        ``'latex'``, or ``'html'`` or ``'markdown'`` to render a preview
+        of the document body (see ``simpletex.preview``).
+    """
+    context = _GlobalContextManager()
+    context.select(select)
+    context.set_backend(backend)
+    with context:
+        builder()
+    if context.backend is not None:
+        return str(context.preamble.body)
+    return context.render()
 
 
 def clear():
     """Clear everything from the entire document."""
     _CONTEXT.clear()
+
+
+def fork():
+    """
+    Snapshot the current document into a copy-on-write fork.
+
+    Use the fork as a context manager to write a variant of the document
+    sharing everything written so far, then call ``render`` on it to
+    obtain the variant with all open contexts closed.
+    Shared text is rendered once, however many forks are rendered.
+
+    .. code-block:: python
+
+        with Document():
+            write_shared_sections()
+            for customer in customers:
+                with fork() as variant:
+                    write(customer)
+                texts.append(variant.render())
+    """
+    return _CONTEXT.fork()
@@ -6,7 +6,7 @@ This module contains useful utilities to build higher-level formatters.
 """
 
 
-from simpletex.core import Text, Formatter
+from simpletex.core import Text, Formatter, join_lines
 from simpletex.formatting.core import Indent
 
 __all__ = ('Command')
@@ -54,6 +54,13 @@ class Command(Text):
 
     def __str__(self):
         """Format the command as LaTeX."""
+        text = self._text
+        args, kwargs = text['options']
+        if not args and not kwargs:
+            # Fast path, skipping option formatting
+            return '\\{}{}'.format(text['name'],
+                                 ''.join('{{{}}}'.format(argument)
+                                         for argument in text['arguments']))
         return r'\{}{}{}'.format(self.name,
                                  OptionFormatter()(*self.options[0],
                                                    **self.options[1]),
@@ -77,6 +84,4 @@ class Environment(Formatter):
             error_string = 'No name specified for {}.'
             class_name = self.__class__.__name__
             raise ValueError(error_string.format(class_name)) from e
-        return '\n'.join(map(str, [self.header,
-                                   Indent()(text),
-                                   self.footer]))
+        return join_lines([self.header, Indent()(text), self.footer])
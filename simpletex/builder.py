@@ -0,0 +1,248 @@
+r"""
+This module provides a functional API to build LaTeX without context managers.
+
+Each function returns a ``Node``, which can be written with ``write``
+or passed as a child to other functions:
+
+.. code-block:: python
+
+    from simpletex import write
+    from simpletex import builder as E
+
+    write(E.section('Results',
+                    'Some text.',
+                    E.itemize([E.bold('first'), 'second']),
+                    E.columns('Two columns.')))
+
+Unlike formatters used as context managers, building a node
+never touches the global context stack, and text is formatted
+as soon as the node is built.
+Packages required by a node and its children are merged into the node,
+and imported into the document the node is written to.
+
+..  :copyright: (c) 2016 by Samuel Li.
+    :license: GNU GPLv3, see License for more details.
+"""
+
+import simpletex
+from simpletex import usepackage
+from simpletex.core import _Importing
+
+__all__ = ('Node', 'command', 'environment',
+           'bold', 'italics', 'underline', 'small_caps', 'emphasis',
+           'section', 'subsection', 'centering', 'columns',
+           'itemize', 'enumerate', 'description', 'equation')
+
+
+class Node(_Importing):
+    """
+    A formatted piece of LaTeX, with the packages it requires.
+
+    Writing a node with ``write`` or ``write_many`` imports its packages
+    into the current document.
+    Nodes formatted by other means, such as formatters,
+    must have their packages imported with ``usepackage``.
+    """
+
+    __slots__ = ('text', 'packages')
+
+    def __init__(self, text: str, packages=None):
+        """
+        Create a node from already formatted text.
+
+        text : str
+            The formatted LaTeX.
+        packages : dict or None
+            Maps the name of each required package to a pair of
+            package options and keyword options, as for ``usepackage``.
+        """
+        self.text = text
+        self.packages = packages
+
+    def __str__(self):
+        """Return the node's text."""
+        return self.text
+
+    def _import(self):
+        """Import the required packages into the current document."""
+        if self.packages:
+            for name, (args, kwargs) in self.packages.items():
+                usepackage(name, *args, **kwargs)
+
+    def __repr__(self):
+        """Display the node's text and required packages."""
+        return '{}({!r}, {!r})'.format(self.__class__.__name__,
+                                       self.text, self.packages)
+
+
+def _text(child) -> str:
+    """Return the text of a node or other child, without side effects."""
+    if isinstance(child, Node):
+        return child.text
+    return str(child)
+
+
+def _merge(children, packages=None):
+    """
+    Merge the packages required by the given children into one mapping.
+
+    The mappings of existing nodes are never modified, and may be shared.
+    """
+    packages = dict(packages) if packages else None
+    for child in children:
+        if isinstance(child, Node) and child.packages:
+            if packages is None:
+                packages = {}
+            for name, options in child.packages.items():
+                packages.setdefault(name, options)
+    return packages
+
+
+def _block(children) -> str:
+    """Join children into lines, indented if output is pretty."""
+    return _indent('\n'.join(map(_text, children)))
+
+
+def _indent(text: str) -> str:
+    if simpletex._pretty():
+        text = '\n'.join('\t' + line if line else line
+                         for line in text.split('\n'))
+    return text
+
+
+def _arguments(arguments) -> str:
+    return ''.join('{{{}}}'.format(_text(argument)) for argument in arguments)
+
+
+def command(name: str, *arguments) -> Node:
+    r"""
+    Build a LaTeX command, such as ``\textbf{text}``.
+
+    arguments
+        The arguments of the command, formatted with curly braces.
+    """
+    return Node('\\{}{}'.format(name, _arguments(arguments)),
+                _merge(arguments))
+
+
+def environment(name: str, *children, arguments=(), packages=None) -> Node:
+    r"""
+    Build a LaTeX environment, with each child on its own line.
+
+    arguments : list
+        Arguments placed after ``\begin{name}``.
+    packages : dict or None
+        Packages required by the environment itself, as for ``Node``.
+    """
+    return Node(_environment(name, arguments, _block(children)),
+                _merge(children, packages))
+
+
+def _environment(name: str, arguments, text: str) -> str:
+    return '\\begin{{{}}}{}\n{}\n\\end{{{}}}'.format(
+        name, _arguments(arguments), text, name)
+
+
+def _span(name: str, text) -> Node:
+    """Build a command with a single argument; a fast path for styles."""
+    if isinstance(text, Node):
+        return Node('\\{}{{{}}}'.format(name, text.text), text.packages)
+    return Node('\\{}{{{}}}'.format(name, text))
+
+
+def bold(text) -> Node:
+    """Apply bold formatting to the given text."""
+    return _span('textbf', text)
+
+
+def italics(text) -> Node:
+    """Italicize the given text."""
+    return _span('textit', text)
+
+
+def underline(text) -> Node:
+    """Underline the given text."""
+    return _span('underline', text)
+
+
+def small_caps(text) -> Node:
+    """Format the given text in small caps."""
+    return _span('textsc', text)
+
+
+def emphasis(text) -> Node:
+    """Emphasize the given text."""
+    return _span('emph', text)
+
+
+def section(title, *children) -> Node:
+    """Build a section with the given title, containing each child."""
+    return _title('section', title, children)
+
+
+def subsection(title, *children) -> Node:
+    """Build a subsection with the given title, containing each child."""
+    return _title('subsection', title, children)
+
+
+def _title(command_name: str, title, children) -> Node:
+    heading = _span(command_name, title)
+    return Node('{}\n{}'.format(heading.text, _block(children)),
+                _merge(children, heading.packages))
+
+
+def centering(*children) -> Node:
+    """Center each child."""
+    return environment('center', *children)
+
+
+def columns(*children, number: int = 2) -> Node:
+    """Format children into the given number of columns."""
+    arguments = () if number == 2 else (number,)
+    return environment('multicols', *children, arguments=arguments,
+                       packages={'multicol': ((), {})})
+
+
+def itemize(items) -> Node:
+    """Build a bulleted list, with one entry per item."""
+    return _item_list('itemize', items)
+
+
+def enumerate(items) -> Node:
+    """Build a numbered list, with one entry per item."""
+    return _item_list('enumerate', items)
+
+
+def description(pairs) -> Node:
+    """
+    Build a description list.
+
+    pairs : mapping or iterable of pairs
+        The key and value of each entry.
+    """
+    if hasattr(pairs, 'items'):
+        pairs = pairs.items()
+    pairs = list(pairs)
+    lines = '\n'.join('\\item[{}] {}'.format(_text(key), _text(value))
+                      for key, value in pairs)
+    return Node(_environment('description', (), _indent(lines)),
+                _merge(value for pair in pairs for value in pair))
+
+
+def _item_list(name: str, items) -> Node:
+    items = list(items)
+    lines = '\n'.join('\\item {}'.format(_text(item)) for item in items)
+    return Node(_environment(name, (), _indent(lines)), _merge(items))
+
+
+def equation(*parts, inline: bool = True) -> Node:
+    """
+    Build an equation, joining the given parts with equals signs.
+
+    inline : bool
+        If ``True``, use the inline (``$``) syntax.
+        If ``False``, use the display-style (``$$``) syntax.
+    """
+    symbol = '$' if inline else '$$'
+    return Node('{}{}{}'.format(symbol, ' = '.join(map(_text, parts)), symbol),
+                _merge(parts))
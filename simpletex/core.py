@@ -5,7 +5,9 @@ This module provides base classes forming the core of simpletex.
     :license: GNU GPLv3, see License for more details.
 """
 
-from collections import defaultdict, OrderedDict
+import time
+from _thread import _local
+from itertools import chain, islice
 
 import simpletex
 
@@ -25,17 +27,26 @@ class Formatter:
         if not args and not kwargs:
             error_string = "Can't re-instantiate an instance of {}."
             raise TypeError(error_string.format(self.__class__.__name__))
-        else:
-            return self._format_text(*args, **kwargs)
+        backend = simpletex._CONTEXT.backend
+        if backend is not None:
+            return backend.format(self, *args, **kwargs)
+        return self._format_text(*args, **kwargs)
 
     # Should be overridden by subclasses
     @staticmethod
     def _format_text(text) -> str:
         return str(text)
 
+    _spills = False
+    """
+    Whether text written within the context manager may be spilled to disk.
+
+    Only enabled for formatters which render the written text as a whole.
+    """
+
     def __enter__(self):
         """Add self to the global context stack."""
-        simpletex._CONTEXT.push(Paragraph())
+        simpletex._CONTEXT.push(Paragraph(self._spills), self)
 
     def __exit__(self, *args):
         """
@@ -62,7 +73,7 @@ class Text:
 
     def __init__(self):
         """Initialize the text body."""
-        super().__setattr__('_text', defaultdict(lambda: ''))
+        super().__setattr__('_text', {})
         super().__setattr__('_order', [])
 
     def __getattr__(self, name: str):
@@ -75,7 +86,7 @@ class Text:
         """
         if name not in self:
             self._order.append(name)
-        return self._text[name]
+        return self._text.setdefault(name, '')
 
     def __setattr__(self, name, value):
         """Write a line of text under the given name."""
@@ -85,12 +96,32 @@ class Text:
 
     def __contains__(self, item):
         """Determine if a given line name exists in the text body."""
-        return item in self._order
+        return item in self._text
 
     def __iter__(self):
         """Iterate over the text in the text body."""
         return (self._text[line] for line in self._order)
 
+    def __getstate__(self):
+        """Return the state of the text body, for pickling."""
+        return self.__dict__
+
+    def __setstate__(self, state):
+        """Restore the state of the text body, when unpickling."""
+        self.__dict__.update(state)
+
+    def fork(self):
+        """
+        Return a copy of the text body that can be modified independently.
+
+        Nested paragraphs, registries, and text bodies are forked as well.
+        """
+        clone = self.__class__.__new__(self.__class__)
+        text = {name: _fork(value) for name, value in self._text.items()}
+        super(Text, clone).__setattr__('_text', text)
+        super(Text, clone).__setattr__('_order', list(self._order))
+        return clone
+
     def __repr__(self):
         """Show the instance's class name and the names of its text lines."""
         return "{}{}".format(self.__class__.__name__, self._order)
@@ -112,29 +143,205 @@ class Text:
 class Paragraph:
     """Acts as a body of text, with newline characters between each segment."""
 
-    def __init__(self):
-        """Initialize an empty paragraph."""
+    spill_threshold = None
+    """
+    Number of buffered characters above which a spilling paragraph
+    moves its text segments to a temporary file.
+
+    If ``None``, text is never spilled.
+    """
+
+    spill_count = 0
+    """Number of times any paragraph has spilled text to disk."""
+
+    spill_bytes = 0
+    """Total number of bytes spilled to disk by all paragraphs."""
+
+    def __init__(self, spill: bool = False):
+        """
+        Initialize an empty paragraph.
+
+        spill : bool
+            If true, segments are rendered as they are written,
+            and moved to a temporary file once more than
+            ``spill_threshold`` characters are buffered.
+            Only suitable for paragraphs which are rendered as a whole,
+            rather than segment by segment.
+        """
         super().__init__()
+        self._prefix = None
+        self._spilled = None
         self._text = []
+        self._spill = spill
+        self._buffered = 0
+        self._deferred = False
+        self._lazy = False
 
     def __iter__(self):
         """Iterate over the text segments."""
-        return iter(self._text)
+        if self._lazy:
+            self._consume()
+        if self._prefix is None and self._spilled is None:
+            return iter(self._text)
+        return chain(self._prefix or (), self._spilled or (), self._text)
 
     def __len__(self):
         """Return the number of text segments stored."""
-        return len(self._text)
+        if self._lazy:
+            self._consume()
+        length = len(self._text)
+        if self._prefix is not None:
+            length += len(self._prefix)
+        if self._spilled is not None:
+            length += len(self._spilled)
+        return length
+
+    @property
+    def spilled(self) -> bool:
+        """Whether any of the paragraph's text is held on disk."""
+        return (self._spilled is not None or self._deferred or
+                (self._prefix is not None and self._prefix.spilled))
 
     def write(self, *args, **kwargs):
         """Append the given text segment or parameters to the paragraph."""
-        if len(args) == 1:
-            self._text.append(args[0])
+        segment = args[0] if len(args) == 1 else args
+        if _is_deferred(segment):
+            self._deferred = True
+        elif self._spill and self.spill_threshold is not None:
+            segment = str(segment)
+            self._buffered += len(segment)
+        self._text.append(segment)
+        if self._spill and self.spill_threshold is not None:
+            if self._buffered > self.spill_threshold:
+                self._spill_text()
+
+    def extend(self, segments, lazy: bool = False):
+        """
+        Append each of the given text segments to the paragraph.
+
+        Equivalent to writing each segment in turn, in a single call.
+
+        segments : iterable
+            The text segments to append.
+        lazy : bool
+            If true, the iterable is only consumed once the paragraph
+            is first read or rendered, rather than immediately.
+            Ignored by paragraphs which may spill to disk.
+        """
+        if self._spill and self.spill_threshold is not None:
+            for segment in segments:
+                self.write(segment)
+        elif lazy:
+            self._text.append(_LazySegments(segments))
+            self._lazy = True
         else:
-            self._text.append(args)
+            segments = list(segments)
+            if not self._deferred and any(map(_is_deferred, segments)):
+                self._deferred = True
+            self._text.extend(segments)
+
+    def _consume(self):
+        """Replace lazily extended iterables with their segments."""
+        self._lazy = False
+        text = self._text
+        self._text = []
+        for segment in text:
+            if isinstance(segment, _LazySegments):
+                self.extend(segment.segments)
+            else:
+                self._text.append(segment)
+
+    def _spill_text(self):
+        """Move all buffered text segments to the paragraph's spill file."""
+        if self._spilled is None:
+            self._spilled = _SpillFile()
+        Paragraph.spill_bytes += self._spilled.extend(self._text)
+        Paragraph.spill_count += 1
+        self._text = []
+        self._buffered = 0
+        self._deferred = False
+
+    def fork(self):
+        """
+        Return a copy-on-write copy of the paragraph.
+
+        The segments written so far are frozen into a prefix shared by
+        both paragraphs, which is rendered at most once.
+        Text written afterwards to either paragraph is not seen by the other.
+        """
+        if self._lazy:
+            self._consume()
+        if self._text or self._spilled is not None:
+            self._prefix = _SharedParagraph(self._prefix, self._spilled,
+                                            self._text)
+            self._spilled = None
+            self._text = []
+            self._buffered = 0
+            self._deferred = False
+        clone = Paragraph(self._spill)
+        clone._prefix = self._prefix
+        return clone
+
+    def render(self, transform=str, lazy: bool = False) -> str:
+        """
+        Apply ``transform`` to each text segment, joining with newlines.
+
+        transform : callable
+            Converts a single text segment to a string.
+            Must be deterministic, as renderings of a shared prefix
+            are cached under the given transform.
+            Must also work line by line (as ``Indent`` does),
+            as spilled text is transformed one line at a time.
+        lazy : bool
+            If true, return an object rendering the paragraph only once
+            converted to a string or streamed.
+        """
+        if lazy:
+            return _Rendering(self, transform)
+        if self._lazy:
+            self._consume()
+        parts = []
+        if self._prefix is not None and len(self._prefix):
+            parts.append(self._prefix.render(transform))
+        if self._spilled is not None:
+            parts.extend(map(transform, checkpoints(self._spilled.lines())))
+        parts.extend(map(transform, checkpoints(self._text)))
+        return '\n'.join(parts)
+
+    def stream(self, write, transform=str):
+        """
+        Render the paragraph piece by piece, passing each piece to ``write``.
+
+        Spilled text is read back from disk a line at a time,
+        so the paragraph is never held in memory as a whole.
+
+        write : callable
+            Called with each rendered piece of text, in order.
+        transform : callable
+            As for ``render``.
+        """
+        if self._lazy:
+            self._consume()
+        separator = ''
+        if self._prefix is not None and len(self._prefix):
+            self._prefix.stream(write, transform)
+            separator = '\n'
+        if self._spilled is not None:
+            for line in checkpoints(self._spilled.lines()):
+                write(separator)
+                write(transform(line))
+                separator = '\n'
+        for segment in checkpoints(self._text):
+            write(separator)
+            if _is_deferred(segment):
+                segment.stream(write, transform)
+            else:
+                write(transform(segment))
+            separator = '\n'
 
     def __str__(self):
         """Return all text segments, joined with newlines."""
-        return '\n'.join(map(str, self))
+        return self.render()
 
     def __enter__(self):
         """Raise an error; cannot be used as a context manager."""
@@ -146,6 +353,165 @@ class Paragraph:
         pass
 
 
+class _SharedParagraph(Paragraph):
+    """An immutable run of segments shared between forked paragraphs."""
+
+    def __init__(self, prefix, spilled, text):
+        super().__init__()
+        self._prefix = prefix
+        self._spilled = spilled
+        self._text = tuple(text)
+        self._deferred = any(map(_is_deferred, self._text))
+        self._renderings = {}
+
+    def write(self, *args, **kwargs):
+        error_string = "Can't write to a shared {}."
+        raise TypeError(error_string.format(Paragraph.__name__))
+
+    def render(self, transform=str, lazy: bool = False) -> str:
+        if lazy:
+            return super().render(transform, lazy)
+        try:
+            return self._renderings[transform]
+        except KeyError:
+            rendering = super().render(transform)
+            self._renderings[transform] = rendering
+            return rendering
+
+    def stream(self, write, transform=str):
+        if transform in self._renderings:
+            write(self._renderings[transform])
+        else:
+            super().stream(write, transform)
+
+
+class _DiscardedParagraph(Paragraph):
+    """A paragraph which ignores all text written to it."""
+
+    def write(self, *args, **kwargs):
+        pass
+
+    def extend(self, segments, lazy: bool = False):
+        pass
+
+
+class _LazySegments:
+    """An iterable of segments, consumed once its paragraph is read."""
+
+    __slots__ = ('segments',)
+
+    def __init__(self, segments):
+        self.segments = segments
+
+
+class _SpillFile:
+    """
+    Rendered text segments held in a temporary file.
+
+    The file is only open while it is written or read,
+    so that any number of paragraphs may spill.
+    """
+
+    def __init__(self):
+        # Only needed once text is spilled, so imported here
+        import os
+        import tempfile
+        import weakref
+        from array import array
+        descriptor, self._path = tempfile.mkstemp(prefix='simpletex-')
+        os.close(descriptor)
+        weakref.finalize(self, os.remove, self._path)
+        self._lengths = array('Q')
+
+    def __len__(self):
+        return len(self._lengths)
+
+    def extend(self, segments) -> int:
+        """Write segments to the end of the file, returning their size."""
+        total = 0
+        with open(self._path, 'ab') as f:
+            for segment in segments:
+                size = 0
+
+                def write(text):
+                    nonlocal size
+                    data = text.encode('utf-8')
+                    f.write(data)
+                    size += len(data)
+
+                if _is_deferred(segment):
+                    segment.stream(write)
+                else:
+                    write(segment)
+                write('\n')
+                self._lengths.append(size)
+                total += size
+        return total
+
+    def __iter__(self):
+        """Iterate over the stored segments."""
+        with open(self._path, 'rb') as f:
+            for length in self._lengths:
+                yield f.read(length)[:-1].decode('utf-8')
+
+    def lines(self):
+        """Iterate over the lines of the stored text."""
+        end = sum(self._lengths)
+        with open(self._path, 'rb') as f:
+            while f.tell() < end:
+                yield f.readline()[:-1].decode('utf-8')
+
+
+class _Rendering:
+    """A paragraph rendered lazily with a line-wise transform."""
+
+    def __init__(self, paragraph: Paragraph, transform):
+        self._paragraph = paragraph
+        self._transform = transform
+
+    def __str__(self):
+        return self._paragraph.render(self._transform)
+
+    def stream(self, write, transform=str):
+        transform_line = self._transform
+        if transform is not str:
+            def transform_line(line, inner=self._transform):
+                return transform(inner(line))
+        self._paragraph.stream(write, transform_line)
+
+
+class _Importing:
+    """A text segment which imports packages once written to a document."""
+
+    __slots__ = ()
+
+    def _import(self):
+        """Import the segment's packages into the current document."""
+        raise NotImplementedError
+
+
+def _is_deferred(segment) -> bool:
+    """Determine if a segment must be streamed rather than rendered."""
+    return (isinstance(segment, _Rendering) or
+            (isinstance(segment, Paragraph) and segment.spilled))
+
+
+def join_lines(parts):
+    """
+    Join the given parts with newlines.
+
+    If any part holds spilled text, a paragraph of the parts is returned
+    instead, so that the text can be streamed rather than copied.
+    """
+    parts = list(parts)
+    if not any(map(_is_deferred, parts)):
+        return '\n'.join(map(str, parts))
+    paragraph = Paragraph()
+    for part in parts:
+        paragraph.write(part)
+    return paragraph
+
+
 class Registry:
     """
     Manages a single section in the document preamble.
@@ -158,7 +524,8 @@ class Registry:
     def __init__(self):
         """Create an empty ``Registry``."""
         super().__init__()
-        self._entries = OrderedDict()
+        # Plain dicts preserve insertion order
+        self._entries = {}
 
     def __iter__(self):
         """Iterate over the keys in the registry."""
@@ -172,6 +539,13 @@ class Registry:
         """Return the number of registry entries."""
         return len(self._entries)
 
+    def fork(self):
+        """Return a copy of the registry that can be modified independently."""
+        clone = self.__class__.__new__(self.__class__)
+        clone.__dict__.update(self.__dict__)
+        clone._entries = dict(self._entries)
+        return clone
+
     def items(self):
         """Return an iterator over the key-entry pairs in the registry."""
         return self._entries.items()
@@ -198,3 +572,125 @@ class Registry:
         """
         return '\n'.join(str(self._entry_line(key, value))
                          for key, value in self.items())
+
+
+def _fork(value):
+    """Fork the given value if it is a simpletex container."""
+    if isinstance(value, (Text, Paragraph, Registry)):
+        return value.fork()
+    return value
+
+
+class RenderCancelled(Exception):
+    """
+    Raised when a render is cancelled with ``CancelToken.cancel``.
+
+    progress : int
+        The number of segments, items and rows rendered before
+        the render was stopped, counted in whole chunks.
+    """
+
+    _message = 'Render cancelled after {} items.'
+
+    def __init__(self, progress: int):
+        super().__init__(self._message.format(progress))
+        self.progress = progress
+
+
+class RenderTimeout(RenderCancelled):
+    """Raised when a render passes the deadline of its ``CancelToken``."""
+
+    _message = 'Render deadline passed after {} items.'
+
+
+class CancelToken:
+    """
+    Stops renders once cancelled, or once a deadline passes.
+
+    Rendering loops check the active token before each chunk of
+    ``chunk`` segments, list items or matrix rows, and raise
+    ``RenderCancelled`` or ``RenderTimeout`` once it is expired.
+    A token is activated in the current thread by using it as a
+    context manager, or by passing it to ``dump`` or ``save``;
+    it may be cancelled from any thread.
+
+    .. code-block:: python
+
+        token = CancelToken(timeout=2)
+        with token:
+            build_document()
+        text = dump(token=token)
+    """
+
+    chunk = 1024
+    """Number of items rendered between checks."""
+
+    def __init__(self, timeout: float = None, deadline: float = None):
+        """
+        Create a token, expiring at the earliest of the given times.
+
+        timeout : float or None
+            The number of seconds from now after which the token expires.
+        deadline : float or None
+            The ``time.monotonic`` time at which the token expires.
+        """
+        if timeout is not None:
+            expiry = time.monotonic() + timeout
+            deadline = expiry if deadline is None else min(deadline, expiry)
+        self.deadline = deadline
+        self.cancelled = False
+        self.progress = 0
+        """Number of items rendered so far, counted in whole chunks."""
+        self._previous = []
+
+    def cancel(self):
+        """Stop any render checking the token."""
+        self.cancelled = True
+
+    def check(self):
+        """Raise an exception if the token is cancelled or expired."""
+        if self.cancelled:
+            raise RenderCancelled(self.progress)
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            raise RenderTimeout(self.progress)
+
+    def checkpoints(self, iterable):
+        """Yield each item, checking the token before each chunk."""
+        iterator = iter(iterable)
+        while True:
+            self.check()
+            chunk = tuple(islice(iterator, self.chunk))
+            if not chunk:
+                return
+            yield from chunk
+            self.progress += len(chunk)
+
+    def __enter__(self):
+        """Check this token while rendering in the current thread."""
+        self._previous.append(_ACTIVE.token)
+        _ACTIVE.token = self
+        return self
+
+    def __exit__(self, *args):
+        _ACTIVE.token = self._previous.pop()
+
+
+class _ActiveToken(_local):
+    token = None
+    """The cancel token checked by renders in the current thread."""
+
+
+_ACTIVE = _ActiveToken()
+
+
+def checkpoints(iterable):
+    """
+    Iterate over the given items, checking the active cancel token.
+
+    Returns the iterable unchanged if no token is active.
+    Rendering loops over many items should iterate through this.
+    """
+    token = _ACTIVE.token
+    if token is None:
+        return iterable
+    return token.checkpoints(iterable)
@@ -7,6 +7,7 @@ This module provides utilities to define a document's basic structure.
 
 import simpletex
 from simpletex import usepackage, add_registry
+from simpletex.core import join_lines, _DiscardedParagraph
 from simpletex.base import Environment, Command
 from simpletex.formatting import Style
 from simpletex.formatting.core import Indent
@@ -25,6 +26,8 @@ class Document(Environment):
     The preamble is managed by the `simpletex.Preamble` class.
     """
 
+    _spills = True
+
     def __init__(self, document_class: str = 'article', size: str = '12pt'):
         """
         Create an empty document using the given document class and font size.
@@ -43,19 +46,62 @@ class Document(Environment):
 
 class Title(Environment):
     heading = Style(inline=True)
+    _spills = True
 
     def __init__(self, command_name: str, name: str):
         super().__init__()
+        self.title = name
         self._heading = Command(command_name, [name])
         add_registry('titleFormat', TitleFormatRegistry())
 
+    @property
+    def path(self) -> tuple:
+        """The titles of the open sections, outermost first, and this one."""
+        return tuple(formatter.title
+                     for formatter in simpletex._CONTEXT.formatterStack
+                     if isinstance(formatter, Title)) + (self.title,)
+
+    @property
+    def selected(self) -> bool:
+        """Whether the section is to be rendered; see ``simpletex.render``."""
+        context = simpletex._CONTEXT
+        return context.selection is None or context.selected(self.path)
+
+    def __enter__(self):
+        """Open the section, discarding its text if not selected."""
+        if self.selected:
+            super().__enter__()
+        else:
+            simpletex._CONTEXT.push(_DiscardedParagraph(), self)
+
+    def __exit__(self, *args):
+        if isinstance(simpletex._CONTEXT.top, _DiscardedParagraph):
+            simpletex._CONTEXT.pop()
+        else:
+            super().__exit__(*args)
+
+    def build(self, builder, *args, **kwargs):
+        """
+        Write the section by calling the given builder within it.
+
+        If the section is not selected, the builder is not called,
+        and nothing is written.
+
+        builder : callable
+            Writes the body of the section.
+        args, kwargs
+            Passed to the builder.
+        """
+        if self.selected:
+            with self:
+                builder(*args, **kwargs)
+
     def _format_text(self, text) -> str:
         if self.heading:
             usepackage('titlesec')
             simpletex._CONTEXT.titleFormat.register(self.command_name,
                                                     self.heading)
-        return '\n'.join(map(str, [self._heading,
-                                   Indent()(text)]))
+        return join_lines([self._heading, Indent()(text)])
 
     @property
     def command_name(self) -> str:
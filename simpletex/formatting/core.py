@@ -5,7 +5,8 @@ This module provides useful low-level formatting utilities.
     :license: GNU GPLv3, see License for more details.
 """
 
-from simpletex.core import Formatter
+import simpletex
+from simpletex.core import Formatter, Paragraph
 
 __all__ = ('Indent',)
 
@@ -19,9 +20,23 @@ class Indent(Formatter):
 
         The text is split by line feed characters,
         and each line is then indented individually.
+        Paragraphs are indented segment by segment, so that
+        indentation of a prefix shared between forks is reused.
+        Spilled paragraphs are indented lazily, as they are streamed.
+        If ``simpletex.pretty`` is false, the text is left as is.
         """
+        if not simpletex._pretty():
+            if isinstance(text, Paragraph):
+                return text.render(lazy=text.spilled)
+            return str(text)
+        if isinstance(text, Paragraph):
+            return text.render(self._indent, lazy=text.spilled)
+        return self._indent(text)
+
+    @staticmethod
+    def _indent(text) -> str:
         lines = str(text).split('\n')
-        return '\n'.join(map(self._tab_line, lines))
+        return '\n'.join(map(Indent._tab_line, lines))
 
     @staticmethod
     def _tab_line(text: str) -> str:
@@ -18,6 +18,8 @@ class Centering(Environment):
     Equivalent to the LaTeX ``center`` environment.
     """
 
+    _spills = True
+
     def __init__(self, inline: bool = False):
         r"""
         Create a new centering formatter.
@@ -44,6 +46,8 @@ class Columns(Environment):
     Equivalent to the LaTeX ``multicols`` environment.
     """
 
+    _spills = True
+
     def __init__(self, number: int = 2):
         """
         Create a new ``multicols`` environment.
@@ -0,0 +1,72 @@
+"""
+This module provides named styles, defined once in the document preamble.
+
+..  :copyright: (c) 2016 by Samuel Li.
+    :license: GNU GPLv3, see License for more details.
+"""
+
+import simpletex
+from simpletex import add_registry, alias
+from simpletex.core import Formatter
+from simpletex.base import Command, Environment
+from simpletex.registry.core import EnvironmentDefinitionRegistry
+
+__all__ = ('NamedStyle',)
+
+
+class NamedStyle(Formatter):
+    r"""
+    Applies a formatter through a macro defined in the document preamble.
+
+    The first time the style is used in a document, the formatting
+    is expanded once into a ``\newcommand`` (or, for block styles,
+    a ``\newenvironment``) definition.
+    Each use then only emits a short call to the macro,
+    instead of repeating the full formatting.
+    """
+
+    def __init__(self, name: str, style: Formatter, block: bool = False):
+        r"""
+        Create a new named style.
+
+        name : str
+            The name of the macro or environment to define.
+            Must consist only of letters.
+        style : Formatter
+            The formatting to apply, typically a ``Style``.
+        block : bool
+            If true, define an environment rather than a command.
+            The style must then be inline (such as ``Style(inline=True)``),
+            as its formatting is applied as declarations
+            at the start of the environment.
+        """
+        super().__init__()
+        if not isinstance(style, Formatter):
+            error_string = '{} is not a Formatter.'
+            raise TypeError(error_string.format(style.__class__.__name__))
+        self.name = name
+        self.style = style
+        self.block = block
+
+    def _define(self):
+        """Define the style in the current document, if not yet defined."""
+        if self.block:
+            add_registry('environmentDefinitions',
+                         EnvironmentDefinitionRegistry())
+            registry = simpletex._CONTEXT.environmentDefinitions
+            if self.name not in registry:
+                registry.register(self.name, (self.style(''), ''))
+        elif self.name not in simpletex._CONTEXT.commandDefinitions:
+            alias(self.name, self.style('#1'), 1)
+
+    def _format_text(self, text) -> str:
+        self._define()
+        if self.block:
+            return Environment(self.name)(text)
+        return Command(self.name, [text])
+
+    def __repr__(self):
+        """Display the name and the underlying style."""
+        return '{}({}, {!r})'.format(self.__class__.__name__,
+                                     self.name,
+                                     self.style)
@@ -0,0 +1,230 @@
+r"""
+This module provides figures, and a store for the images they include.
+
+Images are copied into a content-addressed directory, once per distinct
+file content, and referenced from the document by their hashed path.
+Copying happens in the background, in a thread pool:
+
+.. code-block:: python
+
+    with AssetManager('build/assets') as assets:
+        with Figure(caption='Quarterly sales', label='sales'):
+            write(assets.include('charts/sales.png', width=r'\textwidth'))
+
+Each asset is hashed once; the hashes are cached in a manifest
+in the store, by path, size and modification time.
+Running a batch again therefore only reads the metadata of unchanged files.
+
+..  :copyright: (c) 2016 by Samuel Li.
+    :license: GNU GPLv3, see License for more details.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+from simpletex import usepackage
+from simpletex.base import Command, Environment
+
+__all__ = ('Figure', 'AssetManager', 'include_graphics')
+
+_CHUNK_SIZE = 1 << 20
+"""Number of bytes read at once when hashing a file."""
+
+_MANIFEST = 'manifest.json'
+"""Name of the hash cache stored in the asset directory."""
+
+
+def include_graphics(path: str, *args, **kwargs) -> Command:
+    r"""
+    Return an ``\includegraphics`` command for the given image.
+
+    Automatically imports the required package ``graphicx``.
+
+    path : str
+        The path of the image, as seen from the document.
+    args, kwargs
+        Options for the command, such as ``width=r'\textwidth'``.
+    """
+    usepackage('graphicx')
+    return Command('includegraphics', [path], *args, **kwargs)
+
+
+class Figure(Environment):
+    """
+    Formats contents as a floating figure, with an optional caption.
+
+    Equivalent to the LaTeX ``figure`` environment.
+    """
+
+    def __init__(self,
+                 caption: str = None,
+                 label: str = None,
+                 placement: str = None,
+                 centered: bool = True):
+        """
+        Create an empty figure.
+
+        caption : str or None
+            The caption of the figure.
+        label : str or None
+            The label of the figure, to be referenced with ``\\ref``.
+        placement : str or None
+            The placement specifier of the float, such as ``'htbp'``.
+        centered : bool
+            If true, center the contents of the figure.
+        """
+        super().__init__('figure')
+        if placement is not None:
+            self.header = '{}[{}]'.format(self.header, placement)
+        self.caption = caption
+        self.label = label
+        self.centered = centered
+
+    def _format_text(self, text) -> str:
+        lines = []
+        if self.centered:
+            lines.append(Command('centering'))
+        lines.append(text)
+        if self.caption is not None:
+            lines.append(Command('caption', [self.caption]))
+        if self.label is not None:
+            lines.append(Command('label', [self.label]))
+        return super()._format_text('\n'.join(map(str, lines)))
+
+
+class AssetManager:
+    """Stores asset files once each, in a content-addressed directory."""
+
+    def __init__(self,
+                 directory: str,
+                 prefix: str = None,
+                 workers: int = None,
+                 link: bool = False):
+        """
+        Create an asset manager, storing assets in the given directory.
+
+        directory : str
+            The directory to store assets in.
+            Created if it does not exist.
+        prefix : str or None
+            The path of the directory as seen from the document.
+            If ``None``, the directory path itself is used.
+        workers : int or None
+            The number of threads copying assets.
+            If ``None``, chosen by ``ThreadPoolExecutor``.
+        link : bool
+            If true, hard link assets into the directory where possible,
+            rather than copying them.
+            A linked asset changes along with its source, so stored
+            assets are hashed again before being reused,
+            and replaced by a copy if their content changed.
+        """
+        self.directory = directory
+        self.link = link
+        self.prefix = directory if prefix is None else prefix
+        os.makedirs(directory, exist_ok=True)
+        self._manifest_path = os.path.join(directory, _MANIFEST)
+        try:
+            with open(self._manifest_path, encoding='utf-8') as f:
+                self._hashes = json.load(f)
+        except (OSError, ValueError):
+            self._hashes = {}
+        self._changed = False
+        self._stored = set()
+        self._pool = ThreadPoolExecutor(workers)
+        self._copies = []
+        self.copied = 0
+        """Number of assets copied or linked into the directory."""
+
+    def _digest(self, path: str) -> str:
+        """Return the hash of the given file, reusing a cached value."""
+        status = os.stat(path)
+        key = os.path.abspath(path)
+        stamp = [status.st_size, status.st_mtime_ns]
+        cached = self._hashes.get(key)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        self._hashes[key] = [stamp, digest.hexdigest()]
+        self._changed = True
+        return digest.hexdigest()
+
+    def add(self, path: str) -> str:
+        """
+        Add the given file to the store, returning its path in the document.
+
+        The file is copied in the background, if not already stored.
+        """
+        digest = self._digest(path)
+        name = digest + os.path.splitext(path)[1].lower()
+        if name not in self._stored:
+            self._stored.add(name)
+            destination = os.path.join(self.directory, name[:2], name)
+            if not self._is_stored(destination, digest):
+                self._copies.append(self._pool.submit(self._copy, path,
+                                                      destination))
+        return '/'.join((self.prefix.rstrip('/'), name[:2], name))
+
+    def _is_stored(self, destination: str, digest: str) -> bool:
+        """Determine if the given stored asset holds the expected content."""
+        if not os.path.exists(destination):
+            return False
+        # A linked source modified in place also modifies the stored asset
+        return not self.link or self._digest(destination) == digest
+
+    def include(self, path: str, *args, **kwargs) -> Command:
+        r"""
+        Add the given image to the store, returning an ``\includegraphics``.
+
+        args, kwargs
+            Options for the command, as for ``include_graphics``.
+        """
+        return include_graphics(self.add(path), *args, **kwargs)
+
+    def _copy(self, source: str, destination: str):
+        """Link or copy the file into the store, replacing it atomically."""
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        temporary = '{}.{}.tmp'.format(destination, os.getpid())
+        linked = False
+        if self.link:
+            try:
+                os.link(source, temporary)
+                linked = True
+            except OSError:
+                pass
+        if not linked:
+            shutil.copyfile(source, temporary)
+        os.replace(temporary, destination)
+
+    def wait(self):
+        """Wait for pending copies, raising errors, and save the manifest."""
+        copies, self._copies = self._copies, []
+        for copy in copies:
+            copy.result()
+        self.copied += len(copies)
+        if not self._changed:
+            return
+        self._changed = False
+        temporary = self._manifest_path + '.tmp'
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump(self._hashes, f)
+        os.replace(temporary, self._manifest_path)
+
+    def close(self):
+        """Wait for pending copies, and stop the copying threads."""
+        try:
+            self.wait()
+        finally:
+            self._pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,350 @@
+r"""
+This module checks rendered documents for common errors, before compiling.
+
+The linter makes a single pass over the text, line by line,
+and can be fed the text in pieces as it is streamed.
+It reports:
+
+* Unbalanced braces.
+* Unmatched or misnested ``\begin`` and ``\end`` commands.
+* Uses of known command aliases (see ``simpletex.alias``)
+  which are not defined in the document being checked.
+* Optionally, uses of any command which is not known, such as typos.
+* Environments and commands whose package is not imported.
+
+Escaped braces, comments and verbatim text are ignored.
+
+Problems are located by line and column in the rendered text.
+To locate unbalanced braces in the Python code that wrote them,
+use ``trace``, which checks each segment as it is written.
+
+..  :copyright: (c) 2016 by Samuel Li.
+    :license: GNU GPLv3, see License for more details.
+"""
+
+import os
+import re
+import sys
+from collections import namedtuple
+from contextlib import contextmanager
+
+import simpletex
+
+__all__ = ('Problem', 'Linter', 'lint', 'lint_document', 'trace')
+
+Problem = namedtuple('Problem', ('line', 'column', 'message', 'source'))
+Problem.__doc__ = """
+A problem found in a document.
+
+line, column : int
+    The position of the problem in the rendered text, counting from 1.
+    For problems found by ``trace``, the position within the segment.
+message : str
+    A description of the problem.
+source : str or None
+    The Python file and line which wrote the text, if known.
+"""
+
+_TOKEN = re.compile(r'\\(?:(?P<environment>begin|end)\s*\{(?P<name>[^{}]*)\}'
+                    r'|verb\*?(?P<delimiter>[^A-Za-z*\s]).*?(?P=delimiter)'
+                    r'|(?P<command>[A-Za-z@]+)'
+                    r'|.)'
+                    r'|(?P<brace>[{}])'
+                    r'|(?P<comment>%)')
+
+_ESCAPE = re.compile(r'\\[^A-Za-z]')
+"""Escaped characters, such as ``\\{``, which are never tokens."""
+
+_BRACE = re.compile(r'[{}]')
+
+_COMMAND = re.compile(r'\\([A-Za-z@]+)')
+
+_VERBATIM = frozenset(('verbatim', 'verbatim*', 'lstlisting', 'minted',
+                       'comment'))
+"""Environments whose contents are typeset literally."""
+
+PACKAGES = {
+    'multicols': ('multicol',),
+    'align': ('amsmath',),
+    'align*': ('amsmath',),
+    'matrix': ('amsmath',),
+    'pmatrix': ('amsmath',),
+    'bmatrix': ('amsmath',),
+    'Bmatrix': ('amsmath',),
+    'vmatrix': ('amsmath',),
+    'Vmatrix': ('amsmath',),
+    'tikzpicture': ('tikz', 'pgfplots'),
+    'axis': ('pgfplots',),
+    'lstlisting': ('listings',),
+    'minted': ('minted',),
+    'includegraphics': ('graphicx',),
+    'titleformat': ('titlesec',),
+}
+"""
+Packages required by environments and commands, by name.
+
+Any one of the listed packages is sufficient.
+Add entries to check further environments and commands.
+"""
+
+
+class Linter:
+    """Checks rendered text for errors, in a single streaming pass."""
+
+    def __init__(self, packages=None, aliases=None,
+                 environments: bool = True, known=None, commands=None):
+        """
+        Create a linter.
+
+        packages : container of str or None
+            The names of all imported packages.
+            If ``None``, packages are not checked.
+        aliases : container of str or None
+            The names of all defined command aliases.
+            If ``None``, aliases are not checked.
+        environments : bool
+            If false, the pairing of environments is not checked.
+        known : iterable of str or None
+            The names of command aliases which the text may use,
+            such as those defined by the program writing it.
+            Each one used, but missing from ``aliases``, is reported.
+        commands : container of str or None
+            The names of all valid commands, other than aliases.
+            If given, each other command used is reported as unknown.
+        """
+        self.packages = packages
+        self.aliases = aliases
+        self.environments = environments
+        self.commands = commands
+        self.problems = []
+        self._buffer = ''
+        self._line = 0
+        self._braces = []
+        self._environments = []
+        self._reported = set()
+        self._missing = set()
+        if aliases is not None and known is not None:
+            self._missing.update(name for name in known
+                                 if name not in aliases)
+        self._commands = set(self._missing)
+        if packages is not None:
+            self._commands.update(PACKAGES)
+
+    def feed(self, text: str):
+        """Check the next piece of the text."""
+        lines = (self._buffer + text).split('\n')
+        self._buffer = lines.pop()
+        for line in lines:
+            self._check_line(line)
+
+    def close(self) -> list:
+        """Finish checking the text, returning all problems found."""
+        if self._buffer:
+            self._check_line(self._buffer)
+            self._buffer = ''
+        for line, column in self._braces:
+            self._report(line, column, 'Unclosed brace.')
+        if self.environments:
+            for line, column, name in self._environments:
+                self._report(line, column,
+                             'Unclosed environment {!r}.'.format(name))
+        self._braces = []
+        self._environments = []
+        return self.problems
+
+    def _report(self, line: int, column: int, message: str):
+        self.problems.append(Problem(line, column, message, None))
+
+    def _check_line(self, line: str):
+        self._line += 1
+        if ((not self._environments or
+             self._environments[-1][2] not in _VERBATIM) and
+                '\\begin' not in line and '\\end' not in line and
+                '\\verb' not in line):
+            # Fast path, for lines with braces balanced within the line
+            text = _ESCAPE.sub('  ', line)
+            comment = text.find('%')
+            if comment >= 0:
+                text = text[:comment]
+            if _balanced(text):
+                if self._commands or self.commands is not None:
+                    for match in _COMMAND.finditer(text):
+                        if (match.group(1) in self._commands or
+                                self.commands is not None):
+                            self._check_command(match.group(1),
+                                                match.start() + 1)
+                return
+        self._scan(line)
+
+    def _scan(self, line: str):
+        """Check a line token by token."""
+        verbatim = None
+        if self._environments and self._environments[-1][2] in _VERBATIM:
+            verbatim = self._environments[-1][2]
+        for match in _TOKEN.finditer(line):
+            column = match.start() + 1
+            name = match.group('name')
+            if verbatim:
+                if match.group('environment') == 'end' and name == verbatim:
+                    self._environments.pop()
+                    verbatim = None
+                continue
+            if match.group('comment'):
+                break
+            brace = match.group('brace')
+            if brace == '{':
+                self._braces.append((self._line, column))
+            elif brace == '}':
+                if self._braces:
+                    self._braces.pop()
+                else:
+                    self._report(self._line, column, 'Unmatched brace.')
+            elif match.group('environment') == 'begin':
+                self._environments.append((self._line, column, name))
+                self._check_package(name, column)
+                if name in _VERBATIM:
+                    verbatim = name
+            elif match.group('environment') == 'end':
+                self._end(name, column)
+            elif match.group('command'):
+                self._check_command(match.group('command'), column)
+
+    def _end(self, name: str, column: int):
+        if not self.environments:
+            if self._environments and self._environments[-1][2] == name:
+                self._environments.pop()
+        elif not self._environments:
+            self._report(self._line, column,
+                         'Unmatched end of environment {!r}.'.format(name))
+        elif self._environments[-1][2] != name:
+            line, start, opened = self._environments[-1]
+            message = 'Environment {!r} (line {}) closed by {!r}.'
+            self._report(self._line, column,
+                         message.format(opened, line, name))
+            if any(entry[2] == name for entry in self._environments):
+                while self._environments.pop()[2] != name:
+                    pass
+        else:
+            self._environments.pop()
+
+    def _check_command(self, name: str, column: int):
+        if name in self._missing:
+            self._report_once(name, column,
+                              'Command alias {!r} is not defined.')
+        elif (self.commands is not None and name not in self.commands and
+                (self.aliases is None or name not in self.aliases)):
+            self._report_once(name, column, 'Unknown command {!r}.')
+        self._check_package(name, column)
+
+    def _check_package(self, name: str, column: int):
+        if self.packages is None or name not in PACKAGES:
+            return
+        if not any(package in self.packages for package in PACKAGES[name]):
+            message = '{{!r}} requires package {}.'.format(
+                ' or '.join(map(repr, PACKAGES[name])))
+            self._report_once(name, column, message)
+
+    def _report_once(self, name: str, column: int, message: str):
+        if (name, message) not in self._reported:
+            self._reported.add((name, message))
+            self._report(self._line, column, message.format(name))
+
+
+def _balanced(text: str) -> bool:
+    """Determine if the braces of a line are balanced within it."""
+    if '{' not in text and '}' not in text:
+        return True
+    depth = 0
+    for brace in _BRACE.findall(text):
+        if brace == '{':
+            depth += 1
+        elif depth:
+            depth -= 1
+        else:
+            return False
+    return not depth
+
+
+def lint(text, packages=None, aliases=None, known=None,
+         commands=None) -> list:
+    """
+    Check the given text, returning a list of problems found.
+
+    text : str or iterable of str
+        The rendered text, or its pieces in order.
+    packages, aliases, known, commands
+        As for ``Linter``.
+    """
+    linter = Linter(packages, aliases, known=known, commands=commands)
+    for piece in ([text] if isinstance(text, str) else text):
+        linter.feed(piece)
+    return linter.close()
+
+
+def lint_document(known=None, commands=None) -> list:
+    """
+    Check the current document, returning a list of problems found.
+
+    The document is streamed through the linter, without being
+    rendered as a whole, and checked against its own
+    package imports and command aliases.
+
+    known, commands
+        As for ``Linter``.
+    """
+    context = simpletex._CONTEXT
+    linter = Linter(set(context.imports), set(context.commandDefinitions),
+                    known=known, commands=commands)
+    context.preamble.stream(linter.feed)
+    return linter.close()
+
+
+def _caller() -> str:
+    """Return the location of the innermost caller outside simpletex."""
+    package = os.path.dirname(os.path.abspath(simpletex.__file__)) + os.sep
+    frame = sys._getframe(1)
+    while (frame is not None and
+           os.path.abspath(frame.f_code.co_filename).startswith(package)):
+        frame = frame.f_back
+    if frame is None:
+        return None
+    return '{}:{}'.format(frame.f_code.co_filename, frame.f_lineno)
+
+
+@contextmanager
+def trace():
+    """
+    Check the braces of each segment written, while in the context.
+
+    Yields a list, to which problems are added as they are found,
+    with the location of the Python code which wrote the segment.
+    Only segments written by the current thread are checked,
+    and segments written lazily with ``write_many`` are not.
+
+    .. code-block:: python
+
+        with trace() as problems:
+            build_document()
+        for problem in problems:
+            print(problem.source, problem.message)
+    """
+    problems = []
+
+    def check(args):
+        if len(args) != 1:
+            return
+        linter = Linter(environments=False)
+        linter.feed(str(args[0]))
+        found = linter.close()
+        if found:
+            source = _caller()
+            problems.extend(problem._replace(source=source)
+                            for problem in found)
+
+    state = simpletex._CONTEXT._thread
+    previous = state.hook
+    state.hook = check
+    try:
+        yield problems
+    finally:
+        state.hook = previous
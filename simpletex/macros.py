@@ -0,0 +1,248 @@
+r"""
+This module provides a pass which shrinks repetitive documents.
+
+Frequently repeated fragments of the rendered document body are
+defined once as ``\newcommand`` macros in the preamble,
+and each occurrence is replaced by a short macro call.
+Two kinds of fragments are considered, so that every replacement is safe:
+whole lines (ignoring indentation), and complete commands with their
+braced arguments, such as ``\textbf{Total}``.
+Fragments containing comments, macro parameters, alignment tabs,
+unbalanced braces or math shifts, environments, or verbatim text
+are never replaced.
+
+..  :copyright: (c) 2016 by Samuel Li.
+    :license: GNU GPLv3, see License for more details.
+"""
+
+import re
+from collections import Counter
+
+import simpletex
+from simpletex.core import Paragraph
+
+__all__ = ('compress', 'extract_macros')
+
+_UNSAFE_COMMANDS = re.compile(r'\\(?:begin|end|verb|label)(?![A-Za-z])')
+"""Commands which must not be moved into a macro definition."""
+
+_VERBATIM = re.compile(r'\\(begin|end)'
+                       r'\{(?:verbatim|lstlisting|minted)\*?\}')
+"""Environments whose contents are typeset literally."""
+
+_DEFINITION_OVERHEAD = len(r'\newcommand{\}{}') + 1
+"""Characters needed to define a macro, besides its name and body."""
+
+
+def _is_safe(fragment: str) -> bool:
+    """Determine if a fragment can be replaced by a macro call."""
+    if _UNSAFE_COMMANDS.search(fragment):
+        return False
+    depth = 0
+    math = False
+    index = 0
+    while index < len(fragment):
+        char = fragment[index]
+        if char == '\\':
+            index += 2
+            continue
+        if char in '%#&':
+            return False
+        elif char == '$':
+            math = not math
+        elif char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth < 0:
+                return False
+        index += 1
+    return depth == 0 and not math
+
+
+def _commands(line: str):
+    """
+    Find each outermost command with braced arguments in a line.
+
+    Yields ``(start, end)`` spans of commands such as ``\\textbf{text}``.
+    """
+    index = 0
+    length = len(line)
+    while index < length:
+        if line[index] != '\\':
+            index += 1
+            continue
+        start = index
+        index += 1
+        if index >= length or not line[index].isalpha():
+            index += 1
+            continue
+        while index < length and line[index].isalpha():
+            index += 1
+        if index < length and line[index] == '*':
+            index += 1
+        arguments = False
+        while index < length and line[index] == '{':
+            index = _group_end(line, index)
+            if index is None:
+                return
+            arguments = True
+        if arguments:
+            yield start, index
+
+
+def _group_end(line: str, index: int):
+    """Return the index after the brace group starting at ``index``."""
+    depth = 0
+    while index < len(line):
+        char = line[index]
+        if char == '\\':
+            index += 2
+            continue
+        if char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return index + 1
+        index += 1
+    return None
+
+
+def _blank_verbatim(lines: list):
+    """Blank out lines of verbatim text, so that they are never replaced."""
+    verbatim = False
+    for number, line in enumerate(lines):
+        match = _VERBATIM.search(line)
+        if verbatim or match:
+            lines[number] = ''
+        if match:
+            verbatim = match.group(1) == 'begin'
+
+
+def _macro_names(prefix: str, taken):
+    """Generate unused macro names made only of letters."""
+    number = 0
+    while True:
+        suffix = ''
+        value = number
+        while True:
+            value, digit = divmod(value, 26)
+            suffix = chr(ord('a') + digit) + suffix
+            if not value:
+                break
+        number += 1
+        if prefix + suffix not in taken:
+            yield prefix + suffix
+
+
+def _choose(counts: Counter, name_length: int,
+            min_length: int, min_count: int) -> list:
+    """Select the fragments worth replacing, most profitable first."""
+    chosen = []
+    call_length = name_length + 3
+    for fragment, count in counts.most_common():
+        if count < min_count or len(fragment) < min_length:
+            continue
+        definition_length = _DEFINITION_OVERHEAD + name_length + len(fragment)
+        if count * (len(fragment) - call_length) <= definition_length:
+            continue
+        if _is_safe(fragment):
+            chosen.append(fragment)
+    return chosen
+
+
+def compress(text: str,
+             min_length: int = 40,
+             min_count: int = 2,
+             prefix: str = 'stx',
+             taken=()):
+    """
+    Replace repeated fragments of the given text with macro calls.
+
+    Returns the compressed text, and a dictionary mapping
+    each new macro name to its definition.
+
+    text : str
+        The rendered LaTeX to compress.
+    min_length : int
+        The minimum length of a fragment to replace.
+    min_count : int
+        The minimum number of occurrences of a fragment to replace.
+    prefix : str
+        The prefix of each macro name. Must consist only of letters.
+    taken : container of str
+        Macro names which are already defined, and must not be reused.
+    """
+    names = _macro_names(prefix, taken)
+    # Conservative estimate, allowing for thousands of macros
+    name_length = len(prefix) + 3
+    lines = text.split('\n')
+    stripped = [line.lstrip('\t') for line in lines]
+    _blank_verbatim(stripped)
+    line_macros = dict(zip(_choose(Counter(stripped), name_length,
+                                   min_length, min_count),
+                           names))
+
+    spans = {}
+    command_counts = Counter()
+    for number, line in enumerate(stripped):
+        if line in line_macros:
+            continue
+        spans[number] = list(_commands(line))
+        command_counts.update(line[start:end]
+                              for start, end in spans[number])
+    command_macros = dict(zip(_choose(command_counts, name_length,
+                                      min_length, min_count),
+                              names))
+
+    for number, line in enumerate(stripped):
+        if not line:
+            continue
+        indent = lines[number][:len(lines[number]) - len(line)]
+        if line in line_macros:
+            lines[number] = indent + '\\{}{{}}'.format(line_macros[line])
+            continue
+        pieces = []
+        position = 0
+        for start, end in spans[number]:
+            name = command_macros.get(line[start:end])
+            if name is not None:
+                pieces.append(line[position:start])
+                pieces.append('\\{}{{}}'.format(name))
+                position = end
+        if pieces:
+            pieces.append(line[position:])
+            lines[number] = indent + ''.join(pieces)
+
+    definitions = {name: fragment for fragment, name
+                   in list(line_macros.items()) + list(command_macros.items())}
+    return '\n'.join(lines), definitions
+
+
+def extract_macros(min_length: int = 40, min_count: int = 2) -> int:
+    """
+    Define repeated fragments of the current document as macros.
+
+    Each macro is registered with ``simpletex.alias``, and every
+    occurrence in the document body is replaced with a call to it.
+    Should be called once the document is complete, just before saving.
+    Returns the number of bytes saved.
+
+    min_length : int
+        The minimum length of a fragment to replace.
+    min_count : int
+        The minimum number of occurrences of a fragment to replace.
+    """
+    before = len(simpletex.dump().encode('utf-8'))
+    preamble = simpletex._CONTEXT.preamble
+    compressed, definitions = compress(str(preamble.body),
+                                       min_length, min_count,
+                                       taken=preamble.commandDefinitions)
+    if not definitions:
+        return 0
+    for name, definition in definitions.items():
+        simpletex.alias(name, definition)
+    preamble.body = Paragraph()
+    preamble.body.write(compressed)
+    return before - len(simpletex.dump().encode('utf-8'))
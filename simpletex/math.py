@@ -5,11 +5,14 @@ This module provides formatters to create and display LaTeX equations.
     :license: GNU GPLv3, see License for more details.
 """
 
+from itertools import chain, repeat
+from numbers import Number
+
 from simpletex import usepackage
-from simpletex.core import Formatter, Paragraph
+from simpletex.core import Formatter, Paragraph, checkpoints
 from simpletex.base import Command, Environment
 
-__all__ = ('Equation',
+__all__ = ('Equation', 'Align', 'Expression',
            'Add', 'Subtract', 'Multiply', 'Divide',
            'Matrix')
 
@@ -42,13 +45,137 @@ class Equation(Formatter):
                                self._symbol)
 
 
+class Align(Environment):
+    """
+    Formats a system of equations, aligned on their relation symbols.
+
+    Equivalent to the amsmath ``align`` and ``align*`` environments.
+    All rows are rendered in a single pass, so whole arrays of
+    equations can be given at once.
+    """
+
+    def __init__(self, numbered: bool = False, relation: str = '='):
+        """
+        Create an empty equation system.
+
+        Automatically imports the required package ``amsmath``.
+
+        numbered : bool
+            If ``True``, number each row (``align``).
+            Otherwise, leave rows unnumbered (``align*``).
+        relation : str
+            The relation symbol placed between each pair of sides.
+        """
+        super().__init__('align' if numbered else 'align*')
+        self._relation = relation
+        usepackage('amsmath')
+
+    def _format_text(self, lhs, rhs=None, labels=None) -> str:
+        r"""
+        Format the given equations as aligned rows.
+
+        lhs : iterable
+            The left-hand sides of the equations.
+            If ``rhs`` is not given, an iterable of rows instead,
+            each either a ``(lhs, rhs)`` pair or a complete equation.
+        rhs : iterable or None
+            The right-hand sides of the equations.
+        labels : iterable or None
+            A label for each row, referenced with ``\ref``.
+            Rows with a label of ``None`` are not labelled.
+        """
+        if rhs is None:
+            rows = map(self._row, lhs)
+        else:
+            relation = ' &{} '.format(self._relation)
+            rows = (relation.join((str(left), str(right)))
+                    for left, right in zip(lhs, rhs))
+        if labels is not None:
+            rows = map(self._labelled, rows, chain(labels, repeat(None)))
+        return super()._format_text(' \\\\\n'.join(rows))
+
+    def _row(self, row) -> str:
+        if isinstance(row, tuple) and len(row) == 2:
+            return '{} &{} {}'.format(row[0], self._relation, row[1])
+        return str(row)
+
+    @staticmethod
+    def _labelled(row: str, label) -> str:
+        if label is None:
+            return row
+        return '{} {}'.format(row, Command('label', [label]))
+
+
+class Expression:
+    """
+    A node of a symbolic expression tree.
+
+    Returned by operators constructed with ``tree=True``.
+    The whole tree is rendered in a single traversal once converted
+    to a string, with parentheses inserted only where required
+    by operator precedence.
+    """
+
+    __slots__ = ('operator', 'operands')
+
+    def __init__(self, operator, operands):
+        """
+        Create an expression node.
+
+        operator : Operator
+            The operator combining the operands.
+        operands : list
+            The operands, either values or other expression nodes.
+        """
+        self.operator = operator
+        self.operands = operands
+
+    @property
+    def precedence(self) -> int:
+        """The binding strength of the node's operator."""
+        return self.operator._precedence
+
+    def __str__(self):
+        """Render the expression tree as LaTeX."""
+        parts = []
+        stack = [self]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, Expression):
+                stack.extend(reversed(item.operator._pieces(item.operands)))
+            else:
+                parts.append(str(item))
+        return ''.join(parts)
+
+    def __repr__(self):
+        """Show the operator class and operands of the node."""
+        return '{}{}'.format(self.operator.__class__.__name__, self.operands)
+
+
 class Operator(Formatter):
     """A generic base class for arbitrary mathematical operators."""
 
-    def __init__(self, operator: str):
-        """Initialize an operation with the given operator symbol."""
+    _precedence = 1
+    """Binding strength of the operator, used to place parentheses."""
+
+    _commutative = False
+    """Whether numeric operands may be folded regardless of position."""
+
+    def __init__(self, operator: str, tree: bool = False, fold: bool = False):
+        """
+        Initialize an operation with the given operator symbol.
+
+        tree : bool
+            If ``True``, return an ``Expression`` node instead of a string,
+            to be rendered with minimal parentheses once complete.
+        fold : bool
+            If ``True``, combine numeric operands into a single constant.
+            Only used when ``tree`` is ``True``.
+        """
         super().__init__()
         self._operator = str(operator)
+        self._tree = tree
+        self._fold = fold
 
     def __call__(self, *args) -> str:
         """
@@ -59,36 +186,106 @@ class Operator(Formatter):
             to strings and then joined by the operator symbol.
         """
         if len(args) == 1 and isinstance(args[0], Paragraph):
-            return self._operator.join(map(str, args[0]))
-        else:
-            return self._operator.join(map(str, args))
+            args = args[0]
+        if self._tree:
+            return self._expression(list(args))
+        return self._operator.join(map(str, args))
+
+    def _expression(self, operands):
+        """Build an expression node, folding constants if requested."""
+        if self._fold:
+            operands = self._fold_constants(operands)
+            if len(operands) == 1:
+                return operands[0]
+        return Expression(self, operands)
+
+    @staticmethod
+    def _evaluate(left, right):
+        """Combine two numeric operands, or return ``None`` if impossible."""
+        return None
+
+    def _fold_constants(self, operands):
+        numeric = [_is_number(operand) for operand in operands]
+        if self._commutative and numeric.count(True) > 1:
+            constants = [operand for operand, is_number
+                         in zip(operands, numeric) if is_number]
+            value = constants[0]
+            for constant in constants[1:]:
+                value = self._evaluate(value, constant)
+            position = numeric.index(True)
+            return [value if index == position else operand
+                    for index, (operand, is_number)
+                    in enumerate(zip(operands, numeric))
+                    if index == position or not is_number]
+        elif operands and all(numeric):
+            value = operands[0]
+            for operand in operands[1:]:
+                value = self._evaluate(value, operand)
+                if value is None:
+                    return operands
+            return [value]
+        return operands
+
+    def _needs_parentheses(self, index: int, operand) -> bool:
+        """Determine if the operand at the given position must be wrapped."""
+        if not isinstance(operand, Expression):
+            return False
+        if self._commutative or index == 0:
+            return operand.precedence < self._precedence
+        return operand.precedence <= self._precedence
+
+    def _pieces(self, operands) -> list:
+        """List the pieces of an expression node, in rendering order."""
+        pieces = []
+        for index, operand in enumerate(operands):
+            if index:
+                pieces.append(self._operator)
+            if self._needs_parentheses(index, operand):
+                pieces.extend(('(', operand, ')'))
+            else:
+                pieces.append(operand)
+        return pieces
 
 
 class Add(Operator):
     """Adds arguments together in symbolic form."""
 
-    def __init__(self):
+    _commutative = True
+
+    def __init__(self, tree: bool = False, fold: bool = False):
         """Initialize an empty addition operator."""
-        super().__init__('+')
+        super().__init__('+', tree, fold)
+
+    @staticmethod
+    def _evaluate(left, right):
+        return left + right
 
 
 class Subtract(Operator):
     """Subtracts two given arguments in symbolic form."""
 
-    def __init__(self, inline: bool = False):
+    def __init__(self, inline: bool = False,
+                 tree: bool = False, fold: bool = False):
         """Initialize an empty subtraction operator."""
-        super().__init__('-')
+        super().__init__('-', tree, fold)
+
+    @staticmethod
+    def _evaluate(left, right):
+        return left - right
 
 
 class Multiply(Operator):
     """Multiplies arguments together in symbolic form."""
 
+    _precedence = 2
+    _commutative = True
+
     _SYMBOL_DICT = {None: '',
-                    '.': Command('cdot '),
-                    'dot': Command('cdot '),
-                    'x': Command('times '),
-                    'cross': Command('times '),
-                    'times': Command('times '),
+                    '.': r'\cdot ',
+                    'dot': r'\cdot ',
+                    'x': r'\times ',
+                    'cross': r'\times ',
+                    'times': r'\times ',
                     '*': '*',
                     'star': '*'}
     """
@@ -96,7 +293,7 @@ class Multiply(Operator):
     and their corresponding TeX commands.
     """
 
-    def __init__(self, symbol='dot'):
+    def __init__(self, symbol='dot', tree: bool = False, fold: bool = False):
         r"""
         Initialize an empty multiplication operator.
 
@@ -108,13 +305,20 @@ class Multiply(Operator):
             operator is used.
             If '*' or 'star', a star-style (``*``) operator is used.
         """
-        super().__init__(self._SYMBOL_DICT[symbol])
+        super().__init__(self._SYMBOL_DICT[symbol], tree, fold)
+
+    @staticmethod
+    def _evaluate(left, right):
+        return left * right
 
 
 class Divide(Operator):
     """Divides two given arguments in symbolic form."""
 
-    def __init__(self, inline: bool = False):
+    _precedence = 2
+
+    def __init__(self, inline: bool = False,
+                 tree: bool = False, fold: bool = False):
         r"""
         Initialize an empty division operator.
 
@@ -123,9 +327,11 @@ class Divide(Operator):
             If ``False``, use the display-style (``\frac{}{}``) syntax.
             If ``True``, use the inline (``/``) syntax.
         """
-        # We will override the text formatting, initialize with dummy symbol
-        super().__init__('')
+        super().__init__('/', tree, fold)
         self._inline = inline
+        if not inline:
+            # Fractions group their operands, so never need parentheses
+            self._precedence = 3
 
     def __call__(self, numerator, denominator=None) -> str:
         """
@@ -147,11 +353,38 @@ class Divide(Operator):
                 error_string = 'Numerator invalid, denominator not provided.'
                 raise ValueError(error_string.format(self.__class__.__name__))
             numerator, denominator = numerator
+        if self._tree:
+            return self._expression([numerator, denominator])
         if self._inline:
             return '{}/{}'.format(numerator, denominator)
         else:
             return Command('frac', [numerator, denominator])
 
+    @staticmethod
+    def _evaluate(left, right):
+        """Divide numeric operands, unless the result would be inexact."""
+        if right == 0:
+            return None
+        if isinstance(left, int) and isinstance(right, int):
+            return left // right if left % right == 0 else None
+        return left / right
+
+    def _needs_parentheses(self, index: int, operand) -> bool:
+        if not self._inline:
+            return False
+        return super()._needs_parentheses(index, operand)
+
+    def _pieces(self, operands) -> list:
+        if self._inline:
+            return super()._pieces(operands)
+        numerator, denominator = operands
+        return [r'\frac{', numerator, '}{', denominator, '}']
+
+
+def _is_number(value) -> bool:
+    """Determine if a value is a numeric constant which can be folded."""
+    return isinstance(value, Number) and not isinstance(value, bool)
+
 
 class Matrix(Environment):
     """
@@ -159,6 +392,12 @@ class Matrix(Environment):
 
     Can be contstructed either with nested lists or a 2D numpy array.
     Numpy is not requred.
+    Sparse matrices can also be given, either as objects in
+    COO (``row``, ``col``, ``data``) or CSR (``indptr``, ``indices``, ``data``)
+    format, such as those provided by scipy, or as an iterable of
+    ``(row, column, value)`` triplets along with the matrix shape.
+    Sparse matrices are rendered row by row, without being densified.
+    Duplicate entries of a sparse matrix are summed.
     """
 
     _BRACKET_DICT = {'': '',
@@ -169,8 +408,12 @@ class Matrix(Environment):
                      '||': 'V'}
     """Lookup dictionary for bracket types."""
 
-    def __init__(self, brackets: str = '['):
-        """
+    def __init__(self,
+                 brackets: str = '[',
+                 zero='0',
+                 threshold: int = None,
+                 edgeitems: int = 3):
+        r"""
         Create a new empty matrix.
 
         The type of brackets to use can be specified.
@@ -180,9 +423,25 @@ class Matrix(Environment):
             Type of brackets to use.
             Supported options are ``''`` (no brackets), ``'('``, ``'['``,
             ``'{'``, ``'|'``, and ``'||'``.
+        zero : str-like
+            Placeholder for the entries missing from a sparse matrix,
+            such as ``'0'``, ``''`` or ``r'\cdot'``.
+        threshold : int or None
+            Total number of entries above which the matrix is summarized,
+            as in numpy's print options.
+            Only the first and last ``edgeitems`` rows and columns are shown,
+            separated by ``\vdots``, ``\cdots`` and ``\ddots``.
+            If ``None``, the matrix is never summarized.
+            Sparse matrices are not summarized.
+        edgeitems : int
+            Number of rows and columns shown at each edge of
+            a summarized matrix.
         """
         environment_name = '{}matrix'.format(self._BRACKET_DICT[brackets])
         super().__init__(environment_name)
+        self.zero = zero
+        self.threshold = threshold
+        self.edgeitems = edgeitems
         usepackage('amsmath')
 
     @staticmethod
@@ -195,12 +454,131 @@ class Matrix(Environment):
         """
         return ' & '.join(map(str, elements)) + r' \\'
 
-    def _format_text(self, data) -> str:
+    def _sparse_rows(self, data, shape=None):
+        """
+        Generate the rows of a sparse matrix, or return ``None`` if dense.
+
+        Only the nonzero entries and a single row are held in memory.
+        """
+        if hasattr(data, 'tocsr') and data.format not in ('csr', 'coo'):
+            data = data.tocsr()
+        if hasattr(data, 'indptr'):
+            pointers, columns, values = data.indptr, data.indices, data.data
+            height = len(pointers) - 1
+            rows = (zip(columns[pointers[row]:pointers[row + 1]],
+                        values[pointers[row]:pointers[row + 1]])
+                    for row in range(height))
+            if shape is None:
+                shape = getattr(data, 'shape', None)
+            if shape is None:
+                # Only scan the column indices if the shape is unknown
+                shape = (height, max(columns, default=-1) + 1)
+            return self._fill_rows(rows, shape)
+        if hasattr(data, 'row') and hasattr(data, 'col'):
+            rows, inferred_shape = self._coo_rows(zip(data.row,
+                                                      data.col,
+                                                      data.data))
+        elif shape is not None:
+            rows, inferred_shape = self._coo_rows(data)
+        else:
+            return None
+        if shape is None:
+            shape = getattr(data, 'shape', inferred_shape)
+        return self._fill_rows(rows, shape)
+
+    @staticmethod
+    def _coo_rows(triplets):
+        """
+        Group ``(row, column, value)`` triplets by row.
+
+        Returns a generator over the entries of each row,
+        and the smallest shape containing every entry.
+        """
+        buckets = {}
+        width = 0
+        for row, column, value in triplets:
+            buckets.setdefault(int(row), []).append((column, value))
+            width = max(width, int(column) + 1)
+        height = max(buckets, default=-1) + 1
+        rows = (buckets.get(row, ()) for row in range(height))
+        return rows, (height, width)
+
+    def _fill_rows(self, rows, shape):
+        """
+        Expand the entries of each row, filling gaps with ``zero``.
+
+        Duplicate entries for the same position are summed, as scipy does.
+        """
+        height, width = shape
+        zero = str(self.zero)
+        for _, entries in zip(range(height), chain(rows, repeat(()))):
+            values = {}
+            for column, value in entries:
+                if column in values:
+                    values[column] = values[column] + value
+                else:
+                    values[column] = value
+            cells = [zero] * width
+            for column, value in values.items():
+                cells[column] = str(value)
+            yield cells
+
+    def _summarize(self, data):
+        """
+        Return the rows of a summarized matrix, if above the threshold.
+
+        Only the entries shown are accessed, so summarizing costs
+        ``O(edgeitems ** 2)`` regardless of the size of the matrix.
+        Data which can't be indexed is never summarized.
+        """
+        if self.threshold is None:
+            return data
+        try:
+            height = len(data)
+            width = len(data[0]) if height else 0
+        except TypeError:
+            return data
+        if height * width <= self.threshold:
+            return data
+        return self._summary_rows(data,
+                                  self._edge_indices(height),
+                                  self._edge_indices(width))
+
+    def _edge_indices(self, length: int):
+        """List the indices shown along an axis, with ``None`` for the gap."""
+        if length <= 2 * self.edgeitems:
+            return list(range(length))
+        return (list(range(self.edgeitems)) + [None] +
+                list(range(length - self.edgeitems, length)))
+
+    @staticmethod
+    def _summary_rows(data, rows, columns):
+        for row in rows:
+            if row is None:
+                yield [r'\vdots' if column is not None else r'\ddots'
+                       for column in columns]
+            else:
+                line = data[row]
+                yield [line[column] if column is not None else r'\cdots'
+                       for column in columns]
+
+    def _format_text(self, data, shape=None) -> str:
         """
         Format the given data as a matrix.
 
-        data : iterable of iterables or a 2D numpy array.
+        data : iterable of iterables, a 2D numpy array, or a sparse matrix.
             The data to include in the matrix.
+        shape : pair of int
+            The number of rows and columns of the matrix.
+            Required if ``data`` is an iterable of ``(row, column, value)``
+            triplets; optional for other sparse matrices.
         """
-        return super()._format_text('\n'.join(self._matrix_line(line)
-                                              for line in data))
+        return super()._format_text('\n'.join(
+            self._matrix_line(line) for line in self._rows(data, shape)))
+
+    def _rows(self, data, shape=None):
+        """Generate the rows of entries shown, as for ``_format_text``."""
+        rows = self._sparse_rows(data, shape)
+        if rows is None:
+            rows = self._summarize(data)
+        return checkpoints(rows)
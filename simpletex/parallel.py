@@ -0,0 +1,181 @@
+"""
+This module renders independent sections of a document in parallel.
+
+Each section is written by its own builder: a callable taking no
+arguments, which writes the section as it would be written
+sequentially. Builders run in a pool of threads or processes,
+each in a fresh, empty document, and their text is then written
+to the current document in the order the builders were given:
+
+.. code-block:: python
+
+    def chapter(results):
+        with Section('Results'):
+            write(table(results))
+
+    with Document():
+        write_parallel([partial(chapter, results) for results in runs],
+                       processes=True)
+
+Package imports, command aliases and any other registries filled
+by the builders are merged into the current document, in builder order,
+so that the output is the same as if the builders ran one after another.
+Builders must therefore not depend on what other builders write.
+The current section selection, backend and cancel token
+(see ``simpletex.render`` and ``CancelToken``) apply to the builders.
+
+Threads only run pure Python builders one at a time; they pay off
+when builders wait on input, such as files or databases.
+Processes run builders simultaneously, but the builders,
+and everything they register, must be picklable.
+
+..  :copyright: (c) 2016 by Samuel Li.
+    :license: GNU GPLv3, see License for more details.
+"""
+
+from collections import namedtuple
+
+import simpletex
+from simpletex.core import Registry, CancelToken, _ACTIVE, _DiscardedParagraph
+
+__all__ = ('Fragment', 'isolate', 'splice', 'write_parallel')
+
+Fragment = namedtuple('Fragment', ('text', 'registries'))
+Fragment.__doc__ = """
+A section rendered in isolation, ready to be written to a document.
+
+text : str
+    The rendered text of the section.
+registries : list of tuples
+    The name, class and entries of each registry of the isolated document,
+    in preamble order.
+"""
+
+
+def isolate(builder,
+            pretty: bool = None,
+            select=None,
+            backend: str = 'latex',
+            token: CancelToken = None) -> Fragment:
+    """
+    Run the given builder in a fresh document, returning what it wrote.
+
+    The current document, if any, is left untouched.
+
+    builder : callable
+        Called with no arguments; writes the section.
+        Any contexts it opens must be closed before it returns.
+    pretty : bool or None
+        The value of ``simpletex.pretty`` to render with,
+        leaving the global value untouched.
+        If ``None``, the current value is used.
+    select, backend
+        The sections to render, and the backend to format them with,
+        as for ``simpletex.render``.
+    token : CancelToken or None
+        A token with which to cancel the builder.
+    """
+    context = simpletex._GlobalContextManager()
+    context.set_pretty(pretty)
+    context.select(select)
+    context.set_backend(backend)
+    # Not entered with ``with``, as tokens may be shared between threads
+    previous = _ACTIVE.token
+    _ACTIVE.token = token
+    try:
+        with context:
+            builder()
+            preamble = context.preamble
+            text = str(preamble.body)
+    finally:
+        _ACTIVE.token = previous
+    registries = []
+    for name in preamble._order:
+        registry = preamble._text[name]
+        if isinstance(registry, Registry) and len(registry):
+            registries.append((name, type(registry),
+                               list(registry.items())))
+    return Fragment(text, registries)
+
+
+def splice(fragment: Fragment):
+    """
+    Write an isolated section to the current top-level context.
+
+    Its registry entries are merged into the current document;
+    entries already present are kept.
+    """
+    for name, registry_type, entries in fragment.registries:
+        simpletex.add_registry(name, registry_type())
+        registry = getattr(simpletex._CONTEXT, name)
+        for key, value in entries:
+            registry.register(key, value)
+    if fragment.text:
+        simpletex.write(fragment.text)
+
+
+def _relative_selection(selection, path: tuple):
+    """
+    Return the paths of the given selection within the given section.
+
+    Returns ``None`` if the whole section is selected.
+    """
+    if selection is None:
+        return None
+    paths = []
+    for selected in selection:
+        if path[:len(selected)] == selected:
+            return None
+        if selected[:len(path)] == path:
+            paths.append('/'.join(selected[len(path):]))
+    return paths
+
+
+def _backend_name(backend) -> str:
+    """Return the name of the given backend, as for ``simpletex.render``."""
+    if backend is None:
+        return 'latex'
+    from simpletex.preview import BACKENDS
+    return next(name for name, value in BACKENDS.items() if value is backend)
+
+
+def write_parallel(builders, workers: int = None, processes: bool = False):
+    """
+    Run the given builders in parallel, writing their sections in order.
+
+    Builders within a section which is not selected are not run.
+
+    builders : iterable of callables
+        Each is called with no arguments, and writes one section.
+        Use ``functools.partial`` to pass arguments.
+    workers : int or None
+        The number of threads or processes.
+        If ``None``, chosen by the executor.
+    processes : bool
+        If true, run the builders in separate processes,
+        rather than threads.
+    """
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+    from functools import partial
+    from simpletex.document import Title
+    context = simpletex._CONTEXT
+    if any(isinstance(paragraph, _DiscardedParagraph)
+           for paragraph in context.contextStack):
+        return
+    path = tuple(formatter.title for formatter in context.formatterStack
+                 if isinstance(formatter, Title))
+    token = _ACTIVE.token
+    if processes:
+        executor = ProcessPoolExecutor(workers)
+        if token is not None:
+            token.check()
+            token = CancelToken(deadline=token.deadline)
+        run = partial(isolate, pretty=simpletex.pretty)
+    else:
+        executor = ThreadPoolExecutor(workers)
+        run = isolate
+    run = partial(run, select=_relative_selection(context.selection, path),
+                  backend=_backend_name(context.backend), token=token)
+    with executor:
+        for fragment in executor.map(run, builders):
+            splice(fragment)
@@ -0,0 +1,168 @@
+r"""
+This module provides plots of large data series, drawn with pgfplots.
+
+Series are downsampled to a fixed number of points before being written,
+as pgfplots is slow, and may run out of memory, with many points.
+Downsampling preserves the visual shape of the series:
+
+* ``'lttb'`` (Largest Triangle Three Buckets) keeps, in each bucket,
+  the point forming the largest triangle with its neighbours.
+* ``'minmax'`` keeps the lowest and highest point of each bucket,
+  so that every peak and trough is drawn.
+
+.. code-block:: python
+
+    plot = Plot(xlabel='Time', ylabel='Load')
+    with plot:
+        write(series(times, loads, points=500))
+
+Requires numpy.
+
+..  :copyright: (c) 2016 by Samuel Li.
+    :license: GNU GPLv3, see License for more details.
+"""
+
+import numpy as np
+
+from simpletex import usepackage
+from simpletex.base import Environment, OptionFormatter
+
+__all__ = ('Plot', 'series', 'downsample')
+
+
+class Plot(Environment):
+    r"""
+    Formats plot commands, such as ``series``, as a set of axes.
+
+    Equivalent to the pgfplots ``axis`` environment,
+    within a ``tikzpicture``.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """
+        Create an empty plot.
+
+        Automatically imports the required package ``pgfplots``.
+
+        args, kwargs
+            Options for the axes, such as ``xlabel='Time'``.
+        """
+        super().__init__('axis')
+        self.header = '{}{}'.format(self.header,
+                                    OptionFormatter()(*args, **kwargs))
+        usepackage('pgfplots')
+
+    def _format_text(self, text) -> str:
+        return Environment('tikzpicture')(super()._format_text(text))
+
+
+def _lttb(x, y, count: int):
+    """Return the indices of the points chosen by LTTB."""
+    length = len(x)
+    edges = np.linspace(1, length - 1, count - 1).astype(np.intp)
+    edges = np.append(edges, length)
+    chosen = np.empty(count, dtype=np.intp)
+    chosen[0] = 0
+    chosen[-1] = length - 1
+    previous = 0
+    for bucket in range(count - 2):
+        start, end, following = edges[bucket:bucket + 3]
+        mean_x = x[end:following].mean()
+        mean_y = y[end:following].mean()
+        areas = np.abs((x[previous] - mean_x) * (y[start:end] - y[previous]) -
+                       (x[previous] - x[start:end]) * (mean_y - y[previous]))
+        previous = start + int(np.argmax(areas))
+        chosen[bucket + 1] = previous
+    return chosen
+
+
+def _minmax(x, y, count: int):
+    """Return the indices of the lowest and highest point of each bucket."""
+    edges = np.linspace(0, len(y), count // 2 + 1).astype(np.intp)
+    chosen = []
+    for start, end in zip(edges[:-1], edges[1:]):
+        bucket = y[start:end]
+        chosen.append(start + int(np.argmin(bucket)))
+        chosen.append(start + int(np.argmax(bucket)))
+    return np.unique(chosen)
+
+
+_METHODS = {'lttb': _lttb, 'minmax': _minmax}
+
+
+def downsample(x, y, points: int, method: str = 'lttb'):
+    """
+    Reduce a series to at most the given number of points.
+
+    Returns the downsampled ``x`` and ``y`` arrays.
+    Series with at most ``points`` points are returned unchanged.
+
+    x, y : array-like
+        The coordinates of each point, ordered by ``x``.
+    points : int
+        The maximum number of points to keep. At least 3.
+    method : str
+        The downsampling algorithm, ``'lttb'`` or ``'minmax'``.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if method not in _METHODS:
+        raise ValueError('Unknown downsampling method {!r}.'.format(method))
+    if points < 3:
+        raise ValueError('Must keep at least 3 points.')
+    if len(x) <= points:
+        return x, y
+    chosen = _METHODS[method](x, y, points)
+    return x[chosen], y[chosen]
+
+
+def _coordinates(x, y, precision: int) -> str:
+    """Format each point as a pgfplots coordinate."""
+    number = '%.{}g'.format(precision)
+    pairs = np.char.add(np.char.add(np.char.mod('(' + number, x), ','),
+                        np.char.mod(number + ')', y))
+    return ' '.join(pairs.tolist())
+
+
+def series(x,
+           y=None,
+           points: int = 1000,
+           method: str = 'lttb',
+           options: str = None,
+           precision: int = 6) -> str:
+    r"""
+    Format a data series as a pgfplots ``\addplot`` command.
+
+    The series is downsampled to at most ``points`` points,
+    and points with non-finite coordinates are dropped.
+
+    x : array-like
+        The x coordinate of each point, in increasing order.
+        If ``y`` is not given, the y coordinates instead,
+        plotted against their index.
+    y : array-like or None
+        The y coordinate of each point.
+    points : int or None
+        The maximum number of points to plot.
+        If ``None``, the series is not downsampled.
+    method : str
+        The downsampling algorithm, ``'lttb'`` or ``'minmax'``.
+    options : str or None
+        Options for the plot, such as ``'blue, thick'``.
+    precision : int
+        The number of significant digits of each coordinate.
+    """
+    if y is None:
+        y = x
+        x = np.arange(len(y))
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    finite = np.isfinite(x) & np.isfinite(y)
+    if not finite.all():
+        x = x[finite]
+        y = y[finite]
+    if points is not None:
+        x, y = downsample(x, y, points, method)
+    return r'\addplot{} coordinates {{{}}};'.format(
+        '' if options is None else '[{}]'.format(options),
+        _coordinates(x, y, precision))
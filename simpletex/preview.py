@@ -0,0 +1,263 @@
+r"""
+This module renders previews of documents as HTML or Markdown.
+
+A preview is rendered from the same builder code as the document,
+without compiling any LaTeX, by selecting a backend at render time:
+
+.. code-block:: python
+
+    html = render(write_report, backend='html')
+    markdown = render(write_report, backend='markdown')
+
+Only the document body is rendered. Previews cover:
+
+* ``Section`` and ``Subsection`` headings.
+* ``Bold``, ``Italics``, ``Emphasis``, ``Underline`` and ``SmallCaps``.
+* ``OrderedList``, ``UnorderedList`` and ``Description`` lists.
+* ``Matrix``, as a table.
+* ``Equation``, as TeX delimited for MathJax.
+* ``Document``, ``Centering``, ``Columns`` and fonts, as their contents.
+
+Other formatters are rendered as LaTeX, and so are nodes of the
+functional builder (see ``simpletex.builder``), which are formatted
+as soon as they are built.
+Headings, matrix entries and text passed to ``latex_escape``
+are escaped for the preview format;
+other text written to the document is passed through as is.
+
+..  :copyright: (c) 2016 by Samuel Li.
+    :license: GNU GPLv3, see License for more details.
+"""
+
+import html
+import re
+from itertools import count, repeat
+
+from simpletex.document import Document, Title
+from simpletex.formatting.core import Indent
+from simpletex.formatting.font import Font, FontSelector, SizeSelector
+from simpletex.formatting.layout import Centering, Columns
+from simpletex.formatting.text import SimpleFormatter
+from simpletex.math import Equation, Matrix
+from simpletex.sequences import OrderedList, UnorderedList, Description
+
+__all__ = ('Preview', 'HTMLPreview', 'MarkdownPreview', 'BACKENDS')
+
+_HEADING_LEVELS = {'section': 2, 'subsection': 3}
+"""Heading level of each sectioning command; others are level 4."""
+
+_ELLIPSES = {r'\cdots': '…', r'\vdots': '⋮', r'\ddots': '⋱'}
+"""Characters replacing the ellipses of summarized matrices."""
+
+
+def _items(text):
+    """
+    Return the key and value of each item of a list, as ``ItemList`` does.
+
+    Keys are ``None`` for items without a key.
+    """
+    try:
+        return list(text.items())
+    except AttributeError:
+        try:
+            return [(key, item) for key, item in text]
+        except ValueError:
+            return [(None, item) for item in text]
+
+
+class Preview:
+    """
+    Formats text for a preview format, rather than as LaTeX.
+
+    Each formatter is formatted by the method named in ``methods``
+    for its class, or the closest of its base classes.
+    Formatters without a method are formatted as LaTeX.
+    """
+
+    methods = {
+        Document: '_contents',
+        Columns: '_contents',
+        Indent: '_contents',
+        Font: '_contents',
+        FontSelector: '_contents',
+        SizeSelector: '_contents',
+        Centering: 'centering',
+        Title: 'heading',
+        SimpleFormatter: 'style',
+        OrderedList: 'ordered_list',
+        UnorderedList: 'unordered_list',
+        Description: 'description',
+        Matrix: 'matrix',
+        Equation: 'equation',
+    }
+    """Name of the method formatting each formatter class."""
+
+    def format(self, formatter, *args, **kwargs) -> str:
+        """Format the arguments of the given formatter."""
+        for cls in type(formatter).__mro__:
+            name = self.methods.get(cls)
+            if name is not None:
+                return getattr(self, name)(formatter, *args, **kwargs)
+        return formatter._format_text(*args, **kwargs)
+
+    @staticmethod
+    def escape(text) -> str:
+        """Escape any special characters of the preview format."""
+        return str(text)
+
+    @staticmethod
+    def _contents(formatter, text) -> str:
+        return str(text)
+
+    def centering(self, formatter, text) -> str:
+        return str(text)
+
+    @staticmethod
+    def _level(formatter) -> int:
+        return _HEADING_LEVELS.get(formatter.command_name, 4)
+
+    def _cells(self, formatter, data, shape):
+        """Return the escaped entries of each row of a matrix."""
+        return [[_ELLIPSES.get(cell) or self.escape(cell)
+                 for cell in map(str, row)]
+                for row in formatter._rows(data, shape)]
+
+    @staticmethod
+    def _equation(formatter, text) -> str:
+        """Return the TeX of an equation, and whether it is inline."""
+        return (' = '.join(map(str, text)),
+                formatter._symbol == '$')
+
+
+class HTMLPreview(Preview):
+    """Formats text as HTML."""
+
+    tags = {'textbf': 'strong', 'textit': 'i', 'emph': 'em',
+            'underline': 'u', 'textsc': 'span style="font-variant: '
+                                        'small-caps"'}
+    """HTML element of each text style, by LaTeX command."""
+
+    @staticmethod
+    def escape(text) -> str:
+        return html.escape(str(text), quote=False)
+
+    def centering(self, formatter, text) -> str:
+        return '<div style="text-align: center">\n{}\n</div>'.format(text)
+
+    def heading(self, formatter, text) -> str:
+        level = self._level(formatter)
+        return '<h{0}>{1}</h{0}>\n{2}'.format(level,
+                                               self.escape(formatter.title),
+                                               text)
+
+    def style(self, formatter, text) -> str:
+        tag = self.tags.get(formatter.command_name)
+        if tag is None:
+            return str(text)
+        return '<{}>{}</{}>'.format(tag, text, tag.split()[0])
+
+    @staticmethod
+    def _list(tag: str, text) -> str:
+        lines = ['<{}>'.format(tag)]
+        lines.extend('<li>{}</li>'.format(item) for key, item in _items(text))
+        lines.append('</{}>'.format(tag))
+        return '\n'.join(lines)
+
+    def ordered_list(self, formatter, text) -> str:
+        return self._list('ol', text)
+
+    def unordered_list(self, formatter, text) -> str:
+        return self._list('ul', text)
+
+    def description(self, formatter, text) -> str:
+        lines = ['<dl>']
+        for key, item in _items(text):
+            if key is not None:
+                lines.append('<dt>{}</dt>'.format(key))
+            lines.append('<dd>{}</dd>'.format(item))
+        lines.append('</dl>')
+        return '\n'.join(lines)
+
+    def matrix(self, formatter, data, shape=None) -> str:
+        lines = ['<table>']
+        for row in self._cells(formatter, data, shape):
+            lines.append('<tr>{}</tr>'.format(''.join(
+                '<td>{}</td>'.format(cell) for cell in row)))
+        lines.append('</table>')
+        return '\n'.join(lines)
+
+    def equation(self, formatter, text) -> str:
+        tex, inline = self._equation(formatter, text)
+        template = r'\({}\)' if inline else r'\[{}\]'
+        return template.format(self.escape(tex))
+
+
+class MarkdownPreview(Preview):
+    """Formats text as Markdown."""
+
+    markers = {'textbf': '**', 'textit': '*', 'emph': '*'}
+    """Markdown delimiters of each text style, by LaTeX command."""
+
+    _SPECIAL = re.compile(r'([\\`*_\[\]#<>|])')
+
+    def escape(self, text) -> str:
+        return self._SPECIAL.sub(r'\\\1', str(text))
+
+    @staticmethod
+    def _block(text: str) -> str:
+        """Separate a block from the surrounding text by blank lines."""
+        return '\n{}\n'.format(text)
+
+    def heading(self, formatter, text) -> str:
+        return '{}\n{}'.format(self._block('{} {}'.format(
+            '#' * self._level(formatter), self.escape(formatter.title))),
+            text)
+
+    def style(self, formatter, text) -> str:
+        marker = self.markers.get(formatter.command_name, '')
+        return '{}{}{}'.format(marker, text, marker)
+
+    @staticmethod
+    def _list(bullets, text) -> str:
+        lines = []
+        for bullet, (key, item) in zip(bullets, _items(text)):
+            indent = '\n' + ' ' * (len(bullet) + 1)
+            item = str(item).strip('\n').replace('\n', indent)
+            lines.append('{} {}'.format(bullet, item))
+        return MarkdownPreview._block('\n'.join(lines))
+
+    def ordered_list(self, formatter, text) -> str:
+        return self._list(('{}.'.format(number) for number in count(1)),
+                          text)
+
+    def unordered_list(self, formatter, text) -> str:
+        return self._list(repeat('-'), text)
+
+    def description(self, formatter, text) -> str:
+        lines = []
+        for key, item in _items(text):
+            if key is None:
+                lines.append(str(item))
+            else:
+                lines.append('**{}** {}'.format(key, item))
+        return self._block('\n\n'.join(lines))
+
+    def matrix(self, formatter, data, shape=None) -> str:
+        rows = self._cells(formatter, data, shape)
+        if not rows:
+            return ''
+        # Markdown tables require a header, which matrices lack
+        lines = ['|{}|'.format('|'.join(['   '] * len(rows[0]))),
+                 '|{}|'.format('|'.join(['---'] * len(rows[0])))]
+        lines.extend('| {} |'.format(' | '.join(row)) for row in rows)
+        return self._block('\n'.join(lines))
+
+    def equation(self, formatter, text) -> str:
+        tex, inline = self._equation(formatter, text)
+        if inline:
+            return '${}$'.format(tex)
+        return self._block('$${}$$'.format(tex))
+
+
+BACKENDS = {'html': HTMLPreview(), 'markdown': MarkdownPreview()}
+"""Preview backends, by name."""
@@ -0,0 +1,166 @@
+r"""
+This module resolves cross-references in Python, saving LaTeX passes.
+
+LaTeX only resolves ``\ref`` commands and the table of contents
+on a second pass, using numbers recorded in the ``.aux`` and ``.toc`` files.
+As simpletex knows every heading of a document, it can instead
+number headings itself, and emit references and the table of contents
+as literal text, so that a single pass gives a correct document.
+
+Sectioning commands are numbered as LaTeX numbers them,
+including after ``\appendix``.
+A ``\label`` is only resolved if it belongs to a heading,
+that is, if it follows a heading, and is not within an environment
+(other than ``document``).
+References to other labels (such as equations), and ``\pageref``
+commands, are left to LaTeX.
+
+..  :copyright: (c) 2016 by Samuel Li.
+    :license: GNU GPLv3, see License for more details.
+"""
+
+import re
+
+import simpletex
+from simpletex.core import Paragraph
+from simpletex.macros import _group_end
+
+__all__ = ('resolve', 'resolve_references')
+
+_LEVELS = ('chapter', 'section', 'subsection', 'subsubsection')
+"""Sectioning commands, from outermost to innermost."""
+
+_TOKEN = re.compile(r'\\(?:'
+                    r'(?P<level>{})(?P<star>\*?)(?:\[(?P<short>[^\]]*)\])?\{{'
+                    r'|label\{{(?P<label>[^}}]*)\}}'
+                    r'|ref\{{(?P<ref>[^}}]*)\}}'
+                    r'|begin\{{(?P<begin>[^}}]*)\}}'
+                    r'|end\{{(?P<end>[^}}]*)\}}'
+                    r'|(?P<command>appendix|tableofcontents)(?![A-Za-z])'
+                    r')'.format('|'.join(_LEVELS)))
+
+_VERBATIM = ('verbatim', 'verbatim*', 'lstlisting', 'minted')
+"""Environments whose contents are typeset literally."""
+
+_TOC_INDENT = 1.5
+"""Indentation of each level of the table of contents, in ems."""
+
+
+def _letters(value: int) -> str:
+    r"""Format a counter as LaTeX's ``\Alph`` does."""
+    return chr(ord('A') + value - 1)
+
+
+def resolve(text: str):
+    r"""
+    Resolve the references and table of contents in the given text.
+
+    Returns the resolved text, and a dictionary mapping
+    each resolved label to its heading number.
+
+    text : str
+        The rendered LaTeX document body.
+    """
+    counters = dict.fromkeys(_LEVELS, 0)
+    used = set()
+    appendix = False
+    environments = []
+    number = ''
+    labels = {}
+    headings = []
+    replacements = []
+    for match in _TOKEN.finditer(text):
+        if environments and environments[-1] in _VERBATIM:
+            if match.group('end') == environments[-1]:
+                environments.pop()
+            continue
+        level = match.group('level')
+        if level is not None:
+            end = _group_end(text, match.end() - 1)
+            if end is None or match.group('star'):
+                continue
+            used.add(level)
+            counters[level] += 1
+            for inner in _LEVELS[_LEVELS.index(level) + 1:]:
+                counters[inner] = 0
+            number = _number(counters, used, appendix, level)
+            title = match.group('short')
+            if title is None:
+                title = text[match.end():end - 1]
+            headings.append((level, number, title))
+        elif match.group('label') is not None:
+            if number and not [name for name in environments
+                               if name != 'document']:
+                labels.setdefault(match.group('label'), number)
+        elif match.group('ref') is not None:
+            replacements.append((match.start(), match.end(),
+                                 match.group('ref')))
+        elif match.group('begin') is not None:
+            environments.append(match.group('begin'))
+        elif match.group('end') is not None:
+            if environments and environments[-1] == match.group('end'):
+                environments.pop()
+        elif match.group('command') == 'appendix':
+            appendix = True
+            top = _top_level(used)
+            counters[top] = 0
+        else:
+            replacements.append((match.start(), match.end(), None))
+
+    pieces = []
+    position = 0
+    for start, end, key in replacements:
+        if key is None:
+            replacement = _table_of_contents(headings, _top_level(used))
+        elif key in labels:
+            replacement = labels[key]
+        else:
+            continue
+        pieces.append(text[position:start])
+        pieces.append(replacement)
+        position = end
+    pieces.append(text[position:])
+    return ''.join(pieces), labels
+
+
+def _top_level(used) -> str:
+    """Return the outermost sectioning level used in the document."""
+    return 'chapter' if 'chapter' in used else 'section'
+
+
+def _number(counters, used, appendix: bool, level: str) -> str:
+    """Format the number of a heading, as LaTeX does."""
+    top = _top_level(used)
+    levels = _LEVELS[_LEVELS.index(top):_LEVELS.index(level) + 1]
+    parts = [str(counters[name]) for name in levels]
+    if appendix:
+        parts[0] = _letters(counters[top])
+    return '.'.join(parts)
+
+
+def _table_of_contents(headings, top: str) -> str:
+    lines = [r'\{}*{{\contentsname}}'.format(top)]
+    if headings:
+        outermost = min(_LEVELS.index(level) for level, _, _ in headings)
+    for level, number, title in headings:
+        depth = _LEVELS.index(level) - outermost
+        indent = ''
+        if depth:
+            indent = r'\hspace*{{{:g}em}}'.format(depth * _TOC_INDENT)
+        lines.append(r'\noindent{}{}\quad {}\par'.format(indent,
+                                                          number, title))
+    return '\n'.join(lines)
+
+
+def resolve_references() -> dict:
+    """
+    Resolve the references and table of contents of the current document.
+
+    Should be called once the document is complete, just before saving.
+    Returns a dictionary mapping each resolved label to its heading number.
+    """
+    preamble = simpletex._CONTEXT.preamble
+    resolved, labels = resolve(str(preamble.body))
+    preamble.body = Paragraph()
+    preamble.body.write(resolved)
+    return labels
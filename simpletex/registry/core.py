@@ -6,7 +6,6 @@ This module provides basic registries to use in the document preamble.
 """
 
 from simpletex.core import Registry
-from simpletex.base import Command
 
 __all__ = ()
 
@@ -17,6 +16,8 @@ class ImportRegistry(Registry):
 
     @staticmethod
     def _entry_line(entry, value):
+        # Imported here so that ``import simpletex`` stays lightweight
+        from simpletex.base import Command
         args, kwargs = value
         return Command('usepackage',
                        [entry],
@@ -25,10 +26,38 @@ class ImportRegistry(Registry):
 
 
 class CommandDefinitionRegistry(Registry):
+    """
+    Defines command aliases, by name.
+
+    Each value is a definition, or a pair of a definition
+    and the number of arguments the command takes.
+    """
+
     def __init__(self):
         super().__init__()
 
     @staticmethod
-    def _entry_line(entry, definition):
+    def _entry_line(entry, value):
+        from simpletex.base import Command, Brace
+        if isinstance(value, tuple):
+            definition, arguments = value
+        else:
+            definition, arguments = value, 0
+        if arguments:
+            return '{}{}[{}]{}'.format(Command('newcommand'),
+                                       Brace()(Command(entry)),
+                                       arguments,
+                                       Brace()(definition))
         return Command('newcommand',
                        [Command(entry), definition])
+
+
+class EnvironmentDefinitionRegistry(Registry):
+    def __init__(self):
+        super().__init__()
+
+    @staticmethod
+    def _entry_line(entry, value):
+        from simpletex.base import Command
+        begin, end = value
+        return Command('newenvironment', [entry, begin, end])
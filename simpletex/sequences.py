@@ -5,7 +5,7 @@ This module provides formatters to create sequences and lists.
     :license: GNU GPLv3, see License for more details.
 """
 
-from simpletex.core import Formatter
+from simpletex.core import Formatter, checkpoints
 from simpletex.base import Environment
 
 __all__ = ('OrderedList', 'UnorderedList', 'Description')
@@ -26,13 +26,14 @@ class ItemList(Formatter):
         """
         try:
             return '\n'.join(r'\item[{}] {}'.format(key, item)
-                             for key, item in text.items())
+                             for key, item in checkpoints(text.items()))
         except AttributeError:
             try:
                 return '\n'.join(r'\item[{}] {}'.format(key, item)
-                                 for key, item in text)
+                                 for key, item in checkpoints(text))
             except ValueError:
-                return '\n'.join(r'\item {}'.format(item) for item in text)
+                return '\n'.join(r'\item {}'.format(item)
+                                 for item in checkpoints(text))
 
 
 class OrderedList(Environment):
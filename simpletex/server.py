@@ -0,0 +1,330 @@
+"""
+This module serves document renders over a Unix socket.
+
+A long-running server avoids paying for interpreter startup,
+imports and cold caches on every document. Start it with:
+
+.. code-block:: sh
+
+    python -m simpletex.server /tmp/simpletex.sock --preload reports
+
+and render documents with a ``Client``:
+
+.. code-block:: python
+
+    with Client('/tmp/simpletex.sock') as client:
+        text = client.render(spec={'type': 'document', 'body': 'Hello.'})
+        text = client.render(builder='reports:quarterly', args=[2016],
+                             select=['Results'])
+
+Each request is rendered in its own isolated document,
+in one of the server's threads.
+Builders are functions named ``'module:function'``, which write
+a document with the imperative API, closing any contexts they open.
+They must not depend on global state such as ``simpletex.pretty``.
+Only functions defined in the preloaded modules can be called,
+so that clients cannot call arbitrary functions of the server.
+
+The protocol is line based. Each request is a line of JSON, holding
+either a ``'spec'`` (see ``simpletex.spec``) or a ``'builder'``,
+with its ``'args'``, ``'kwargs'`` and ``'select'`` (as for
+``simpletex.render``), and an optional ``'timeout'`` in seconds.
+The text is streamed back as it is rendered, in chunks.
+Each chunk is a line of JSON holding its ``'chunk'`` length,
+followed by that many bytes of UTF-8 text.
+The response ends with a line of JSON holding ``'end'``,
+or an ``'error'`` and its ``'type'``,
+in which case the chunks sent so far should be discarded.
+A connection may carry any number of requests, one after another.
+
+.. warning::
+   The socket is only accessible to the user running the server,
+   but anyone able to connect to it can call any public function
+   of the preloaded modules.
+
+..  :copyright: (c) 2016 by Samuel Li.
+    :license: GNU GPLv3, see License for more details.
+"""
+
+import importlib
+import json
+import os
+import socket
+import socketserver
+import stat
+import sys
+from contextlib import nullcontext
+
+import simpletex
+from simpletex import spec
+from simpletex.core import CancelToken
+
+__all__ = ('Server', 'Client', 'ServerError', 'serve')
+
+_WARM_MODULES = ('simpletex.base', 'simpletex.document',
+                 'simpletex.formatting.text', 'simpletex.math',
+                 'simpletex.sequences', 'simpletex.transliteration')
+"""Modules imported as the server starts, rather than on first request."""
+
+_CHUNK_SIZE = 1 << 16
+"""Number of bytes of text sent in each chunk, at most."""
+
+
+class ServerError(RuntimeError):
+    """
+    Raised by a client when the server fails to render a document.
+
+    kind : str
+        The name of the exception raised by the server,
+        such as ``'RenderTimeout'``.
+    """
+
+    def __init__(self, kind: str, message: str):
+        super().__init__('{}: {}'.format(kind, message))
+        self.kind = kind
+
+
+def _builder(reference: str, modules):
+    """
+    Return the builder function with the given ``'module:function'``.
+
+    Only public functions defined in one of the given modules are found.
+    """
+    module_name, separator, name = reference.partition(':')
+    if not separator:
+        raise ValueError('Invalid builder {!r}; expected '
+                         "'module:function'.".format(reference))
+    if module_name not in modules:
+        raise ValueError('Builder module {!r} is not preloaded.'
+                         .format(module_name))
+    builder = getattr(sys.modules[module_name], name, None)
+    if (name.startswith('_') or not callable(builder) or
+            getattr(builder, '__module__', None) != module_name):
+        raise ValueError('Builder {!r} is not a function of module {!r}.'
+                         .format(name, module_name))
+    return builder
+
+
+def _render(request: dict, modules, write):
+    """Render the document described by a request, streaming its text."""
+    context = simpletex._GlobalContextManager()
+    if 'spec' in request:
+        def build():
+            text = spec.render_node(request['spec'])
+            if text is not None:
+                simpletex.write(text)
+    else:
+        builder = _builder(request['builder'], modules)
+        args = request.get('args', ())
+        kwargs = request.get('kwargs', {})
+        context.select(request.get('select'))
+
+        def build():
+            builder(*args, **kwargs)
+    token = None
+    if request.get('timeout') is not None:
+        token = CancelToken(request['timeout'])
+    with (nullcontext() if token is None else token), context:
+        build()
+        context.preamble.stream(write)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            buffered = []
+            size = 0
+
+            def send(text):
+                nonlocal size
+                if text:
+                    buffered.append(text.encode('utf-8'))
+                    size += len(buffered[-1])
+                    if size >= _CHUNK_SIZE:
+                        flush()
+
+            def flush():
+                nonlocal size
+                data = b''.join(buffered)
+                for start in range(0, len(data), _CHUNK_SIZE):
+                    chunk = data[start:start + _CHUNK_SIZE]
+                    self._send({'chunk': len(chunk)})
+                    self.wfile.write(chunk)
+                buffered.clear()
+                size = 0
+            try:
+                _render(json.loads(line.decode('utf-8')),
+                        self.server.modules, send)
+            except Exception as e:
+                self._send({'error': str(e), 'type': type(e).__name__})
+            else:
+                flush()
+                self._send({'end': True})
+
+    def _send(self, header: dict):
+        self.wfile.write(json.dumps(header).encode('utf-8') + b'\n')
+
+
+class Server(socketserver.ThreadingUnixStreamServer):
+    """Renders documents for clients connecting to a Unix socket."""
+
+    daemon_threads = True
+
+    def __init__(self, path: str, preload=()):
+        """
+        Listen on the given socket, and warm the caches.
+
+        Call ``serve_forever`` to start serving requests.
+
+        path : str
+            The path of the socket.
+            A stale socket at the path is replaced.
+        preload : iterable of str
+            The names of the modules whose functions
+            may be called as builders, imported upfront.
+        """
+        self.modules = frozenset(preload)
+        for name in _WARM_MODULES + tuple(self.modules):
+            importlib.import_module(name)
+        simpletex.transliteration.translation_table()
+        try:
+            if stat.S_ISSOCK(os.stat(path).st_mode):
+                os.remove(path)
+        except FileNotFoundError:
+            pass
+        mask = os.umask(0o177)
+        try:
+            super().__init__(path, _Handler)
+        finally:
+            os.umask(mask)
+
+    def server_close(self):
+        """Stop listening, and remove the socket."""
+        super().server_close()
+        try:
+            os.remove(self.server_address)
+        except OSError:
+            pass
+
+
+def serve(path: str, preload=()):
+    """Serve renders on the given socket, until interrupted."""
+    with Server(path, preload) as server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+class Client:
+    """A connection to a render server."""
+
+    def __init__(self, path: str):
+        """
+        Connect to the server listening on the given socket.
+
+        path : str
+            The path of the server's socket.
+        """
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self._socket.connect(path)
+        except OSError:
+            self._socket.close()
+            raise
+        self._file = self._socket.makefile('rwb')
+
+    def render(self, spec=None, builder: str = None, **options) -> str:
+        """
+        Render a document on the server, returning its text.
+
+        Takes the same arguments as ``stream``.
+        """
+        pieces = []
+        self.stream(pieces.append, spec, builder, **options)
+        return b''.join(pieces).decode('utf-8')
+
+    def stream(self,
+               write,
+               spec=None,
+               builder: str = None,
+               args=(),
+               kwargs=None,
+               select=None,
+               timeout: float = None):
+        """
+        Render a document on the server, streaming its text.
+
+        Raises ``ServerError`` if the server fails to render it,
+        possibly after some of the text was written.
+
+        write : callable
+            Called with each chunk of the UTF-8 encoded text, as bytes.
+            Chunks may split characters.
+        spec : node or None
+            The document specification to render.
+            Must be serializable as JSON.
+        builder : str or None
+            The builder to render instead, as ``'module:function'``.
+            Its module must be preloaded by the server.
+        args, kwargs
+            Arguments passed to the builder.
+            Must be serializable as JSON.
+        select : iterable of str or None
+            The sections to render, as for ``simpletex.render``.
+        timeout : float or None
+            The number of seconds after which the render is cancelled.
+        """
+        if (spec is None) == (builder is None):
+            raise ValueError('Give exactly one of a spec and a builder.')
+        if builder is None:
+            request = {'spec': spec}
+        else:
+            request = {'builder': builder, 'args': list(args),
+                       'kwargs': kwargs or {}}
+            if select is not None:
+                request['select'] = list(select)
+        if timeout is not None:
+            request['timeout'] = timeout
+        self._file.write(json.dumps(request).encode('utf-8') + b'\n')
+        self._file.flush()
+        while True:
+            line = self._file.readline()
+            if not line:
+                raise ConnectionError('The server closed the connection.')
+            header = json.loads(line.decode('utf-8'))
+            if 'error' in header:
+                raise ServerError(header['type'], header['error'])
+            if 'end' in header:
+                return
+            write(self._file.read(header['chunk']))
+
+    def close(self):
+        """Close the connection."""
+        self._file.close()
+        self._socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def main(arguments=None):
+    """Run a render server, as ``python -m simpletex.server``."""
+    import argparse
+    parser = argparse.ArgumentParser(
+        prog='python -m simpletex.server',
+        description='Serve simpletex renders on a Unix socket.')
+    parser.add_argument('path', help='the path of the socket')
+    parser.add_argument('--preload', action='append', default=[],
+                        metavar='MODULE',
+                        help='a module whose functions may be called '
+                             'as builders')
+    options = parser.parse_args(arguments)
+    serve(options.path, options.preload)
+
+
+if __name__ == '__main__':
+    main()
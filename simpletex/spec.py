@@ -0,0 +1,180 @@
+"""
+This module renders documents described declaratively, as plain data.
+
+A document specification (or spec) is built from nodes, which may be:
+
+* A string, written to the document as is (as LaTeX).
+* A list of nodes, rendered one per line.
+* A dictionary, with a ``'type'`` entry naming the node type,
+  an optional ``'body'`` entry holding its content, and any other
+  entries passed as keyword arguments to the corresponding formatter.
+* Any other object, converted to a string.
+
+For example, the following spec is equivalent to writing
+two lines of text within a ``Section`` within a ``Document``:
+
+.. code-block:: python
+
+    {'type': 'document',
+     'body': [{'type': 'usepackage', 'name': 'amsmath'},
+              {'type': 'section', 'name': 'Results',
+               'body': ['Some text.',
+                        {'type': 'bold', 'body': 'Bold text.'}]}]}
+
+Specs are rendered by calling formatters directly,
+without going through the global context stack.
+Specs consisting only of dictionaries, lists, strings and numbers
+can be loaded from JSON.
+
+..  :copyright: (c) 2016 by Samuel Li.
+    :license: GNU GPLv3, see License for more details.
+"""
+
+import simpletex
+from simpletex import latex_escape, usepackage
+from simpletex.core import join_lines
+from simpletex.base import Environment
+from simpletex.document import Document, Section, Subsection
+from simpletex.formatting.font import Font
+from simpletex.formatting.layout import Centering, Columns
+from simpletex.formatting.text import (Bold, Italics, Underline,
+                                       SmallCaps, Emphasis)
+from simpletex.math import Equation, Align, Matrix
+from simpletex.sequences import OrderedList, UnorderedList, Description
+
+__all__ = ('render', 'render_node')
+
+_RESERVED_KEYS = frozenset(('type', 'body'))
+"""Node entries which are not passed to the formatter."""
+
+_BLOCK = 'block'
+"""The body is a node, rendered as a single block of text."""
+
+_ITEMS = 'items'
+"""The body is a list of nodes, each rendered separately."""
+
+_PAIRS = 'pairs'
+"""
+The body is a mapping or a list of entries, each either a node
+or a pair of nodes. Pairs are given as tuples, or (as in JSON)
+as dictionaries holding only a ``'key'`` and a ``'value'`` entry.
+Lists are always nodes, never pairs.
+"""
+
+_PAIR_KEYS = frozenset(('key', 'value'))
+"""Entries of a dictionary giving a pair of nodes."""
+
+_DATA = 'data'
+"""The body is passed to the formatter unchanged."""
+
+NODE_TYPES = {
+    'document': (Document, _BLOCK),
+    'section': (Section, _BLOCK),
+    'subsection': (Subsection, _BLOCK),
+    'environment': (Environment, _BLOCK),
+    'centering': (Centering, _BLOCK),
+    'columns': (Columns, _BLOCK),
+    'bold': (Bold, _BLOCK),
+    'italics': (Italics, _BLOCK),
+    'underline': (Underline, _BLOCK),
+    'small_caps': (SmallCaps, _BLOCK),
+    'emphasis': (Emphasis, _BLOCK),
+    'font': (Font, _BLOCK),
+    'ordered_list': (OrderedList, _ITEMS),
+    'unordered_list': (UnorderedList, _ITEMS),
+    'description': (Description, _PAIRS),
+    'equation': (Equation, _ITEMS),
+    'align': (Align, _PAIRS),
+    'matrix': (Matrix, _DATA),
+}
+"""
+Formatters for each node type, with the way their body is rendered.
+
+Add an entry to support a new formatter.
+Besides these, the ``'text'`` type renders its body escaped with
+``latex_escape``, and the ``'usepackage'`` type imports the package
+named by its ``'name'`` entry, with any ``'options'`` (a list)
+and ``'keywords'`` (a mapping) as package options.
+"""
+
+
+def render(spec) -> str:
+    """
+    Render the given spec as an entire document (including preamble).
+
+    The result is the same as writing the spec's content
+    with the imperative API, and then calling ``dump``.
+    The current global document is left untouched.
+
+    spec : node
+        The document specification.
+    """
+    with simpletex._GlobalContextManager():
+        text = render_node(spec)
+        if text is not None:
+            simpletex.write(text)
+        return simpletex.dump()
+
+
+def render_node(node):
+    """
+    Render a single node of a spec, returning the resulting text.
+
+    Package imports and other preamble entries are registered
+    in the current global document.
+    Returns ``None`` for nodes which produce no text.
+    """
+    if isinstance(node, str):
+        return node
+    if isinstance(node, list):
+        return _render_block(node)
+    if isinstance(node, dict):
+        return _render_dict(node)
+    return str(node)
+
+
+def _render_block(nodes) -> str:
+    lines = (render_node(node) for node in nodes)
+    return join_lines([line for line in lines if line is not None])
+
+
+def _render_dict(node):
+    try:
+        node_type = node['type']
+    except KeyError as e:
+        raise ValueError('Node {!r} has no type.'.format(node)) from e
+    body = node.get('body', '')
+    options = {key: value for key, value in node.items()
+               if key not in _RESERVED_KEYS}
+    if node_type == 'text':
+        return latex_escape(body)
+    if node_type == 'usepackage':
+        usepackage(options.pop('name'),
+                   *options.pop('options', ()),
+                   **options.pop('keywords', {}))
+        return None
+    try:
+        formatter_class, body_type = NODE_TYPES[node_type]
+    except KeyError as e:
+        error_string = 'Unknown node type {!r}.'
+        raise ValueError(error_string.format(node_type)) from e
+    formatter = formatter_class(**options)
+    if body_type == _BLOCK:
+        text = render_node(body)
+        return formatter('' if text is None else text)
+    if body_type == _ITEMS:
+        items = (render_node(item) for item in body)
+        return formatter([item for item in items if item is not None])
+    if body_type == _PAIRS:
+        if isinstance(body, dict):
+            body = body.items()
+        return formatter([_render_entry(entry) for entry in body])
+    return formatter(body)
+
+
+def _render_entry(entry):
+    if isinstance(entry, tuple) and len(entry) == 2:
+        return tuple(map(render_node, entry))
+    if isinstance(entry, dict) and entry.keys() == _PAIR_KEYS:
+        return render_node(entry['key']), render_node(entry['value'])
+    return render_node(entry)
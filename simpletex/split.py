@@ -0,0 +1,196 @@
+r"""
+This module saves a document as a main file, and one file per chapter.
+
+Each top-level heading (``\chapter``, or ``\section`` if the document
+has no chapters) starts a part, which runs until the next top-level
+heading or the end of the document. Each part is written to its own file,
+and replaced in the main file by an ``\include`` command:
+
+.. code-block:: python
+
+    with Document():
+        write_manual()
+    save_split('build', main='manual')
+
+Files are only written if their content changed, so that unchanged
+parts keep their modification time, and make-style builds
+(or ``\includeonly``) can skip them.
+Part files included by the previous main file, but no longer part
+of the document, are removed.
+Part files are named after their heading, which should therefore be
+unique, and only contain letters, digits and spaces.
+
+As LaTeX starts a new page at each ``\include``,
+only split documents whose parts each start a new page,
+such as books with chapters.
+Headings within environments (other than ``document``) are not split.
+
+..  :copyright: (c) 2016 by Samuel Li.
+    :license: GNU GPLv3, see License for more details.
+"""
+
+import os
+import re
+
+import simpletex
+from simpletex.macros import _group_end
+from simpletex.references import _LEVELS, _TOKEN, _VERBATIM
+
+__all__ = ('split', 'save_split')
+
+_TOP_LEVELS = _LEVELS[:2]
+"""Sectioning commands which can start a part, from outermost."""
+
+_SLUG = re.compile(r'[^a-z0-9]+')
+
+_INCLUDE = re.compile(r'^[ \t]*\\include\{([a-z0-9-]+)\}[ \t]*$', re.M)
+r"""The ``\include`` lines written to a main file, with their part name."""
+
+
+def _name(title: str, used: set) -> str:
+    """Return a unique file name for the part with the given title."""
+    base = _SLUG.sub('-', title.lower()).strip('-') or 'part'
+    name = base
+    number = 1
+    while name in used:
+        number += 1
+        name = '{}-{}'.format(base, number)
+    used.add(name)
+    return name
+
+
+def _headings(text: str):
+    """
+    Find each heading which may start a part.
+
+    Yields the level, the index of the start of the heading's line,
+    the indentation of the line, and the title of each heading.
+    """
+    environments = []
+    for match in _TOKEN.finditer(text):
+        if environments and environments[-1] in _VERBATIM:
+            if match.group('end') == environments[-1]:
+                environments.pop()
+            continue
+        level = match.group('level')
+        if level in _TOP_LEVELS:
+            if [name for name in environments if name != 'document']:
+                continue
+            start = text.rfind('\n', 0, match.start()) + 1
+            indent = text[start:match.start()]
+            end = _group_end(text, match.end() - 1)
+            if indent.strip() or end is None:
+                continue
+            yield level, start, indent, text[match.end():end - 1]
+        elif match.group('begin') is not None:
+            environments.append(match.group('begin'))
+        elif match.group('end') is not None:
+            if environments and environments[-1] == match.group('end'):
+                environments.pop()
+
+
+def _dedent(text: str, indent: str) -> str:
+    """Remove the given indentation from each line of the text."""
+    if not indent:
+        return text
+    return '\n'.join(line[len(indent):] if line.startswith(indent) else line
+                     for line in text.split('\n'))
+
+
+def split(text: str):
+    r"""
+    Split the given document into a main text and one text per part.
+
+    Returns the main text, and a list of the name and text of each part.
+    The main text includes each part with ``\include{name}``.
+
+    text : str
+        The rendered LaTeX document, such as returned by ``dump``.
+    """
+    headings = list(_headings(text))
+    levels = {level for level, start, indent, title in headings}
+    top = next((level for level in _TOP_LEVELS if level in levels), None)
+    headings = [heading for heading in headings if heading[0] == top]
+    end_document = re.search(r'^[ \t]*\\end\{document\}', text, re.M)
+    end_text = len(text) if end_document is None else end_document.start()
+    main = []
+    parts = []
+    used = set()
+    position = 0
+    for index, (level, start, indent, title) in enumerate(headings):
+        if index + 1 < len(headings):
+            end = headings[index + 1][1]
+        else:
+            end = max(end_text, start)
+        name = _name(title, used)
+        part = _dedent(text[start:end], indent)
+        main.append(text[position:start])
+        main.append(r'{}\include{{{}}}'.format(indent, name))
+        if part.endswith('\n'):
+            main.append('\n')
+        parts.append((name, part.rstrip('\n') + '\n'))
+        position = end
+    main.append(text[position:])
+    return ''.join(main), parts
+
+
+def _write_changed(path: str, text: str) -> bool:
+    """Write the text to the given file, unless it already holds it."""
+    content = text.encode('utf-8')
+    try:
+        if os.path.getsize(path) == len(content):
+            with open(path, 'rb') as f:
+                if f.read() == content:
+                    return False
+    except OSError:
+        pass
+    temporary = '{}.{}.tmp'.format(path, os.getpid())
+    with open(temporary, 'wb') as f:
+        f.write(content)
+    os.replace(temporary, path)
+    return True
+
+
+def _included(path: str) -> set:
+    """Return the names of the parts included by the given main file."""
+    try:
+        with open(path, encoding='utf-8') as f:
+            return set(_INCLUDE.findall(f.read()))
+    except OSError:
+        return set()
+
+
+def save_split(directory: str, main: str = 'main') -> list:
+    """
+    Save the current document as a main file and one file per part.
+
+    Returns the paths of the files written,
+    leaving out files whose content did not change.
+    Part files included by the previous main file of the same name,
+    which are no longer parts of the document, are removed.
+
+    directory : str
+        The directory to save the files in.
+        Created if it does not exist.
+    main : str
+        The name of the main file, without the ``.tex`` extension.
+        Must not be the name of a part.
+    """
+    main_text, parts = split(simpletex.dump())
+    if main in [name for name, text in parts]:
+        raise ValueError('Part name {!r} is the name of the main file.'
+                         .format(main))
+    os.makedirs(directory, exist_ok=True)
+    main_path = os.path.join(directory, main + '.tex')
+    stale = _included(main_path).difference(name for name, text in parts)
+    written = []
+    for name, text in [(main, main_text)] + parts:
+        path = os.path.join(directory, name + '.tex')
+        if _write_changed(path, text):
+            written.append(path)
+    for name in stale - {main}:
+        try:
+            os.remove(os.path.join(directory, name + '.tex'))
+        except FileNotFoundError:
+            pass
+    return written
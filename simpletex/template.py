@@ -0,0 +1,149 @@
+"""
+This module provides templates, to render many variants of one document.
+
+A template is built once, as any other document, with ``slot``
+standing in for the text that changes between variants.
+It is then compiled into literal chunks and slot positions,
+so that each variant is rendered with a single join:
+
+.. code-block:: python
+
+    with Document():
+        write('Dear ' + slot('name') + ',')
+        write(slot('body', escape=False))
+    template = Template(dump())
+    clear()
+
+    for letter in template.fill_many(records):
+        send(letter)
+
+Slot values are escaped with ``latex_escape`` by default.
+Values spanning several lines are not indented
+to match their surroundings.
+
+..  :copyright: (c) 2016 by Samuel Li.
+    :license: GNU GPLv3, see License for more details.
+"""
+
+import re
+
+from simpletex import latex_escape, _LATEX_ESCAPE_TABLE
+
+__all__ = ('slot', 'Template')
+
+_SLOT_START = '\ue000'
+_SLOT_END = '\ue001'
+"""Private use characters delimiting slot markers in the rendered text."""
+
+_SLOT = re.compile('{}([ret])([^{}]*){}'.format(_SLOT_START, _SLOT_END,
+                                                 _SLOT_END))
+
+_RAW, _ESCAPE, _TRANSLITERATE = 'r', 'e', 't'
+
+
+def _escape(value) -> str:
+    return str(value).translate(_LATEX_ESCAPE_TABLE)
+
+
+def _transliterate(value) -> str:
+    return latex_escape(value, transliterate=True)
+
+
+_FILTERS = {_RAW: str, _ESCAPE: _escape, _TRANSLITERATE: _transliterate}
+"""Converts a slot value to text, by slot type."""
+
+
+def slot(name: str, escape: bool = True, transliterate: bool = False) -> str:
+    """
+    Return a placeholder for text filled in once the template is rendered.
+
+    The placeholder is a string, which can be written or formatted
+    like any other text.
+
+    name : str
+        The name of the slot. Must not be empty.
+        A slot may be used several times in a template.
+    escape : bool
+        If true, escape any special LaTeX characters in the slot value.
+    transliterate : bool
+        If true, also replace non-ASCII characters with LaTeX equivalents,
+        as ``latex_escape`` does.
+    """
+    if not name or _SLOT_START in name or _SLOT_END in name:
+        raise ValueError('Invalid slot name {!r}.'.format(name))
+    if transliterate:
+        slot_type = _TRANSLITERATE
+    elif escape:
+        slot_type = _ESCAPE
+    else:
+        slot_type = _RAW
+    return '{}{}{}{}'.format(_SLOT_START, slot_type, name, _SLOT_END)
+
+
+class Template:
+    """A document compiled into literal chunks and slots."""
+
+    def __init__(self, text: str):
+        """
+        Compile the given text, containing slots, into a template.
+
+        text : str
+            The rendered template document, such as returned by ``dump``.
+        """
+        self._parts = []
+        self._slots = []
+        position = 0
+        for match in _SLOT.finditer(text):
+            self._parts.append(text[position:match.start()])
+            slot_type, name = match.groups()
+            self._slots.append((len(self._parts), name, _FILTERS[slot_type]))
+            self._parts.append(None)
+            position = match.end()
+        self._parts.append(text[position:])
+
+    @property
+    def slots(self) -> set:
+        """The names of all slots in the template."""
+        return {name for position, name, convert in self._slots}
+
+    def fill(self, record) -> str:
+        """
+        Render the template, filling each slot from the given record.
+
+        record : mapping
+            The value of each slot, by name.
+        """
+        parts = self._parts.copy()
+        for position, name, convert in self._slots:
+            parts[position] = convert(record[name])
+        return ''.join(parts)
+
+    def fill_many(self, records):
+        """Render the template once per record, yielding each rendering."""
+        return map(self.fill, records)
+
+    def stream(self, records, write, separator: str = ''):
+        """
+        Render the template once per record, passing each piece to ``write``.
+
+        Renderings are written as they are made, so that
+        the records can be consumed lazily.
+
+        records : iterable of mappings
+            The value of each slot, by name, for each rendering.
+        write : callable
+            Called with each rendered piece of text, in order.
+        separator : str
+            Written between consecutive renderings.
+        """
+        first = True
+        for record in records:
+            if not first:
+                write(separator)
+            write(self.fill(record))
+            first = False
+
+    def __repr__(self):
+        """Display the slot names of the template."""
+        return '{}({})'.format(self.__class__.__name__,
+                               sorted(self.slots))
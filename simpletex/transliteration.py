@@ -0,0 +1,446 @@
+r"""
+This module provides a Unicode to LaTeX transliteration table.
+
+Characters outside of ASCII are mapped to LaTeX commands which
+pdflatex can typeset without Unicode font support,
+such as ``é`` to ``\'e`` and ``α`` to ``\ensuremath{\alpha}``.
+Math symbols are wrapped in ``\ensuremath``, so that transliterated
+text can be used both in running text and within equations.
+A few characters (such as ``ą`` and ``Ð``) require the
+``T1`` font encoding (``usepackage('fontenc', 'T1')``).
+
+The table is built once, on first use, from the explicit mappings
+below and from the character decompositions in ``unicodedata``.
+
+..  :copyright: (c) 2016 by Samuel Li.
+    :license: GNU GPLv3, see License for more details.
+"""
+
+import unicodedata
+
+import simpletex
+
+__all__ = ('transliterate',)
+
+
+_TEXT_SYMBOLS = {
+    ' ': '~',
+    '¡': r'\textexclamdown{}',
+    '¢': r'\textcent{}',
+    '£': r'\pounds{}',
+    '¤': r'\textcurrency{}',
+    '¥': r'\textyen{}',
+    '¦': r'\textbrokenbar{}',
+    '§': r'\S{}',
+    '¨': r'\textasciidieresis{}',
+    '©': r'\copyright{}',
+    'ª': r'\textordfeminine{}',
+    '«': r'\guillemotleft{}',
+    '­': r'\-',
+    '®': r'\textregistered{}',
+    '¯': r'\textasciimacron{}',
+    '°': r'\textdegree{}',
+    '´': r'\textasciiacute{}',
+    '¶': r'\P{}',
+    '·': r'\textperiodcentered{}',
+    'º': r'\textordmasculine{}',
+    '»': r'\guillemotright{}',
+    '¿': r'\textquestiondown{}',
+    'Æ': r'\AE{}',
+    'Ð': r'\DH{}',
+    'Ø': r'\O{}',
+    'Þ': r'\TH{}',
+    'ß': r'\ss{}',
+    'æ': r'\ae{}',
+    'ð': r'\dh{}',
+    'ø': r'\o{}',
+    'þ': r'\th{}',
+    'Đ': r'\DJ{}',
+    'đ': r'\dj{}',
+    'ı': r'\i{}',
+    'Ł': r'\L{}',
+    'ł': r'\l{}',
+    'Ŋ': r'\NG{}',
+    'ŋ': r'\ng{}',
+    'Œ': r'\OE{}',
+    'œ': r'\oe{}',
+    'ȷ': r'\j{}',
+    'ˆ': r'\textasciicircum{}',
+    '˜': r'\textasciitilde{}',
+    ' ': r'\enspace{}',
+    ' ': r'\quad{}',
+    ' ': r'\,',
+    '​': r'\hspace{0pt}',
+    '‐': '-',
+    '‑': '-',
+    '‒': r'{-}',
+    '–': r'\textendash{}',
+    '—': r'\textemdash{}',
+    '―': r'\textemdash{}',
+    '‘': '`',
+    '’': "'",
+    '‚': r'\quotesinglbase{}',
+    '“': '``',
+    '”': "''",
+    '„': r'\quotedblbase{}',
+    '†': r'\dag{}',
+    '‡': r'\ddag{}',
+    '•': r'\textbullet{}',
+    '…': r'\ldots{}',
+    '‰': r'\textperthousand{}',
+    '‹': r'\guilsinglleft{}',
+    '›': r'\guilsinglright{}',
+    '€': r'\texteuro{}',
+    '№': r'\textnumero{}',
+    '™': r'\texttrademark{}',
+    '␣': r'\textvisiblespace{}',
+}
+"""Characters with a text-mode LaTeX equivalent."""
+
+_MATH_SYMBOLS = {
+    '¬': r'\neg',
+    '±': r'\pm',
+    'µ': r'\mu',
+    '×': r'\times',
+    '÷': r'\div',
+    'α': r'\alpha',
+    'β': r'\beta',
+    'γ': r'\gamma',
+    'δ': r'\delta',
+    'ε': r'\varepsilon',
+    'ζ': r'\zeta',
+    'η': r'\eta',
+    'θ': r'\theta',
+    'ι': r'\iota',
+    'κ': r'\kappa',
+    'λ': r'\lambda',
+    'μ': r'\mu',
+    'ν': r'\nu',
+    'ξ': r'\xi',
+    'ο': 'o',
+    'π': r'\pi',
+    'ρ': r'\rho',
+    'ς': r'\varsigma',
+    'σ': r'\sigma',
+    'τ': r'\tau',
+    'υ': r'\upsilon',
+    'φ': r'\varphi',
+    'χ': r'\chi',
+    'ψ': r'\psi',
+    'ω': r'\omega',
+    'Α': r'\mathrm{A}',
+    'Β': r'\mathrm{B}',
+    'Γ': r'\Gamma',
+    'Δ': r'\Delta',
+    'Ε': r'\mathrm{E}',
+    'Ζ': r'\mathrm{Z}',
+    'Η': r'\mathrm{H}',
+    'Θ': r'\Theta',
+    'Ι': r'\mathrm{I}',
+    'Κ': r'\mathrm{K}',
+    'Λ': r'\Lambda',
+    'Μ': r'\mathrm{M}',
+    'Ν': r'\mathrm{N}',
+    'Ξ': r'\Xi',
+    'Ο': r'\mathrm{O}',
+    'Π': r'\Pi',
+    'Ρ': r'\mathrm{P}',
+    'Σ': r'\Sigma',
+    'Τ': r'\mathrm{T}',
+    'Υ': r'\Upsilon',
+    'Φ': r'\Phi',
+    'Χ': r'\mathrm{X}',
+    'Ψ': r'\Psi',
+    'Ω': r'\Omega',
+    'ϑ': r'\vartheta',
+    'ϕ': r'\phi',
+    'ϖ': r'\varpi',
+    'ϱ': r'\varrho',
+    'ϵ': r'\epsilon',
+    '‖': r'\|',
+    '′': r'^{\prime}',
+    '″': r'^{\prime\prime}',
+    '‴': r'^{\prime\prime\prime}',
+    'ℑ': r'\Im',
+    'ℓ': r'\ell',
+    '℘': r'\wp',
+    'ℜ': r'\Re',
+    'ℵ': r'\aleph',
+    'ℏ': r'\hbar',
+    '←': r'\leftarrow',
+    '↑': r'\uparrow',
+    '→': r'\rightarrow',
+    '↓': r'\downarrow',
+    '↔': r'\leftrightarrow',
+    '↕': r'\updownarrow',
+    '↖': r'\nwarrow',
+    '↗': r'\nearrow',
+    '↘': r'\searrow',
+    '↙': r'\swarrow',
+    '↦': r'\mapsto',
+    '↩': r'\hookleftarrow',
+    '↪': r'\hookrightarrow',
+    '↼': r'\leftharpoonup',
+    '↽': r'\leftharpoondown',
+    '⇀': r'\rightharpoonup',
+    '⇁': r'\rightharpoondown',
+    '⇌': r'\rightleftharpoons',
+    '⇐': r'\Leftarrow',
+    '⇑': r'\Uparrow',
+    '⇒': r'\Rightarrow',
+    '⇓': r'\Downarrow',
+    '⇔': r'\Leftrightarrow',
+    '⇕': r'\Updownarrow',
+    '∀': r'\forall',
+    '∂': r'\partial',
+    '∃': r'\exists',
+    '∅': r'\emptyset',
+    '∇': r'\nabla',
+    '∈': r'\in',
+    '∉': r'\notin',
+    '∋': r'\ni',
+    '∏': r'\prod',
+    '∐': r'\coprod',
+    '∑': r'\sum',
+    '−': '-',
+    '∓': r'\mp',
+    '∕': '/',
+    '∖': r'\setminus',
+    '∗': r'\ast',
+    '∘': r'\circ',
+    '∙': r'\bullet',
+    '√': r'\surd',
+    '∝': r'\propto',
+    '∞': r'\infty',
+    '∠': r'\angle',
+    '∣': r'\mid',
+    '∥': r'\parallel',
+    '∧': r'\wedge',
+    '∨': r'\vee',
+    '∩': r'\cap',
+    '∪': r'\cup',
+    '∫': r'\int',
+    '∮': r'\oint',
+    '∼': r'\sim',
+    '≀': r'\wr',
+    '≃': r'\simeq',
+    '≅': r'\cong',
+    '≈': r'\approx',
+    '≍': r'\asymp',
+    '≐': r'\doteq',
+    '≠': r'\neq',
+    '≡': r'\equiv',
+    '≤': r'\leq',
+    '≥': r'\geq',
+    '≪': r'\ll',
+    '≫': r'\gg',
+    '≺': r'\prec',
+    '≻': r'\succ',
+    '⊂': r'\subset',
+    '⊃': r'\supset',
+    '⊆': r'\subseteq',
+    '⊇': r'\supseteq',
+    '⊎': r'\uplus',
+    '⊑': r'\sqsubseteq',
+    '⊒': r'\sqsupseteq',
+    '⊓': r'\sqcap',
+    '⊔': r'\sqcup',
+    '⊕': r'\oplus',
+    '⊖': r'\ominus',
+    '⊗': r'\otimes',
+    '⊘': r'\oslash',
+    '⊙': r'\odot',
+    '⊢': r'\vdash',
+    '⊣': r'\dashv',
+    '⊤': r'\top',
+    '⊥': r'\perp',
+    '⊨': r'\models',
+    '⋀': r'\bigwedge',
+    '⋁': r'\bigvee',
+    '⋂': r'\bigcap',
+    '⋃': r'\bigcup',
+    '⋄': r'\diamond',
+    '⋅': r'\cdot',
+    '⋆': r'\star',
+    '⋈': r'\bowtie',
+    '⋮': r'\vdots',
+    '⋯': r'\cdots',
+    '⋱': r'\ddots',
+    '⌈': r'\lceil',
+    '⌉': r'\rceil',
+    '⌊': r'\lfloor',
+    '⌋': r'\rfloor',
+    '⌢': r'\frown',
+    '⌣': r'\smile',
+    '△': r'\bigtriangleup',
+    '▹': r'\triangleright',
+    '▽': r'\bigtriangledown',
+    '◃': r'\triangleleft',
+    '○': r'\bigcirc',
+    '♠': r'\spadesuit',
+    '♡': r'\heartsuit',
+    '♢': r'\diamondsuit',
+    '♣': r'\clubsuit',
+    '♭': r'\flat',
+    '♮': r'\natural',
+    '♯': r'\sharp',
+    '⟨': r'\langle',
+    '⟩': r'\rangle',
+    '⟵': r'\longleftarrow',
+    '⟶': r'\longrightarrow',
+    '⟷': r'\longleftrightarrow',
+    '⟸': r'\Longleftarrow',
+    '⟹': r'\Longrightarrow',
+    '⟺': r'\Longleftrightarrow',
+    '⟼': r'\longmapsto',
+    '⨿': r'\amalg',
+    '⪯': r'\preceq',
+    '⪰': r'\succeq',
+}
+"""Characters with a math-mode LaTeX equivalent."""
+
+_ACCENTS = {
+    '̀': r'\`',
+    '́': r"\'",
+    '̂': r'\^',
+    '̃': r'\~',
+    '̄': r'\=',
+    '̆': r'\u',
+    '̇': r'\.',
+    '̈': r'\"',
+    '̊': r'\r',
+    '̋': r'\H',
+    '̌': r'\v',
+    '̣': r'\d',
+    '̧': r'\c',
+    '̨': r'\k',
+    '̱': r'\b',
+}
+"""Combining characters and their LaTeX accent commands."""
+
+_DOTLESS = {'i': r'\i', 'j': r'\j'}
+"""Dotless letters to use beneath accents placed above a letter."""
+
+_BELOW = {'̣', '̧', '̨', '̱'}
+"""Accents placed below a letter."""
+
+_MATH_FONTS = (('BOLD', r'\mathbf'),
+               ('ITALIC', r'\mathit'),
+               ('SANS-SERIF', r'\mathsf'),
+               ('MONOSPACE', r'\mathtt'),
+               ('SCRIPT', r'\mathcal'))
+"""
+LaTeX math fonts for the mathematical alphanumeric symbols,
+keyed by a word in the symbol's Unicode name.
+Only the first match is used, and styles without a
+standard LaTeX equivalent are typeset as plain letters.
+"""
+
+_TABLE_RANGES = ((0x00a0, 0x0530),
+                 (0x1e00, 0x2c00),
+                 (0xfb00, 0xfb07),
+                 (0xfe50, 0xfe70),
+                 (0xff01, 0xffef),
+                 (0x1d400, 0x1d800))
+"""Code point ranges searched for decomposable characters."""
+
+_TABLE = None
+
+
+def _accented(text: str):
+    """Transliterate a letter followed by combining accents, if possible."""
+    letter, marks = text[0], text[1:]
+    if not ('a' <= letter.lower() <= 'z') or not marks:
+        return None
+    if not all(mark in _ACCENTS for mark in marks):
+        return None
+    if letter in _DOTLESS and marks[0] not in _BELOW:
+        letter = _DOTLESS[letter]
+    for mark in marks:
+        accent = _ACCENTS[mark]
+        if accent[1].isalpha() or len(letter) > 1:
+            letter = '{}{{{}}}'.format(accent, letter)
+        else:
+            letter = accent + letter
+    return letter
+
+
+def _decomposed(char: str, table: dict):
+    """Transliterate a character using its Unicode decomposition."""
+    decomposition = unicodedata.decomposition(char).split()
+    if not decomposition:
+        return None
+    if not decomposition[0].startswith('<'):
+        normalized = unicodedata.normalize('NFD', char)
+        if len(normalized) == 1:
+            return _lookup(normalized, table)
+        return _accented(normalized)
+    tag = decomposition[0]
+    parts = ''.join(chr(int(code, 16)) for code in decomposition[1:])
+    if tag == '<fraction>':
+        numerator, _, denominator = parts.partition('\u2044')
+        return r'\ensuremath{{\frac{{{}}}{{{}}}}}'.format(numerator,
+                                                       denominator)
+    if tag == '<font>' and parts.isascii() and parts.isalnum():
+        name = unicodedata.name(char, '').split()
+        for word, command in _MATH_FONTS:
+            if word in name:
+                if command == r'\mathcal' and not parts.isupper():
+                    break
+                return r'\ensuremath{{{}{{{}}}}}'.format(command, parts)
+    transliterations = [_lookup(part, table) for part in parts]
+    if None in transliterations:
+        return None
+    text = ''.join(transliterations)
+    if tag == '<super>':
+        return r'\ensuremath{{^{{{}}}}}'.format(text)
+    elif tag == '<sub>':
+        return r'\ensuremath{{_{{{}}}}}'.format(text)
+    elif tag in ('<compat>', '<wide>', '<noBreak>', '<font>'):
+        return text
+    return None
+
+
+def _lookup(char: str, table: dict):
+    """Transliterate a single character, or return ``None`` if impossible."""
+    if ord(char) in table:
+        return table[ord(char)]
+    elif char.isascii():
+        return char
+    return _decomposed(char, table)
+
+
+def _build_table() -> dict:
+    """Build the translation table for ``str.translate``."""
+    table = str.maketrans(simpletex._LATEX_ESCAPE_DICT)
+    for char, command in _TEXT_SYMBOLS.items():
+        table[ord(char)] = command
+    for char, command in _MATH_SYMBOLS.items():
+        table[ord(char)] = r'\ensuremath{{{}}}'.format(command)
+    for start, end in _TABLE_RANGES:
+        for code in range(start, end):
+            if code not in table:
+                transliteration = _decomposed(chr(code), table)
+                if transliteration is not None:
+                    table[code] = transliteration
+    return table
+
+
+def translation_table() -> dict:
+    """Return the transliteration table, building it on first use."""
+    global _TABLE
+    if _TABLE is None:
+        _TABLE = _build_table()
+    return _TABLE
+
+
+def transliterate(text) -> str:
+    """
+    Escape special LaTeX characters, transliterating non-ASCII characters.
+
+    Characters without a LaTeX equivalent are left unchanged.
+    """
+    text = str(text)
+    if text.isascii():
+        return text.translate(simpletex._LATEX_ESCAPE_TABLE)
+    return text.translate(translation_table())
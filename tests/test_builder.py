@@ -0,0 +1,102 @@
+import unittest
+
+import simpletex
+from simpletex import write, write_many, dump, clear, fork
+from simpletex import builder as E
+from simpletex.document import Document, Section, Subsection
+from simpletex.formatting.layout import Centering, Columns
+from simpletex.formatting.text import Bold, Italics
+from simpletex.math import Equation
+from simpletex.sequences import UnorderedList, OrderedList, Description
+
+
+SAMPLE_TEXT = 'simpletex'
+SAMPLE_HEADING = 'Heading Text'
+
+
+def build_functional():
+    with Document():
+        write(E.section(SAMPLE_HEADING,
+                        SAMPLE_TEXT,
+                        E.itemize([E.bold(SAMPLE_TEXT), 'a\nb']),
+                        E.subsection(SAMPLE_HEADING,
+                                     E.columns(E.italics(SAMPLE_TEXT),
+                                               number=3),
+                                     E.centering(E.enumerate(['x', 'y'])),
+                                     E.description({'key': 'value'}),
+                                     E.equation('x', 2))))
+
+
+def build_imperative():
+    with Document():
+        with Section(SAMPLE_HEADING):
+            write(SAMPLE_TEXT)
+            with UnorderedList():
+                write(Bold()(SAMPLE_TEXT))
+                write('a\nb')
+            with Subsection(SAMPLE_HEADING):
+                with Columns(3):
+                    write(Italics()(SAMPLE_TEXT))
+                with Centering():
+                    with OrderedList():
+                        write('x')
+                        write('y')
+                write(Description()({'key': 'value'}))
+                with Equation():
+                    write('x')
+                    write(2)
+
+
+class TestBuilder(unittest.TestCase):
+    def assertEquivalent(self):
+        build_imperative()
+        expected = dump()
+        clear()
+        build_functional()
+        self.assertEqual(dump(), expected)
+
+    def test_matches_imperative(self):
+        self.assertEquivalent()
+
+    def test_matches_imperative_minified(self):
+        simpletex.pretty = False
+        self.assertEquivalent()
+
+    def test_no_context_stack(self):
+        stack = simpletex._CONTEXT.contextStack
+        node = E.section(SAMPLE_HEADING, E.bold(SAMPLE_TEXT))
+        self.assertIs(simpletex._CONTEXT.contextStack, stack)
+        self.assertEqual(len(stack), 1)
+        self.assertEqual(dump(), '')
+        self.assertEqual(node.text, '\\section{' + SAMPLE_HEADING + '}\n'
+                         '\t\\textbf{' + SAMPLE_TEXT + '}')
+
+    def test_packages_merged(self):
+        node = E.itemize([E.columns('a'), E.columns('b', number=3)])
+        self.assertEqual(node.packages, {'multicol': ((), {})})
+        self.assertEqual(dump(), '')
+        write(node)
+        self.assertEqual(dump(), '\\usepackage{multicol}\n\n' + node.text)
+
+    def test_packages_in_forks(self):
+        with Document():
+            write(E.columns('x'))
+            variants = []
+            for name in ('A', 'B'):
+                with fork() as variant:
+                    write(name)
+                variants.append(variant.render())
+        for text in variants:
+            self.assertIn('\\usepackage{multicol}', text)
+
+    def test_packages_written_lazily(self):
+        write_many(iter([E.columns('x')]), lazy=True)
+        self.assertIn('\\usepackage{multicol}', dump())
+
+    def test_command(self):
+        self.assertEqual(str(E.command('frac', 1, E.bold(2))),
+                         '\\frac{1}{\\textbf{2}}')
+
+    def tearDown(self):
+        simpletex.pretty = True
+        clear()
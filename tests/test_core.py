@@ -1,8 +1,11 @@
+import pickle
 import unittest
 import string
 
 from simpletex import write, clear, dump
-from simpletex.core import Formatter, Text, Paragraph, Registry
+from simpletex.core import (Formatter, Text, Paragraph, Registry, CancelToken,
+                            RenderCancelled, RenderTimeout, checkpoints,
+                            _ACTIVE)
 
 SAMPLE_TEXT = string.printable
 
@@ -80,6 +83,21 @@ class TestText(unittest.TestCase):
         self.write_multiple_attributes()
         self.assertEqual(str(self.text), "XY")
 
+    def test_fork(self):
+        self.write_multiple_attributes()
+        self.text.par = Paragraph()
+        fork = self.text.fork()
+        fork.c = 'Z'
+        fork.par.write('W')
+        self.assertEqual(str(self.text), 'XY')
+        self.assertEqual(str(fork), 'XYWZ')
+
+    def test_pickle(self):
+        self.write_multiple_attributes()
+        clone = pickle.loads(pickle.dumps(self.text))
+        self.assertEqual(list(clone), ['X', 'Y'])
+        self.assertEqual(repr(clone), "Text['a', 'b']")
+
     def test_context_manager(self):
         self.assertRaises(TypeError, self.text.__enter__)
         self.assertEqual(self.text.__exit__(), None)
@@ -117,6 +135,59 @@ class TestParagraph(unittest.TestCase):
         self.write_lines()
         self.assertEqual(str(self.par), 'A\nB')
 
+    def test_fork(self):
+        self.write_lines()
+        fork = self.par.fork()
+        fork.write('C')
+        self.par.write('D')
+        self.assertEqual(list(fork), ['A', 'B', 'C'])
+        self.assertEqual(str(self.par), 'A\nB\nD')
+        self.assertEqual(len(fork), 3)
+
+    def test_fork_empty(self):
+        fork = self.par.fork()
+        fork.write('A')
+        self.assertEqual(str(fork), 'A')
+        self.assertEqual(str(self.par), '')
+
+    def test_render(self):
+        self.write_lines()
+        self.par.fork()
+        self.par.write('C')
+        self.assertEqual(self.par.render(str.lower), 'a\nb\nc')
+
+    def test_extend(self):
+        self.par.write('A')
+        self.par.extend(['B', 'C'])
+        self.par.extend(iter([]))
+        self.assertEqual(list(self.par), ['A', 'B', 'C'])
+        self.assertEqual(str(self.par), 'A\nB\nC')
+
+    def test_extend_lazy(self):
+        consumed = []
+
+        def segments():
+            consumed.append(True)
+            yield 'B'
+            yield 'C'
+
+        self.par.write('A')
+        self.par.extend(segments(), lazy=True)
+        self.par.extend([], lazy=True)
+        self.par.write('D')
+        self.assertEqual(consumed, [])
+        self.assertEqual(str(self.par), 'A\nB\nC\nD')
+        self.assertEqual(str(self.par), 'A\nB\nC\nD')
+        self.assertEqual(len(self.par), 4)
+        self.assertEqual(consumed, [True])
+
+    def test_extend_lazy_fork(self):
+        self.par.extend(iter(['A', 'B']), lazy=True)
+        fork = self.par.fork()
+        fork.write('C')
+        self.assertEqual(str(fork), 'A\nB\nC')
+        self.assertEqual(str(self.par), 'A\nB')
+
     def test_context_manager(self):
         self.assertRaises(TypeError, self.par.__enter__)
         self.assertEqual(self.par.__exit__(), None)
@@ -125,6 +196,63 @@ class TestParagraph(unittest.TestCase):
         clear()
 
 
+class TestSpill(unittest.TestCase):
+    def setUp(self):
+        Paragraph.spill_threshold = 4
+        self.par = Paragraph(spill=True)
+        self.spill_count = Paragraph.spill_count
+
+    def write_lines(self):
+        for line in ('abc', 'd\xe9f', 'g\nh', ''):
+            self.par.write(line)
+
+    def test_spilled(self):
+        self.write_lines()
+        self.assertTrue(self.par.spilled)
+        self.assertEqual(Paragraph.spill_count, self.spill_count + 1)
+
+    def test_not_spilled(self):
+        self.par.write('abc')
+        self.assertFalse(self.par.spilled)
+        self.assertFalse(Paragraph().spilled)
+
+    def test_str(self):
+        self.write_lines()
+        self.assertEqual(str(self.par), 'abc\nd\xe9f\ng\nh\n')
+
+    def test_iter(self):
+        self.write_lines()
+        self.assertEqual(list(self.par), ['abc', 'd\xe9f', 'g\nh', ''])
+        self.assertEqual(len(self.par), 4)
+
+    def test_stream(self):
+        self.write_lines()
+        pieces = []
+        self.par.stream(pieces.append, str.upper)
+        self.assertEqual(''.join(pieces), 'ABC\nD\xc9F\nG\nH\n')
+
+    def test_lazy_render(self):
+        self.write_lines()
+        rendering = self.par.render(str.upper, lazy=True)
+        self.assertEqual(str(rendering), 'ABC\nD\xc9F\nG\nH\n')
+
+    def test_fork(self):
+        self.write_lines()
+        fork = self.par.fork()
+        fork.write('fork')
+        self.par.write('original')
+        self.assertEqual(str(fork), 'abc\nd\xe9f\ng\nh\n\nfork')
+        self.assertEqual(str(self.par), 'abc\nd\xe9f\ng\nh\n\noriginal')
+
+    def test_disabled(self):
+        Paragraph.spill_threshold = None
+        self.write_lines()
+        self.assertFalse(self.par.spilled)
+
+    def tearDown(self):
+        Paragraph.spill_threshold = None
+
+
 class TestRegistry(unittest.TestCase):
     COMPLEX_OBJECT = {'A': ['B', ('C', 'D')], 'E': None, False: 'F'}
 
@@ -172,5 +300,54 @@ class TestRegistry(unittest.TestCase):
         self.register_entries()
         self.assertEqual(str(self.reg), 'A\nB')
 
+    def test_fork(self):
+        self.register_entries()
+        fork = self.reg.fork()
+        fork.register('C')
+        self.assertEqual(list(fork), ['A', 'B', 'C'])
+        self.assertEqual(list(self.reg), ['A', 'B'])
+
     def tearDown(self):
         clear()
+
+
+class TestCancelToken(unittest.TestCase):
+    def test_inactive(self):
+        items = [1, 2]
+        self.assertIs(checkpoints(items), items)
+
+    def test_progress(self):
+        token = CancelToken()
+        token.chunk = 2
+        with token:
+            self.assertEqual(list(checkpoints(range(5))), list(range(5)))
+        self.assertEqual(token.progress, 5)
+        self.assertIsNone(_ACTIVE.token)
+
+    def test_cancel(self):
+        token = CancelToken()
+        token.chunk = 2
+        rendered = []
+        with token:
+            with self.assertRaises(RenderCancelled) as caught:
+                for item in checkpoints(range(10)):
+                    rendered.append(item)
+                    if item == 2:
+                        token.cancel()
+        self.assertEqual(rendered, [0, 1, 2, 3])
+        self.assertEqual(caught.exception.progress, 4)
+
+    def test_deadline(self):
+        token = CancelToken(timeout=-1)
+        with token:
+            self.assertRaises(RenderTimeout, list, checkpoints([1]))
+        self.assertFalse(token.cancelled)
+
+    def test_paragraph(self):
+        paragraph = Paragraph()
+        paragraph.extend(map(str, range(3000)))
+        token = CancelToken()
+        token.cancel()
+        with token:
+            self.assertRaises(RenderCancelled, str, paragraph)
+        self.assertEqual(len(str(paragraph).split('\n')), 3000)
@@ -1,8 +1,13 @@
 import unittest
 import string
+import os
+import tempfile
 
+import simpletex
 from simpletex import write, clear, dump, save
+from simpletex.core import Paragraph
 from simpletex.document import Document, Section, Subsection
+from simpletex.formatting.layout import Columns
 
 
 SAMPLE_TEXT = 'simpletex'
@@ -67,3 +72,149 @@ class TestSubsection(unittest.TestCase):
         clear()
 
 
+class TestSpill(unittest.TestCase):
+    def build(self):
+        with Document():
+            for section in range(3):
+                with Section(SAMPLE_HEADING):
+                    with Columns():
+                        for line in range(20):
+                            write(SAMPLE_TEXT + '\n' + str(line))
+                    with Subsection(SAMPLE_HEADING):
+                        write(SAMPLE_TEXT)
+        handle, filename = tempfile.mkstemp()
+        os.close(handle)
+        try:
+            save(filename)
+            with open(filename, encoding='utf-8') as f:
+                saved = f.read()
+        finally:
+            os.remove(filename)
+        result = (dump(), saved)
+        clear()
+        return result
+
+    def test_output_unchanged(self):
+        expected = self.build()
+        spill_bytes = Paragraph.spill_bytes
+        Paragraph.spill_threshold = 32
+        self.assertEqual(self.build(), expected)
+        self.assertGreater(Paragraph.spill_bytes, spill_bytes)
+
+    def test_spilled_beyond_file_limit(self):
+        try:
+            import resource
+        except ImportError:
+            self.skipTest('resource limits are not available.')
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        limit = 128
+        Paragraph.spill_threshold = 8
+        resource.setrlimit(resource.RLIMIT_NOFILE, (limit, hard))
+        try:
+            with Document():
+                for index in range(2 * limit):
+                    with Section(SAMPLE_HEADING):
+                        write(SAMPLE_TEXT * 2)
+            text = dump()
+        finally:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (soft, hard))
+        self.assertEqual(text.count(SAMPLE_TEXT * 2), 2 * limit)
+
+    def tearDown(self):
+        Paragraph.spill_threshold = None
+        clear()
+
+
+class TestPretty(unittest.TestCase):
+    def build(self):
+        with Document():
+            with Section(SAMPLE_HEADING):
+                with Columns():
+                    write(SAMPLE_TEXT + '\n' + SAMPLE_TEXT)
+        result = dump()
+        clear()
+        return result
+
+    def test_minified(self):
+        simpletex.pretty = False
+        self.assertEqual(self.build(), '\n'.join([
+            r'\documentclass[12pt]{article}',
+            r'\usepackage[utf8]{inputenc}',
+            r'\usepackage{multicol}',
+            r'\begin{document}',
+            r'\section{' + SAMPLE_HEADING + '}',
+            r'\begin{multicols}',
+            SAMPLE_TEXT,
+            SAMPLE_TEXT,
+            r'\end{multicols}',
+            FOOTER]))
+
+    def test_same_lines(self):
+        pretty = self.build()
+        simpletex.pretty = False
+        minified = self.build()
+        self.assertEqual([line.strip() for line in pretty.split('\n')
+                          if line.strip()],
+                         minified.split('\n'))
+
+    def test_spilled(self):
+        simpletex.pretty = False
+        expected = self.build()
+        Paragraph.spill_threshold = 8
+        self.assertEqual(self.build(), expected)
+
+    def tearDown(self):
+        simpletex.pretty = True
+        Paragraph.spill_threshold = None
+        clear()
+
+
+class TestSelect(unittest.TestCase):
+    def setUp(self):
+        self.built = []
+
+    def part(self, name):
+        self.built.append(name)
+        write(name)
+
+    def builder(self):
+        write('Preface')
+        Section('Intro').build(self.part, 'intro')
+        with Section('Results'):
+            write('results')
+            Subsection('Tables').build(self.part, 'tables')
+            Subsection('Charts').build(self.part, 'charts')
+
+    def test_all(self):
+        self.assertEqual(simpletex.render(self.builder), '\n'.join([
+            'Preface', r'\section{Intro}', '\tintro', r'\section{Results}',
+            '\tresults', '\t\\subsection{Tables}', '\t\ttables',
+            '\t\\subsection{Charts}', '\t\tcharts']))
+        self.assertEqual(self.built, ['intro', 'tables', 'charts'])
+
+    def test_select(self):
+        text = simpletex.render(self.builder, select=['Results/Charts'])
+        self.assertEqual(text, '\n'.join([
+            'Preface', r'\section{Results}', '\tresults',
+            '\t\\subsection{Charts}', '\t\tcharts']))
+        self.assertEqual(self.built, ['charts'])
+
+    def test_discarded(self):
+        def builder():
+            with Section('Skipped'):
+                write('skipped')
+                with Subsection('Nested'):
+                    write('nested')
+            with Section('Kept'):
+                write('kept')
+        self.assertEqual(simpletex.render(builder, select=['Kept']),
+                         '\\section{Kept}\n\tkept')
+
+    def test_isolated(self):
+        write('Outside')
+        simpletex.render(self.builder, select=['Intro'])
+        self.assertEqual(dump(), 'Outside')
+        self.assertIsNone(simpletex._CONTEXT.selection)
+
+    def tearDown(self):
+        clear()
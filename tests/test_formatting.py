@@ -4,6 +4,8 @@ import string
 from simpletex import write, dump, clear
 from simpletex.formatting.text import Bold, Italics, Underline
 from simpletex.formatting.layout import Centering, Columns
+from simpletex.formatting import Style
+from simpletex.formatting.stylesheet import NamedStyle
 
 
 SAMPLE_TEXT = 'simpletex'
@@ -109,3 +111,48 @@ class TestColumns(unittest.TestCase):
             r'\end{multicols}'
         ]))
         clear()
+
+
+class TestNamedStyle(unittest.TestCase):
+    def setUp(self):
+        self.style = Style()
+        self.style.apply(Bold())
+        self.style.apply(Italics())
+
+    def tearDown(self):
+        clear()
+
+    def test_command(self):
+        warning = NamedStyle('warning', self.style)
+        write(warning('a'))
+        write(warning('b'))
+        self.assertEqual(dump(),
+                         '\\newcommand{\\warning}[1]{\\textit{\\textbf{#1}}}'
+                         '\n\n\\warning{a}\n\\warning{b}')
+
+    def test_context_manager(self):
+        with NamedStyle('warning', self.style):
+            write(SAMPLE_TEXT)
+        self.assertEqual(dump(),
+                         '\\newcommand{\\warning}[1]{\\textit{\\textbf{#1}}}'
+                         '\n\n\\warning{' + SAMPLE_TEXT + '}')
+
+    def test_block(self):
+        style = Style(inline=True)
+        style.apply(Bold())
+        with NamedStyle('note', style, block=True):
+            write(SAMPLE_TEXT)
+        self.assertEqual(dump(),
+                         '\\newenvironment{note}{\\bfseries }{}\n\n'
+                         '\\begin{note}\n\t' + SAMPLE_TEXT + '\n\\end{note}')
+
+    def test_defined_per_document(self):
+        warning = NamedStyle('warning', self.style)
+        warning(SAMPLE_TEXT)
+        clear()
+        write(warning(SAMPLE_TEXT))
+        self.assertIn('\\newcommand{\\warning}', dump())
+
+    def test_invalid_style(self):
+        with self.assertRaises(TypeError):
+            NamedStyle('warning', 'bold')
@@ -0,0 +1,105 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from simpletex import write, dump, clear
+from simpletex.graphics import Figure, AssetManager, include_graphics
+
+
+class TestFigure(unittest.TestCase):
+    def test_figure(self):
+        with Figure(caption='Caption', label='fig', placement='htbp'):
+            write(include_graphics('image.png', width='3cm'))
+        self.assertEqual(dump(), '\n'.join([
+            '\\usepackage{graphicx}',
+            '',
+            '\\begin{figure}[htbp]',
+            '\t\\centering',
+            '\t\\includegraphics[width=3cm]{image.png}',
+            '\t\\caption{Caption}',
+            '\t\\label{fig}',
+            '\\end{figure}']))
+
+    def test_plain(self):
+        self.assertEqual(Figure(centered=False)('text'),
+                         '\\begin{figure}\n\ttext\n\\end{figure}')
+
+    def tearDown(self):
+        clear()
+
+
+class TestAssetManager(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.store = os.path.join(self.directory, 'assets')
+        self.images = []
+        for number, content in enumerate([b'logo', b'chart', b'logo']):
+            path = os.path.join(self.directory, '{}.PNG'.format(number))
+            with open(path, 'wb') as f:
+                f.write(content)
+            self.images.append(path)
+
+    def add_all(self, **kwargs):
+        with AssetManager(self.store, prefix='assets', **kwargs) as assets:
+            paths = [assets.add(image) for image in self.images]
+        return paths, assets.copied
+
+    def test_deduplicated(self):
+        paths, copied = self.add_all()
+        self.assertEqual(copied, 2)
+        self.assertEqual(paths[0], paths[2])
+        self.assertNotEqual(paths[0], paths[1])
+        self.assertTrue(paths[0].startswith('assets/'))
+        self.assertTrue(paths[0].endswith('.png'))
+        stored = os.path.join(self.directory, *paths[1].split('/'))
+        with open(stored, 'rb') as f:
+            self.assertEqual(f.read(), b'chart')
+
+    def test_rerun(self):
+        expected, _ = self.add_all()
+        paths, copied = self.add_all()
+        self.assertEqual(paths, expected)
+        self.assertEqual(copied, 0)
+
+    def test_changed_file(self):
+        before, _ = self.add_all()
+        with open(self.images[1], 'wb') as f:
+            f.write(b'new chart')
+        after, copied = self.add_all()
+        self.assertNotEqual(after[1], before[1])
+        self.assertEqual(copied, 1)
+
+    def test_copied(self):
+        paths, _ = self.add_all()
+        with open(self.images[1], 'wb') as f:
+            f.write(b'edited in place')
+        stored = os.path.join(self.directory, *paths[1].split('/'))
+        with open(stored, 'rb') as f:
+            self.assertEqual(f.read(), b'chart')
+
+    def test_linked_changed_in_place(self):
+        paths, _ = self.add_all(link=True)
+        # Regenerate the chart in place, then restore its content
+        with open(self.images[1], 'wb') as f:
+            f.write(b'other')
+        stored = os.path.join(self.directory, *paths[1].split('/'))
+        content = os.path.join(self.directory, 'restored.png')
+        with open(content, 'wb') as f:
+            f.write(b'chart')
+        with AssetManager(self.store, prefix='assets', link=True) as assets:
+            self.assertEqual(assets.add(content), paths[1])
+        self.assertEqual(assets.copied, 1)
+        with open(stored, 'rb') as f:
+            self.assertEqual(f.read(), b'chart')
+
+    def test_include(self):
+        with AssetManager(self.store, prefix='assets') as assets:
+            command = assets.include(self.images[0], scale=2)
+        self.assertTrue(str(command).startswith(
+            '\\includegraphics[scale=2]{assets/'))
+        self.assertIn('\\usepackage{graphicx}', dump())
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        clear()
@@ -0,0 +1,251 @@
+import os
+import shutil
+import unittest
+import subprocess
+import sys
+import tempfile
+import threading
+
+import simpletex
+from simpletex import (latex_escape, write, write_many, dump, clear,
+                       usepackage, alias, fork, save, CancelToken,
+                       RenderCancelled, RenderTimeout)
+from simpletex.core import Paragraph
+from simpletex.document import Document, Section
+from simpletex.sequences import UnorderedList
+
+
+HEAVY_MODULES = ('simpletex.base', 'simpletex.formatting',
+                 'simpletex.document', 'simpletex.math',
+                 'simpletex.sequences')
+
+
+class TestLazyImport(unittest.TestCase):
+    def loaded_modules(self):
+        code = ('import sys, simpletex; '
+                'print(" ".join(sorted(sys.modules)))')
+        output = subprocess.check_output([sys.executable, '-c', code])
+        return output.decode().split()
+
+    def test_import_is_light(self):
+        modules = self.loaded_modules()
+        for name in HEAVY_MODULES:
+            self.assertNotIn(name, modules)
+
+    def test_submodule(self):
+        self.assertEqual(simpletex.math.__name__, 'simpletex.math')
+
+    def test_formatter_class(self):
+        from simpletex.formatting.text import Bold
+        self.assertIs(simpletex.Bold, Bold)
+
+    def test_from_import(self):
+        from simpletex import Section
+        from simpletex.document import Section as DocumentSection
+        self.assertIs(Section, DocumentSection)
+
+    def test_dir(self):
+        self.assertIn('Matrix', dir(simpletex))
+        self.assertIn('sequences', dir(simpletex))
+
+    def test_missing(self):
+        self.assertRaises(AttributeError, getattr, simpletex, 'missing')
+
+
+class TestLatexEscape(unittest.TestCase):
+    def test_plain(self):
+        self.assertEqual(latex_escape('simpletex'), 'simpletex')
+
+    def test_specials(self):
+        self.assertEqual(latex_escape('$5 & 10%'), r'\$5 \& 10\%')
+
+    def test_commands(self):
+        self.assertEqual(latex_escape('~^\\'),
+                         r'\textasciitilde\^\textbackslash')
+
+    def test_non_string(self):
+        self.assertEqual(latex_escape(-5), '{-}5')
+
+
+class CountingText:
+    """A text segment recording how many times it was rendered."""
+
+    def __init__(self, text):
+        self.text = text
+        self.renders = 0
+
+    def __str__(self):
+        self.renders += 1
+        return self.text
+
+
+class TestFork(unittest.TestCase):
+    def setUp(self):
+        clear()
+
+    def test_variants(self):
+        variants = []
+        with Document():
+            with Section('Shared'):
+                write('shared')
+                for name in ('A', 'B'):
+                    with fork() as variant:
+                        write(name)
+                    variants.append(variant.render())
+        self.assertEqual(dump().count('shared'), 1)
+        for name, text in zip(('A', 'B'), variants):
+            self.assertEqual(text.count('shared'), 1)
+            self.assertIn('\t\tshared\n\t\t' + name + '\n', text)
+            self.assertTrue(text.endswith('\\end{document}'))
+            self.assertNotIn('A' if name == 'B' else 'B', text)
+        self.assertNotIn('\t\tA', dump())
+
+    def test_render_matches_imperative(self):
+        with Document():
+            write('prefix')
+            with fork() as variant:
+                write('tail')
+        forked = variant.render()
+        clear()
+        with Document():
+            write('prefix')
+            write('tail')
+        self.assertEqual(forked, dump())
+
+    def test_registries_isolated(self):
+        usepackage('shared')
+        with fork() as variant:
+            usepackage('variant')
+        self.assertIn('variant', variant.render())
+        self.assertNotIn('variant', dump())
+        self.assertIn('shared', variant.render())
+
+    def test_shared_rendered_once(self):
+        segment = CountingText('shared')
+        with Document():
+            write(segment)
+            for _ in range(3):
+                with fork() as variant:
+                    write('tail')
+                variant.render()
+        self.assertEqual(segment.renders, 1)
+
+    def test_restores_context(self):
+        write('before')
+        with fork():
+            write('inside')
+        write('after')
+        self.assertEqual(dump(), 'before\nafter')
+
+    def test_other_thread(self):
+        write('shared')
+        variant = fork()
+        texts = []
+        thread = threading.Thread(target=lambda: texts.append(
+            variant.render()))
+        thread.start()
+        thread.join()
+        self.assertEqual(texts, ['shared'])
+
+    def test_written_in_other_thread(self):
+        thread = threading.Thread(target=write, args=('threaded',))
+        thread.start()
+        thread.join()
+        self.assertEqual(dump(), 'threaded')
+
+    def tearDown(self):
+        clear()
+
+
+class TestAlias(unittest.TestCase):
+    def test_arguments(self):
+        alias('stxbold', r'\textbf{#1}', 1)
+        self.assertEqual(dump(), r'\newcommand{\stxbold}[1]{\textbf{#1}}')
+
+    def test_registered_definition(self):
+        simpletex._CONTEXT.commandDefinitions.register('ab', 'xy')
+        simpletex._CONTEXT.commandDefinitions.register('stxbold',
+                                                        r'\textbf{x}')
+        self.assertEqual(dump(), '\n'.join([r'\newcommand{\ab}{xy}',
+                                             r'\newcommand{\stxbold}'
+                                             r'{\textbf{x}}']))
+
+    def tearDown(self):
+        clear()
+
+
+class TestWriteMany(unittest.TestCase):
+    def build(self, write_rows):
+        with Document():
+            with Section('Rows'):
+                with UnorderedList():
+                    write_rows(str(row) for row in range(5))
+            write_rows(iter(['A', 'B']))
+        write_rows(['C'])
+        result = dump()
+        clear()
+        return result
+
+    def test_matches_write(self):
+        expected = self.build(lambda rows: [write(row) for row in rows])
+        self.assertEqual(self.build(write_many), expected)
+        self.assertEqual(self.build(lambda rows: write_many(rows, lazy=True)),
+                         expected)
+
+    def test_spilled(self):
+        expected = self.build(lambda rows: [write(row) for row in rows])
+        Paragraph.spill_threshold = 1
+        self.assertEqual(self.build(lambda rows: write_many(rows, lazy=True)),
+                         expected)
+
+    def tearDown(self):
+        Paragraph.spill_threshold = None
+        clear()
+
+
+class TestDeadline(unittest.TestCase):
+    def setUp(self):
+        with Document():
+            with UnorderedList():
+                write_many(map(str, range(5000)))
+
+    def test_dump(self):
+        expected = dump()
+        self.assertEqual(dump(timeout=60), expected)
+        self.assertRaises(RenderTimeout, dump, deadline=0)
+        self.assertEqual(dump(), expected)
+
+    def test_cancelled(self):
+        token = CancelToken()
+        token.cancel()
+        self.assertRaises(RenderCancelled, dump, token=token)
+        self.assertRaises(ValueError, dump, timeout=1, token=token)
+
+    def test_save(self):
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'document.tex')
+        try:
+            with open(path, 'w') as f:
+                f.write('previous')
+            self.assertRaises(RenderTimeout, save, path, timeout=-1)
+            self.assertEqual(os.listdir(directory), ['document.tex'])
+            with open(path) as f:
+                self.assertEqual(f.read(), 'previous')
+            save(path, timeout=60)
+            with open(path) as f:
+                self.assertEqual(f.read(), dump())
+        finally:
+            shutil.rmtree(directory)
+
+    def test_escape(self):
+        text = '%' * (1 << 17)
+        token = CancelToken()
+        with token:
+            self.assertEqual(latex_escape(text), '\\%' * (1 << 17))
+        self.assertEqual(token.progress, 2)
+        token.cancel()
+        with token:
+            self.assertRaises(RenderCancelled, latex_escape, text)
+
+    def tearDown(self):
+        clear()
@@ -0,0 +1,113 @@
+import threading
+import unittest
+
+from simpletex import write, write_many, clear, alias
+from simpletex.base import Command
+from simpletex.document import Document
+from simpletex.formatting.layout import Columns
+from simpletex.lint import Linter, lint, lint_document, trace
+
+
+class TestLint(unittest.TestCase):
+    def messages(self, text, **kwargs):
+        return [(problem.line, problem.column, problem.message)
+                for problem in lint(text, **kwargs)]
+
+    def test_clean(self):
+        text = '\n'.join([r'\begin{center}',
+                          r'\textbf{a} \{ \} 50\% % comment {',
+                          r'\verb|{| \begin{verbatim}',
+                          r'{ \end{center}',
+                          r'\end{verbatim}',
+                          r'\end{center}'])
+        self.assertEqual(lint(text), [])
+
+    def test_braces(self):
+        self.assertEqual(self.messages('a{\n}}{'), [
+            (2, 2, 'Unmatched brace.'),
+            (2, 3, 'Unclosed brace.')])
+
+    def test_nested_braces(self):
+        depth = 10000
+        self.assertEqual(lint('{' * depth + '}' * depth), [])
+        self.assertEqual(self.messages('{}}{'), [
+            (1, 3, 'Unmatched brace.'),
+            (1, 4, 'Unclosed brace.')])
+
+    def test_unknown_commands(self):
+        text = '\\textbf{a} \\textbff{b}\n\\begin{center}\\mine\\end{center}'
+        self.assertEqual(self.messages(text, aliases={'mine'},
+                                       commands={'textbf'}),
+                         [(1, 12, "Unknown command 'textbff'.")])
+
+    def test_environments(self):
+        self.assertEqual(self.messages('\\begin{a}\\begin{b}\\end{a}\n'
+                                       '\\end{c}\\begin{d}'), [
+            (1, 19, "Environment 'b' (line 1) closed by 'a'."),
+            (2, 1, "Unmatched end of environment 'c'."),
+            (2, 8, "Unclosed environment 'd'.")])
+
+    def test_packages(self):
+        text = '\\begin{multicols}\\includegraphics{x}\\end{multicols}'
+        self.assertEqual([message for line, column, message
+                          in self.messages(text, packages={'multicol'})],
+                         ["'includegraphics' requires package 'graphicx'."])
+
+    def test_streamed(self):
+        text = '\\begin{center}\n{\\textbf{a}\n}\\end{center}\n}'
+        linter = Linter()
+        for char in text:
+            linter.feed(char)
+        self.assertEqual(linter.close(), lint(text))
+
+
+class TestLintDocument(unittest.TestCase):
+    def test_document(self):
+        with Document():
+            with Columns():
+                write(Command('stxlintalias'))
+        self.assertEqual(lint_document(), [])
+
+    def test_stale_alias(self):
+        command = alias('stxlintalias', 'text')
+        clear()
+        write(command)
+        self.assertEqual(lint_document(), [])
+        self.assertEqual([problem.message for problem
+                          in lint_document(known={'stxlintalias'})],
+                         ["Command alias 'stxlintalias' is not defined."])
+
+    def test_missing_package(self):
+        text = Columns()('text')
+        clear()
+        write(text)
+        self.assertEqual([problem.message for problem in lint_document()],
+                         ["'multicols' requires package 'multicol'."])
+
+    def tearDown(self):
+        clear()
+
+
+class TestTrace(unittest.TestCase):
+    def test_trace(self):
+        with trace() as problems:
+            write('fine {}')
+            write('broken {')
+            write_many(['}'])
+        write('untraced {')
+        self.assertEqual([problem.message for problem in problems],
+                         ['Unclosed brace.', 'Unmatched brace.'])
+        first, second = (problem.source.rsplit(':', 1)
+                         for problem in problems)
+        self.assertEqual(first[0], __file__)
+        self.assertEqual(int(second[1]), int(first[1]) + 1)
+
+    def test_other_threads(self):
+        with trace() as problems:
+            thread = threading.Thread(target=write, args=('broken {',))
+            thread.start()
+            thread.join()
+        self.assertEqual(problems, [])
+
+    def tearDown(self):
+        clear()
@@ -0,0 +1,80 @@
+import unittest
+
+from simpletex import write, dump, clear, alias
+from simpletex.document import Document, Section
+from simpletex.macros import compress, extract_macros
+
+LINE = 'A boilerplate sentence repeated throughout the document.'
+LABEL = r'\textbf{\textit{A long styled label, repeated}}'
+
+
+class TestCompress(unittest.TestCase):
+    def test_lines(self):
+        text, definitions = compress('\n'.join([LINE, '\t' + LINE, LINE]))
+        self.assertEqual(text, '\\stxa{}\n\t\\stxa{}\n\\stxa{}')
+        self.assertEqual(definitions, {'stxa': LINE})
+
+    def test_commands(self):
+        lines = ['{}: {}'.format(LABEL, number) for number in range(3)]
+        text, definitions = compress('\n'.join(lines))
+        self.assertEqual(text, '\\stxa{}: 0\n\\stxa{}: 1\n\\stxa{}: 2')
+        self.assertEqual(definitions, {'stxa': LABEL})
+
+    def test_short(self):
+        text = '\n'.join(['short'] * 10)
+        self.assertEqual(compress(text), (text, {}))
+
+    def test_unprofitable(self):
+        text = '\n'.join([LINE] * 2)
+        self.assertEqual(compress(text, min_length=200), (text, {}))
+
+    def test_unsafe(self):
+        for line in (LINE + ' 100%', LINE + ' & more', '{' + LINE,
+                     LINE + ' $x', r'\begin{center}' + LINE):
+            text = '\n'.join([line] * 3)
+            self.assertEqual(compress(text), (text, {}))
+
+    def test_escaped(self):
+        line = r'\\textbf{' + LINE + '}'
+        text = '\n'.join(['x ' + line, 'y ' + line])
+        self.assertEqual(compress(text), (text, {}))
+
+    def test_verbatim(self):
+        text = '\n'.join([r'\begin{verbatim}', LINE, LINE, LINE,
+                          r'\end{verbatim}'])
+        self.assertEqual(compress(text), (text, {}))
+
+    def test_taken(self):
+        text, definitions = compress('\n'.join([LINE] * 3), taken={'stxa'})
+        self.assertEqual(definitions, {'stxb': LINE})
+
+
+class TestExtractMacros(unittest.TestCase):
+    def setUp(self):
+        clear()
+
+    def test_document(self):
+        with Document():
+            for number in range(3):
+                with Section(str(number)):
+                    write(LINE)
+        before = len(dump())
+        saved = extract_macros()
+        self.assertEqual(before - len(dump()), saved)
+        self.assertGreater(saved, 0)
+        self.assertIn(r'\newcommand{\stxa}{' + LINE + '}', dump())
+        self.assertEqual(dump().count(LINE), 1)
+
+    def test_existing_alias(self):
+        alias('stxa', 'x')
+        write('\n'.join([LINE] * 3))
+        extract_macros()
+        self.assertIn(r'\newcommand{\stxb}', dump())
+
+    def test_nothing(self):
+        write(LINE)
+        self.assertEqual(extract_macros(), 0)
+        self.assertEqual(dump(), LINE)
+
+    def tearDown(self):
+        clear()
@@ -2,7 +2,7 @@ import unittest
 import numpy as np
 
 from simpletex import write, clear, dump
-from simpletex.math import (Equation,
+from simpletex.math import (Equation, Align, Expression,
                             Add, Subtract, Multiply, Divide,
                             Matrix)
 
@@ -10,6 +10,21 @@ DATA = [[1, 2], [3, 4]]
 NP_DATA = np.array(DATA)
 MAT_ENV = '\\begin{{Bmatrix}}\n{}\n\\end{{Bmatrix}}'
 
+SPARSE_TRIPLETS = [(1, 2, 6), (0, 0, 1)]
+SPARSE_ROWS = '\t1 & 0 & 0 \\\\\n\t0 & 0 & 6 \\\\'
+
+
+class SparseCOO:
+    row = np.array([1, 0])
+    col = np.array([2, 0])
+    data = np.array([6, 1])
+
+
+class SparseCSR:
+    indptr = np.array([0, 1, 2])
+    indices = np.array([0, 2])
+    data = np.array([1, 6])
+
 
 class TestEquation(unittest.TestCase):
     def setUp(self):
@@ -40,6 +55,50 @@ class TestEquation(unittest.TestCase):
         clear()
 
 
+class TestAlign(unittest.TestCase):
+    def setUp(self):
+        clear()
+
+    def test_sides(self):
+        self.assertEqual(Align()(['x', 'y'], NP_DATA[0]), '\n'.join([
+            r'\begin{align*}',
+            '\tx &= 1 \\\\',
+            '\ty &= 2',
+            r'\end{align*}']))
+
+    def test_generators(self):
+        lhs = ('x_{}'.format(i) for i in range(3))
+        rhs = (i * i for i in range(3))
+        self.assertEqual(Align(relation='<')(lhs, rhs), '\n'.join([
+            r'\begin{align*}',
+            '\tx_0 &< 0 \\\\',
+            '\tx_1 &< 1 \\\\',
+            '\tx_2 &< 4',
+            r'\end{align*}']))
+
+    def test_labels(self):
+        self.assertEqual(Align(numbered=True)(['x', 'y'], [1, 2],
+                                              labels=[None, 'eq:y']),
+                         '\n'.join([r'\begin{align}',
+                                    '\tx &= 1 \\\\',
+                                    '\ty &= 2 \\label{eq:y}',
+                                    r'\end{align}']))
+
+    def test_write(self):
+        with Align():
+            write('x', 1)
+            write('y = 2')
+        self.assertEqual(dump(), '\n'.join([r'\usepackage{amsmath}',
+                                            '',
+                                            r'\begin{align*}',
+                                            '\tx &= 1 \\\\',
+                                            '\ty = 2',
+                                            r'\end{align*}']))
+
+    def tearDown(self):
+        clear()
+
+
 class TestAdd(unittest.TestCase):
     def setUp(self):
         self.add = Add()
@@ -157,6 +216,66 @@ class TestDivide(unittest.TestCase):
         clear()
 
 
+class TestExpression(unittest.TestCase):
+    def setUp(self):
+        clear()
+
+    def test_node(self):
+        self.assertIsInstance(Add(tree=True)('x', 1), Expression)
+
+    def test_flat(self):
+        self.assertEqual(str(Add(tree=True)('x', 'y', 1)), 'x+y+1')
+
+    def test_parentheses(self):
+        product = Multiply(tree=True)(Add(tree=True)('a', 'b'), 'c')
+        self.assertEqual(str(product), r'(a+b)\cdot c')
+
+    def test_no_parentheses(self):
+        total = Add(tree=True)(Multiply(tree=True)('a', 'b'), 'c')
+        self.assertEqual(str(total), r'a\cdot b+c')
+
+    def test_right_associativity(self):
+        difference = Subtract(tree=True)
+        self.assertEqual(str(difference('a', difference('b', 'c'))),
+                         'a-(b-c)')
+        self.assertEqual(str(difference(difference('a', 'b'), 'c')),
+                         'a-b-c')
+
+    def test_inline_division(self):
+        quotient = Divide(inline=True, tree=True)
+        self.assertEqual(str(quotient('a', Multiply(tree=True)('b', 'c'))),
+                         r'a/(b\cdot c)')
+
+    def test_fraction(self):
+        fraction = Divide(tree=True)(Add(tree=True)('a', 'b'), 'c')
+        self.assertEqual(str(fraction), r'\frac{a+b}{c}')
+
+    def test_fold(self):
+        self.assertEqual(Add(tree=True, fold=True)(1, 2), 3)
+        self.assertEqual(str(Multiply(tree=True, fold=True)(2, 'x', 3)),
+                         r'6\cdot x')
+        self.assertEqual(Divide(tree=True, fold=True)(6, 3), 2)
+        self.assertEqual(str(Divide(tree=True, fold=True)(1, 3)),
+                         r'\frac{1}{3}')
+
+    def test_write(self):
+        with Divide(tree=True):
+            with Add(tree=True):
+                write('x')
+                write(1)
+            write('y')
+        self.assertEqual(dump(), r'\frac{x+1}{y}')
+
+    def test_deep(self):
+        expression = 'x'
+        for _ in range(5000):
+            expression = Subtract(tree=True)('y', expression)
+        self.assertEqual(len(str(expression)), 5000 * 4 - 1)
+
+    def tearDown(self):
+        clear()
+
+
 class TestMatrix(unittest.TestCase):
     def setUp(self):
         self.mat = Matrix(brackets='{')
@@ -180,6 +299,65 @@ class TestMatrix(unittest.TestCase):
         self.assertEqual(dump(),
                          MAT_ENV.format('\t1 & 2 \\\\\n\t3 & 4 \\\\'))
 
+    def test_triplets(self):
+        self.assertEqual(self.mat(SPARSE_TRIPLETS, shape=(2, 3)),
+                         MAT_ENV.format(SPARSE_ROWS))
+
+    def test_coo(self):
+        self.assertEqual(self.mat(SparseCOO()), MAT_ENV.format(SPARSE_ROWS))
+
+    def test_csr(self):
+        self.assertEqual(self.mat(SparseCSR()), MAT_ENV.format(SPARSE_ROWS))
+
+    def test_csr_shape(self):
+        class Indices:
+            def __iter__(self):
+                raise AssertionError('Indices scanned.')
+
+            def __getitem__(self, index):
+                return SparseCSR.indices[index]
+
+        matrix = SparseCSR()
+        matrix.indices = Indices()
+        matrix.shape = (2, 3)
+        self.assertEqual(self.mat(matrix), MAT_ENV.format(SPARSE_ROWS))
+
+    def test_sparse_duplicates(self):
+        triplets = SPARSE_TRIPLETS + [(1, 2, 4)]
+        self.assertEqual(self.mat(triplets, shape=(2, 3)), MAT_ENV.format(
+            '\t1 & 0 & 0 \\\\\n\t0 & 0 & 10 \\\\'))
+
+    def test_sparse_inferred_shape(self):
+        self.assertEqual(self.mat(SparseCSR()), self.mat(SparseCOO()))
+
+    def test_summarize(self):
+        mat = Matrix(brackets='{', threshold=20, edgeitems=1)
+        self.assertEqual(mat(np.arange(25).reshape(5, 5)), MAT_ENV.format(
+            '\t0 & \\cdots & 4 \\\\\n'
+            '\t\\vdots & \\ddots & \\vdots \\\\\n'
+            '\t20 & \\cdots & 24 \\\\'))
+
+    def test_summarize_one_axis(self):
+        mat = Matrix(brackets='{', threshold=5, edgeitems=1)
+        self.assertEqual(mat([[1, 2, 3, 4]] * 2), MAT_ENV.format(
+            '\t1 & \\cdots & 4 \\\\\n\t1 & \\cdots & 4 \\\\'))
+
+    def test_summarize_below_threshold(self):
+        mat = Matrix(brackets='{', threshold=4, edgeitems=1)
+        self.assertEqual(mat(DATA),
+                         MAT_ENV.format('\t1 & 2 \\\\\n\t3 & 4 \\\\'))
+
+    def test_summarize_indexes_edges_only(self):
+        mat = Matrix(threshold=0, edgeitems=1)
+        data = [[0] * 3, None, [0] * 3]
+        self.assertIn(r'\vdots', mat(data))
+
+    def test_zero_placeholder(self):
+        mat = Matrix(brackets='{', zero=r'\cdot')
+        self.assertEqual(mat([(1, 1, 5)], shape=(2, 2)),
+                         MAT_ENV.format('\t\\cdot & \\cdot \\\\\n'
+                                        '\t\\cdot & 5 \\\\'))
+
     def tearDown(self):
         clear()
 
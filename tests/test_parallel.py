@@ -0,0 +1,99 @@
+import time
+import unittest
+from functools import partial
+
+import simpletex
+from simpletex import (write, usepackage, alias, dump, clear, render,
+                       CancelToken, RenderCancelled)
+from simpletex.core import checkpoints
+from simpletex.document import Document, Section
+from simpletex.parallel import isolate, splice, write_parallel
+
+
+def chapter(number: int, delay: float = 0):
+    time.sleep(delay)
+    usepackage('package{}'.format(number % 2))
+    alias('chapter{}'.format(number), 'Chapter {}'.format(number))
+    with Section('Chapter {}'.format(number)):
+        write('Text of chapter {}.'.format(number))
+
+
+class TestParallel(unittest.TestCase):
+    def sequential(self, builders):
+        with Document():
+            for builder in builders:
+                builder()
+        text = dump()
+        clear()
+        return text
+
+    def test_threads(self):
+        # Later chapters finish first
+        builders = [partial(chapter, number, 0.02 * (3 - number))
+                    for number in range(4)]
+        expected = self.sequential(builders)
+        with Document():
+            write_parallel(builders, workers=4)
+        self.assertEqual(dump(), expected)
+
+    def test_processes(self):
+        builders = [partial(chapter, number) for number in range(4)]
+        expected = self.sequential(builders)
+        with Document():
+            write_parallel(builders, workers=2, processes=True)
+        self.assertEqual(dump(), expected)
+
+    def test_existing_entries(self):
+        alias('chapter1', 'Kept')
+        write('Before.')
+        write_parallel([partial(chapter, 1)])
+        self.assertIn('\\newcommand{\\chapter1}{Kept}', dump())
+        self.assertNotIn('\\newcommand{\\chapter1}{Chapter 1}', dump())
+
+    def test_render_settings(self):
+        def document():
+            with Document():
+                with Section('Part'):
+                    write_parallel([partial(chapter, number)
+                                    for number in range(3)], workers=3)
+                with Section('Skipped'):
+                    write_parallel([self.fail])
+        text = render(document, select=['Part/Chapter 1'],
+                      backend='markdown')
+        self.assertIn('## Chapter 1', text)
+        self.assertIn('Text of chapter 1.', text)
+        self.assertNotIn('Chapter 0', text)
+        self.assertNotIn('\\section', text)
+        self.assertNotIn('Skipped', text)
+
+    def test_cancelled(self):
+        def builder():
+            for item in checkpoints(range(10)):
+                pass
+        with CancelToken() as token:
+            token.cancel()
+            self.assertRaises(RenderCancelled, write_parallel, [builder])
+
+    def test_isolate_pretty(self):
+        fragment = isolate(partial(chapter, 0), pretty=False)
+        self.assertTrue(simpletex.pretty)
+        self.assertIn('\\section{Chapter 0}\nText of chapter 0.',
+                      fragment.text)
+        self.assertIn('\t', isolate(partial(chapter, 0)).text)
+
+    def test_isolate(self):
+        write('Outside.')
+        fragment = isolate(partial(chapter, 0))
+        self.assertEqual(dump(), 'Outside.')
+        self.assertEqual([name for name, registry_type, entries
+                          in fragment.registries],
+                         ['imports', 'commandDefinitions'])
+        clear()
+        splice(fragment)
+        self.assertEqual(dump(), '\n\n'.join([
+            '\\usepackage{package0}',
+            '\\newcommand{\\chapter0}{Chapter 0}',
+            '\\section{Chapter 0}\n\tText of chapter 0.']))
+
+    def tearDown(self):
+        clear()
@@ -0,0 +1,78 @@
+import math
+import unittest
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from simpletex import write, dump, clear
+
+
+@unittest.skipIf(np is None, 'numpy is not installed')
+class TestPlot(unittest.TestCase):
+    def setUp(self):
+        from simpletex.plot import Plot, series
+        self.Plot = Plot
+        self.series = series
+
+    def test_plot(self):
+        with self.Plot(xlabel='Time'):
+            write(self.series([1, 2.5, 3], options='blue'))
+        self.assertEqual(dump(), '\n'.join([
+            '\\usepackage{pgfplots}',
+            '',
+            '\\begin{tikzpicture}',
+            '\t\\begin{axis}[xlabel=Time]',
+            '\t\t\\addplot[blue] coordinates {(0,1) (1,2.5) (2,3)};',
+            '\t\\end{axis}',
+            '\\end{tikzpicture}']))
+
+    def test_non_finite_dropped(self):
+        self.assertEqual(self.series([0, 1, 2], [1, math.nan, math.inf]),
+                         '\\addplot coordinates {(0,1)};')
+
+    def test_precision(self):
+        self.assertEqual(self.series([math.pi], [1e-7], precision=3),
+                         '\\addplot coordinates {(3.14,1e-07)};')
+
+    def tearDown(self):
+        clear()
+
+
+@unittest.skipIf(np is None, 'numpy is not installed')
+class TestDownsample(unittest.TestCase):
+    def setUp(self):
+        from simpletex.plot import downsample
+        self.downsample = downsample
+        self.x = np.arange(10000, dtype=float)
+        self.y = np.sin(self.x / 500)
+        self.y[4321] = 100
+        self.y[6789] = -100
+
+    def test_short_unchanged(self):
+        x, y = self.downsample([1, 2], [3, 4], 10)
+        self.assertEqual(list(y), [3, 4])
+
+    def check(self, method):
+        x, y = self.downsample(self.x, self.y, 100, method)
+        self.assertLessEqual(len(x), 100)
+        self.assertTrue((np.diff(x) > 0).all())
+        self.assertIn(4321, x)
+        self.assertIn(6789, x)
+        return x
+
+    def test_lttb(self):
+        x = self.check('lttb')
+        self.assertEqual(len(x), 100)
+        self.assertEqual(x[0], 0)
+        self.assertEqual(x[-1], 9999)
+
+    def test_minmax(self):
+        self.check('minmax')
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            self.downsample(self.x, self.y, 100, 'unknown')
+        with self.assertRaises(ValueError):
+            self.downsample(self.x, self.y, 2)
@@ -0,0 +1,139 @@
+import unittest
+
+import simpletex
+from simpletex import write, latex_escape, dump, clear, render
+from simpletex.document import Document, Section, Subsection
+from simpletex.formatting.layout import Centering
+from simpletex.formatting.text import Bold, Italics, Emphasis, SmallCaps
+from simpletex.math import Equation, Matrix, Align
+from simpletex.sequences import OrderedList, UnorderedList, Description
+
+
+def build():
+    with Document():
+        write(latex_escape('A < B_1'))
+        with Section('Results'):
+            write('{} {}'.format(Bold()('bold'), Emphasis()('emphasis')))
+            with UnorderedList():
+                write('one')
+                write('two')
+            with Subsection('Data'):
+                write(Matrix()([[1, 2], [3, 4]]))
+                write(Equation()(['x', 'y']))
+
+
+class TestHTMLPreview(unittest.TestCase):
+    def test_document(self):
+        self.assertEqual(render(build, backend='html'), '\n'.join([
+            'A &lt; B_1',
+            '<h2>Results</h2>',
+            '<strong>bold</strong> <em>emphasis</em>',
+            '<ul>', '<li>one</li>', '<li>two</li>', '</ul>',
+            '<h3>Data</h3>',
+            '<table>',
+            '<tr><td>1</td><td>2</td></tr>',
+            '<tr><td>3</td><td>4</td></tr>',
+            '</table>',
+            '\\(x = y\\)']))
+
+    def test_formatters(self):
+        def builder():
+            write(Italics()('a'))
+            write(SmallCaps()('b'))
+            write(Equation(inline=False)(['x < y']))
+            write(OrderedList()(['c']))
+            write(Description()([('d', 'e')]))
+            with Centering():
+                write('f')
+        self.assertEqual(render(builder, backend='html'), '\n'.join([
+            '<i>a</i>',
+            '<span style="font-variant: small-caps">b</span>',
+            '\\[x &lt; y\\]',
+            '<ol>', '<li>c</li>', '</ol>',
+            '<dl>', '<dt>d</dt>', '<dd>e</dd>', '</dl>',
+            '<div style="text-align: center">', 'f', '</div>']))
+
+    def test_escaped(self):
+        def builder():
+            with Section('Q&A <x>'):
+                write(Matrix(threshold=1, edgeitems=1)(
+                    [['<', 2, 3], [4, 5, 6], [7, 8, 9]]))
+        self.assertEqual(render(builder, backend='html'), '\n'.join([
+            '<h2>Q&amp;A &lt;x&gt;</h2>',
+            '<table>',
+            '<tr><td>&lt;</td><td>…</td><td>3</td></tr>',
+            '<tr><td>⋮</td><td>⋱</td><td>⋮</td></tr>',
+            '<tr><td>7</td><td>…</td><td>9</td></tr>',
+            '</table>']))
+
+    def test_fallback(self):
+        text = render(lambda: write(Align()(['x'], ['y'])), backend='html')
+        self.assertIn('\\begin{align*}', text)
+
+    def test_isolated(self):
+        write(latex_escape('<'))
+        render(build, backend='html')
+        self.assertEqual(dump(), '<')
+        self.assertIsNone(simpletex._CONTEXT.backend)
+
+    def test_unknown(self):
+        self.assertRaises(ValueError, render, build, backend='rtf')
+
+    def tearDown(self):
+        clear()
+
+
+class TestMarkdownPreview(unittest.TestCase):
+    def test_document(self):
+        self.assertEqual(render(build, backend='markdown'), '\n'.join([
+            'A \\< B\\_1',
+            '',
+            '## Results',
+            '',
+            '**bold** *emphasis*',
+            '',
+            '- one',
+            '- two',
+            '',
+            '',
+            '### Data',
+            '',
+            '',
+            '|   |   |',
+            '|---|---|',
+            '| 1 | 2 |',
+            '| 3 | 4 |',
+            '',
+            '$x = y$']))
+
+    def test_escaped(self):
+        def builder():
+            with Section('A_1 | *b*'):
+                write(Matrix(threshold=1, edgeitems=1)(
+                    [['|', 2, 3], [4, 5, 6], [7, 8, 9]]))
+        self.assertEqual(render(builder, backend='markdown'), '\n'.join([
+            '',
+            '## A\\_1 \\| \\*b\\*',
+            '',
+            '',
+            '|   |   |   |',
+            '|---|---|---|',
+            '| \\| | … | 3 |',
+            '| ⋮ | ⋱ | ⋮ |',
+            '| 7 | … | 9 |',
+            '']))
+
+    def test_nested_list(self):
+        def builder():
+            with OrderedList():
+                write('first')
+                write(UnorderedList()(['a', 'b']))
+        self.assertEqual(render(builder, backend='markdown'), '\n'.join([
+            '',
+            '1. first',
+            '2. - a',
+            '   - b',
+            '']))
+
+    def tearDown(self):
+        clear()
@@ -0,0 +1,92 @@
+import unittest
+
+from simpletex import write, dump, clear
+from simpletex.base import Command
+from simpletex.document import Document, Section, Subsection
+from simpletex.math import Align
+from simpletex.references import resolve, resolve_references
+
+
+class TestResolve(unittest.TestCase):
+    def test_numbering(self):
+        text = '\n'.join([r'\tableofcontents',
+                          r'\section{Intro}',
+                          r'\label{intro}',
+                          r'\subsection{Scope}\label{scope}',
+                          r'\section*{Unnumbered}',
+                          r'\section{Method}',
+                          r'\subsection{Data}',
+                          r'\label{data}',
+                          r'See \ref{intro}, \ref{data} and \ref{missing}.'])
+        resolved, labels = resolve(text)
+        self.assertEqual(labels, {'intro': '1', 'scope': '1.1',
+                                  'data': '2.1'})
+        self.assertEqual(resolved.split('\n'), [
+            r'\section*{\contentsname}',
+            r'\noindent1\quad Intro\par',
+            r'\noindent\hspace*{1.5em}1.1\quad Scope\par',
+            r'\noindent2\quad Method\par',
+            r'\noindent\hspace*{1.5em}2.1\quad Data\par',
+            r'\section{Intro}',
+            r'\label{intro}',
+            r'\subsection{Scope}\label{scope}',
+            r'\section*{Unnumbered}',
+            r'\section{Method}',
+            r'\subsection{Data}',
+            r'\label{data}',
+            r'See 1, 2.1 and \ref{missing}.'])
+
+    def test_appendix(self):
+        text = '\n'.join([r'\section{A}', r'\appendix',
+                          r'\section{B}\label{b}', r'\subsection{C}\label{c}'])
+        self.assertEqual(resolve(text)[1], {'b': 'A', 'c': 'A.1'})
+
+    def test_chapters(self):
+        text = (r'\chapter{A}\section{B}\label{b}'
+                r'\chapter{C}\section{D}\label{d}')
+        self.assertEqual(resolve(text)[1], {'b': '1.1', 'd': '2.1'})
+        self.assertTrue(resolve(r'\tableofcontents' + text)[0].startswith(
+            r'\chapter*{\contentsname}'))
+
+    def test_label_before_headings(self):
+        text = '\n'.join([r'\label{start}', r'\section{A}', r'\ref{start}'])
+        self.assertEqual(resolve(text), (text, {}))
+
+    def test_environment_labels_left(self):
+        text = '\n'.join([r'\section{A}',
+                          r'\begin{align}', r'x \label{eq}', r'\end{align}',
+                          r'\ref{eq}'])
+        resolved, labels = resolve(text)
+        self.assertEqual(labels, {})
+        self.assertEqual(resolved, text)
+
+    def test_verbatim(self):
+        text = '\n'.join([r'\begin{verbatim}', r'\section{A}\label{a}',
+                          r'\ref{a}', r'\end{verbatim}'])
+        self.assertEqual(resolve(text), (text, {}))
+
+    def test_nested_title(self):
+        text = r'\section{The \textbf{Bold} Part}\tableofcontents'
+        self.assertIn(r'1\quad The \textbf{Bold} Part', resolve(text)[0])
+
+
+class TestResolveReferences(unittest.TestCase):
+    def test_document(self):
+        with Document():
+            write(Command('tableofcontents'))
+            with Section('Intro'):
+                write(Command('label', ['intro']))
+                with Subsection('Details'):
+                    write(Command('label', ['details']))
+                    write(Align(numbered=True)(['x = 1'], labels=['eq']))
+            write('See {} and {}.'.format(Command('ref', ['details']),
+                                          Command('ref', ['eq'])))
+        labels = resolve_references()
+        self.assertEqual(labels, {'intro': '1', 'details': '1.1'})
+        text = dump()
+        self.assertIn('See 1.1 and \\ref{eq}.', text)
+        self.assertIn('\\noindent\\hspace*{1.5em}1.1\\quad Details\\par', text)
+        self.assertNotIn('\\tableofcontents', text)
+
+    def tearDown(self):
+        clear()
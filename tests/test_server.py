@@ -0,0 +1,95 @@
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import unittest
+
+from simpletex import write, dump, clear, spec
+from simpletex.document import Document, Section
+
+if hasattr(socket, 'AF_UNIX'):
+    from simpletex.server import Server, Client, ServerError
+
+SPEC = {'type': 'document',
+        'body': [{'type': 'section', 'name': 'Results', 'body': 'Text.'}]}
+
+
+def build(name, count=1):
+    with Document():
+        write('Outside.')
+        for number in range(count):
+            with Section('{} {}'.format(name, number)):
+                write('Text {}.'.format(number))
+
+
+@unittest.skipUnless(hasattr(socket, 'AF_UNIX'), 'requires Unix sockets')
+class TestServer(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'server.sock')
+        self.server = Server(self.path, preload=[__name__])
+        self.thread = threading.Thread(target=self.server.serve_forever,
+                                       args=(0.01,))
+        self.thread.start()
+        self.client = Client(self.path)
+
+    def test_spec(self):
+        self.assertEqual(self.client.render(spec=SPEC), spec.render(SPEC))
+        self.assertEqual(self.client.render(spec='Café'), 'Café')
+
+    def test_builder(self):
+        reference = '{}:build'.format(__name__)
+        build('Part', count=3)
+        expected = dump()
+        clear()
+        self.assertEqual(self.client.render(builder=reference,
+                                            args=['Part'],
+                                            kwargs={'count': 3}),
+                         expected)
+        selected = self.client.render(builder=reference, args=['Part'],
+                                      kwargs={'count': 3},
+                                      select=['Part 1'])
+        self.assertIn('Part 1', selected)
+        self.assertNotIn('Part 0', selected)
+        self.assertEqual(dump(), '')
+
+    def test_streamed(self):
+        reference = '{}:build'.format(__name__)
+        chunks = []
+        self.client.stream(chunks.append, builder=reference,
+                           args=['Part'], kwargs={'count': 5000})
+        self.assertGreater(len(chunks), 1)
+        build('Part', count=5000)
+        self.assertEqual(b''.join(chunks).decode('utf-8'), dump())
+
+    def test_allowed_builders(self):
+        for reference in ('os:remove', 'json:loads',
+                          '{}:Section'.format(__name__),
+                          '{}:missing'.format(__name__)):
+            with self.assertRaises(ServerError) as caught:
+                self.client.render(builder=reference, args=['file'])
+            self.assertEqual(caught.exception.kind, 'ValueError')
+
+    def test_errors(self):
+        with self.assertRaises(ServerError) as caught:
+            self.client.render(builder='missing')
+        self.assertEqual(caught.exception.kind, 'ValueError')
+        with self.assertRaises(ServerError) as caught:
+            self.client.render(spec=SPEC, timeout=-1)
+        self.assertEqual(caught.exception.kind, 'RenderTimeout')
+        self.assertEqual(self.client.render(spec='Still serving.'),
+                         'Still serving.')
+        self.assertRaises(ValueError, self.client.render)
+
+    def test_permissions(self):
+        self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o600)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        self.assertFalse(os.path.exists(self.path))
+        shutil.rmtree(self.directory)
+        clear()
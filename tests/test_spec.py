@@ -0,0 +1,106 @@
+import json
+import unittest
+
+from simpletex import write, dump, clear, usepackage
+from simpletex.document import Document, Section, Subsection
+from simpletex.formatting.layout import Columns
+from simpletex.formatting.text import Bold
+from simpletex.math import Equation, Align, Matrix
+from simpletex.sequences import UnorderedList, Description
+from simpletex.spec import render, render_node
+
+
+SAMPLE_TEXT = 'simpletex'
+SAMPLE_HEADING = 'Heading Text'
+
+SPEC = {
+    'type': 'document',
+    'body': [
+        {'type': 'usepackage', 'name': 'amssymb'},
+        {'type': 'section', 'name': SAMPLE_HEADING, 'body': [
+            SAMPLE_TEXT,
+            {'type': 'bold', 'body': SAMPLE_TEXT},
+            {'type': 'columns', 'number': 3, 'body': [
+                {'type': 'unordered_list', 'body': ['a', 'b\nc']},
+            ]},
+            {'type': 'subsection', 'name': SAMPLE_HEADING, 'body': [
+                {'type': 'equation', 'body': ['x', 2]},
+                {'type': 'align',
+                 'body': [{'key': 'x', 'value': 'y'}, 'z = w']},
+                {'type': 'matrix', 'brackets': '(', 'body': [[1, 2], [3, 4]]},
+                {'type': 'description',
+                 'body': [{'key': 'key', 'value': 'value'}]},
+            ]},
+        ]},
+    ],
+}
+
+
+def build():
+    with Document():
+        usepackage('amssymb')
+        with Section(SAMPLE_HEADING):
+            write(SAMPLE_TEXT)
+            with Bold():
+                write(SAMPLE_TEXT)
+            with Columns(3):
+                with UnorderedList():
+                    write('a')
+                    write('b\nc')
+            with Subsection(SAMPLE_HEADING):
+                with Equation():
+                    write('x')
+                    write(2)
+                write(Align()([('x', 'y'), 'z = w']))
+                write(Matrix('(')([[1, 2], [3, 4]]))
+                write(Description()([('key', 'value')]))
+
+
+class TestRender(unittest.TestCase):
+    def test_matches_imperative(self):
+        build()
+        expected = dump()
+        clear()
+        self.assertEqual(render(SPEC), expected)
+
+    def test_json(self):
+        self.assertEqual(render(json.loads(json.dumps(SPEC))), render(SPEC))
+
+    def test_global_document_untouched(self):
+        write(SAMPLE_TEXT)
+        render(SPEC)
+        self.assertEqual(dump(), SAMPLE_TEXT)
+
+    def test_text_escaped(self):
+        self.assertEqual(render({'type': 'text', 'body': '50%'}), r'50\%')
+
+    def test_pairs(self):
+        self.assertEqual(
+            render_node({'type': 'description', 'body': [('a', 'b')]}),
+            Description()([('a', 'b')]))
+        self.assertEqual(
+            render_node({'type': 'description', 'body': [['a', 'b']]}),
+            Description()(['a\nb']))
+
+    def test_unknown_type(self):
+        with self.assertRaises(ValueError):
+            render({'type': 'nonexistent'})
+        with self.assertRaises(ValueError):
+            render({'body': SAMPLE_TEXT})
+
+    def tearDown(self):
+        clear()
+
+
+class TestRenderNode(unittest.TestCase):
+    def test_block(self):
+        self.assertEqual(render_node([SAMPLE_TEXT, 1]), SAMPLE_TEXT + '\n1')
+
+    def test_package(self):
+        self.assertIsNone(render_node({'type': 'usepackage',
+                                       'name': 'geometry',
+                                       'keywords': {'margin': '1in'}}))
+        self.assertEqual(dump(), r'\usepackage[margin=1in]{geometry}')
+
+    def tearDown(self):
+        clear()
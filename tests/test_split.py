@@ -0,0 +1,107 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from simpletex import write, dump, clear, save_split
+from simpletex.base import Command, Environment
+from simpletex.document import Document, Section, Subsection
+from simpletex.split import split
+
+
+def write_document(conclusion: str = 'Done.'):
+    with Document():
+        write('Preface.')
+        with Section('Intro'):
+            write('Hello.')
+            with Subsection('Details'):
+                write('More.')
+        with Section('Conclusion'):
+            write(conclusion)
+
+
+class TestSplit(unittest.TestCase):
+    def test_split(self):
+        write_document()
+        main, parts = split(dump())
+        self.assertEqual(main, '\n'.join([
+            '\\documentclass[12pt]{article}',
+            '',
+            '\\usepackage[utf8]{inputenc}',
+            '',
+            '\\begin{document}',
+            '\tPreface.',
+            '\t\\include{intro}',
+            '\t\\include{conclusion}',
+            '\\end{document}']))
+        self.assertEqual(parts, [
+            ('intro', '\\section{Intro}\n\tHello.\n'
+                      '\t\\subsection{Details}\n\t\tMore.\n'),
+            ('conclusion', '\\section{Conclusion}\n\tDone.\n')])
+
+    def test_chapters(self):
+        text = '\n'.join(['\\chapter{One}', '\\section{A}',
+                          '\\chapter{One}', 'Text'])
+        main, parts = split(text)
+        self.assertEqual(main, '\\include{one}\n\\include{one-2}')
+        self.assertEqual(parts, [('one', '\\chapter{One}\n\\section{A}\n'),
+                                 ('one-2', '\\chapter{One}\nText\n')])
+
+    def test_nested(self):
+        with Environment('minipage'):
+            write(Command('section', ['Boxed']))
+        main, parts = split(dump())
+        self.assertEqual(parts, [])
+
+    def test_no_headings(self):
+        self.assertEqual(split('Text'), ('Text', []))
+
+    def tearDown(self):
+        clear()
+
+
+class TestSaveSplit(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def path(self, name):
+        return os.path.join(self.directory, name + '.tex')
+
+    def test_unchanged(self):
+        write_document()
+        self.assertEqual(save_split(self.directory, 'book'),
+                         [self.path('book'), self.path('intro'),
+                          self.path('conclusion')])
+        clear()
+        write_document('Changed.')
+        self.assertEqual(save_split(self.directory, 'book'),
+                         [self.path('conclusion')])
+        with open(self.path('conclusion')) as f:
+            self.assertEqual(f.read(),
+                             '\\section{Conclusion}\n\tChanged.\n')
+
+    def test_stale_parts(self):
+        write_document()
+        save_split(self.directory, 'book')
+        with open(self.path('notes'), 'w') as f:
+            f.write('Not a part.')
+        clear()
+        with Document():
+            with Section('Intro'):
+                write('Hello.')
+            with Section('Summary'):
+                write('Done.')
+        self.assertEqual(save_split(self.directory, 'book'),
+                         [self.path('book'), self.path('intro'),
+                          self.path('summary')])
+        self.assertEqual(sorted(os.listdir(self.directory)),
+                         ['book.tex', 'intro.tex', 'notes.tex',
+                          'summary.tex'])
+
+    def test_main_name(self):
+        write_document()
+        self.assertRaises(ValueError, save_split, self.directory, 'intro')
+
+    def tearDown(self):
+        clear()
+        shutil.rmtree(self.directory)
@@ -0,0 +1,60 @@
+import unittest
+
+from simpletex import write, dump, clear, latex_escape
+from simpletex.document import Document, Section
+from simpletex.formatting.text import Bold
+from simpletex.template import slot, Template
+
+
+RECORDS = [{'name': 'Ann & Bob', 'amount': '50%', 'city': 'Zürich'},
+           {'name': 'C_D', 'amount': r'\$5', 'city': 'Paris'}]
+
+
+def build(name, amount, city):
+    with Document():
+        with Section('Letter'):
+            write('Dear {},'.format(Bold()(name)))
+            write(amount)
+            write(city)
+            write(name)
+
+
+class TestTemplate(unittest.TestCase):
+    def setUp(self):
+        build(slot('name'), slot('amount', escape=False),
+              slot('city', transliterate=True))
+        self.template = Template(dump())
+        clear()
+
+    def test_fill_matches_build(self):
+        for record in RECORDS:
+            build(latex_escape(record['name']), record['amount'],
+                  latex_escape(record['city'], transliterate=True))
+            expected = dump()
+            clear()
+            self.assertEqual(self.template.fill(record), expected)
+
+    def test_slots(self):
+        self.assertEqual(self.template.slots, {'name', 'amount', 'city'})
+
+    def test_missing(self):
+        with self.assertRaises(KeyError):
+            self.template.fill({'name': 'Ann'})
+
+    def test_stream(self):
+        pieces = []
+        self.template.stream(iter(RECORDS), pieces.append, separator='\n')
+        self.assertEqual(''.join(pieces),
+                         '\n'.join(self.template.fill_many(RECORDS)))
+
+    def test_no_slots(self):
+        self.assertEqual(Template('text').fill({}), 'text')
+
+    def test_invalid_name(self):
+        with self.assertRaises(ValueError):
+            slot('a\ue001')
+        with self.assertRaises(ValueError):
+            slot('')
+
+    def tearDown(self):
+        clear()
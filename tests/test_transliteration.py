@@ -0,0 +1,46 @@
+import unittest
+
+from simpletex import latex_escape
+from simpletex.transliteration import transliterate, translation_table
+
+
+class TestTransliterate(unittest.TestCase):
+    def test_ascii(self):
+        self.assertEqual(transliterate('100% & $5'), r'100\% \& \$5')
+
+    def test_accents(self):
+        self.assertEqual(transliterate('Café'), r"Caf\'e")
+        self.assertEqual(transliterate('ç'), r'\c{c}')
+        self.assertEqual(transliterate('ǖ'), r'\={\"u}')
+
+    def test_dotless(self):
+        self.assertEqual(transliterate('ï'), r'\"{\i}')
+        self.assertEqual(transliterate('į'), r'\k{i}')
+
+    def test_text_symbols(self):
+        self.assertEqual(transliterate('a–b'), r'a\textendash{}b')
+        self.assertEqual(transliterate('ß'), r'\ss{}')
+
+    def test_math_symbols(self):
+        self.assertEqual(transliterate('α≤β'),
+                         r'\ensuremath{\alpha}\ensuremath{\leq}'
+                         r'\ensuremath{\beta}')
+
+    def test_compatibility(self):
+        self.assertEqual(transliterate('ﬁ'), 'fi')
+        self.assertEqual(transliterate('＄'), r'\$')
+        self.assertEqual(transliterate('x²'), r'x\ensuremath{^{2}}')
+        self.assertEqual(transliterate('½'), r'\ensuremath{\frac{1}{2}}')
+
+    def test_math_fonts(self):
+        self.assertEqual(transliterate('𝐀'), r'\ensuremath{\mathbf{A}}')
+
+    def test_unmapped(self):
+        self.assertEqual(transliterate('中'), '中')
+
+    def test_table_size(self):
+        self.assertGreater(len(translation_table()), 1000)
+
+    def test_latex_escape(self):
+        self.assertEqual(latex_escape('é_', transliterate=True), r"\'e\_")
+        self.assertEqual(latex_escape('é_'), r'é\_')